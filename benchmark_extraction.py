@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+테이블 추출 방식 벤치마크 스크립트
+- dom: 셀마다 Playwright 요소 조회/inner_text 호출 (기존 방식)
+- evaluate: page.evaluate() 한 번으로 헤더와 셀 행렬 전체 추출
+
+기본은 Cigro 테이블과 같은 구조의 합성 HTML로 측정하며,
+--brand/--date를 지정하면 auth.json 세션으로 실제 페이지를 측정합니다.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+from playwright.sync_api import sync_playwright
+
+from cigro_runtime import BROWSER_ARGS
+from cigro_yesterday import read_page_rows_dom, read_page_rows_evaluate
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+HEADER_LABELS = ["판매처", "제품명", "옵션명", "판매량", "결제금액", "원가", "수수료", "배송비"]
+
+
+def build_synthetic_html(num_rows, num_cols=len(HEADER_LABELS)):
+    """Cigro 분석 테이블과 같은 클래스 구조의 합성 HTML을 만듭니다."""
+    labels = "".join(f"<label>{HEADER_LABELS[idx % len(HEADER_LABELS)]}</label>" for idx in range(num_cols))
+    columns = []
+    for col_idx in range(num_cols):
+        cells = "".join(f'<div class="sc-hLBbgP jbaWzw">값 {row_idx}-{col_idx}</div>' for row_idx in range(num_rows))
+        columns.append(f'<div class="sc-dkrFOg cGhOUg">{cells}</div>')
+    return (
+        f'<html><body><div class="sc-gswNZR gSJTZd">{labels}</div>'
+        f'<div>{"".join(columns)}</div></body></html>'
+    )
+
+
+def time_reader(reader, page, repeat):
+    """reader를 repeat회 실행해 (최소 소요 시간, 마지막 결과)를 반환합니다."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = reader(page, "2024-01-01")
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_benchmark(page, repeat):
+    dom_time, dom_result = time_reader(read_page_rows_dom, page, repeat)
+    eval_time, eval_result = time_reader(read_page_rows_evaluate, page, repeat)
+
+    rows = len(dom_result[1])
+    logger.info(f"📊 행 {rows}개 기준 (반복 {repeat}회 중 최소값)")
+    logger.info(f"  dom      : {dom_time * 1000:8.1f} ms")
+    logger.info(f"  evaluate : {eval_time * 1000:8.1f} ms")
+    if eval_time > 0:
+        logger.info(f"  ⚡ 속도 향상: {dom_time / eval_time:.1f}배")
+
+    if dom_result != eval_result:
+        logger.error("❌ 두 방식의 추출 결과가 다릅니다.")
+        return False
+    logger.info("✅ 두 방식의 추출 결과가 동일합니다.")
+    return True
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='테이블 추출 방식 벤치마크')
+    parser.add_argument('--rows', type=int, nargs='+', default=[20, 50, 100], help='합성 테이블 행 수 목록')
+    parser.add_argument('--repeat', type=int, default=3, help='방식별 반복 횟수')
+    parser.add_argument('--brand', type=str, help='실제 페이지 측정 시 브랜드 이름')
+    parser.add_argument('--date', type=str, help='실제 페이지 측정 시 날짜 (YYYY-MM-DD)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    all_ok = True
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=BROWSER_ARGS)
+        try:
+            if args.brand and args.date:
+                if not os.path.exists("auth.json"):
+                    logger.error("❌ 실제 페이지 측정에는 auth.json 세션이 필요합니다.")
+                    sys.exit(1)
+                context = browser.new_context(storage_state="auth.json")
+                page = context.new_page()
+                target_url = f"https://app.cigro.io/?menu=analysis&tab=product&group_by=option&brand_name={args.brand}&start_date={args.date}&end_date={args.date}"
+                page.goto(target_url, wait_until='domcontentloaded', timeout=60000)
+                page.wait_for_selector('div.sc-hLBbgP.jbaWzw', timeout=30000)
+                logger.info(f"🔍 실제 페이지 측정: {args.brand} / {args.date}")
+                all_ok = run_benchmark(page, args.repeat)
+            else:
+                page = browser.new_page()
+                for num_rows in args.rows:
+                    page.set_content(build_synthetic_html(num_rows))
+                    all_ok = run_benchmark(page, args.repeat) and all_ok
+        finally:
+            browser.close()
+
+    sys.exit(0 if all_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
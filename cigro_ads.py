@@ -0,0 +1,813 @@
+#!/usr/bin/env python3
+"""
+Cigro 광고 스크래핑 엔진
+- 광고 분석 단위(group_by: campaign, adset, ad)를 목록으로 받아 한 브라우저 세션에서 처리
+- 브랜드/날짜마다 요청한 분석 단위를 탭 여러 개에서 동시에 로드한 뒤 차례로 추출
+- 모든 분석 단위의 결과를 하나의 업로드 배치로 Sheets에 반영 (시트가 다르면 병렬, 같은 시트는 순서대로)
+- 분석 단위별 시트: 캠페인 {브랜드}_광고, 광고 세트 {브랜드}_광고_세트, 광고 소재 {브랜드}_광고_소재
+  (cigro_ads_yesterday.py, cigro_ads_ad.py는 각각 campaign, ad 단위로 이 엔진을 실행)
+- 캠페인 파생 모드(--derive-campaign): 캠페인 화면 대신 광고 소재 행을 로컬에서 캠페인 단위로 합산 (cigro_rollup)
+  일부 (브랜드, 날짜)는 실제 캠페인 화면도 스크래핑해 파생 결과와 비교하고, 불일치하면 남은 작업은 실제 화면 사용
+
+사용 예:
+    python cigro_ads.py --levels campaign ad
+    python cigro_ads.py --levels campaign ad --derive-campaign
+    python cigro_ads.py --levels campaign adset ad --start-date 2025-01-01 --end-date 2025-01-07 --brands 바르너
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import logging
+import json
+import urllib.request
+import pandas as pd
+from playwright.sync_api import sync_playwright
+from cigro_archive import archive_sheet_name, get_archive_session
+from cigro_browser import (click_and_wait_for_page_change, discard_warm_page, get_warm_page, is_app_loaded,
+                           navigate_in_app, wait_for_table_ready)
+from cigro_fingerprint import (CHANGE_CHECK, ChangeCheck, page_fingerprint, read_texts, scraped_fingerprints,
+                               verified_dates, with_fingerprint)
+from cigro_gridjs import GRID_DATASET, extract_full_grid, read_grid_headers, read_grid_rows
+from cigro_outbox import flush_outbox, get_upload_outbox
+from cigro_planner import plan_tasks
+from cigro_rollup import compare_rollup, plan_rollup, rollup_campaigns
+from cigro_runtime import LOGIN_FORM_SELECTOR, ensure_logged_in, log_blocker_summary, open_session
+from cigro_sheets import (SHEETS_QUOTA, ApiCallLog, DateRowIndex, get_sheets_session, merge_row_ranges,
+                          read_date_spans, replace_rows, run_uploads, sheets_call)
+from cigro_store import get_local_store
+from datetime import datetime, timedelta, timezone
+
+# 공용 모듈(cigro_browser, cigro_runtime) 로그 출력
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+# ==========================
+# 설정 영역
+# ==========================
+
+# Google Sheets 설정
+GOOGLE_SHEET_NAME = "Cigro Sales"  # 👉 기본 스프레드시트 이름
+GOOGLE_CRED_FILE = "google_sheet_credentials.json"  # 👉 다운로드한 JSON 파일 이름
+
+# 로그인 정보 (환경 변수에서 읽음, 기본값 없음)
+EMAIL = os.getenv("EMAIL")
+PASSWORD = os.getenv("PASSWORD")
+
+# Slack 설정
+SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
+
+# 분석 단위(group_by) → 알림/로그 이름과 시트 이름 접미사
+ADS_LEVELS = {
+    "campaign": {"label": "광고", "sheet_suffix": "_광고"},
+    "adset": {"label": "광고 세트", "sheet_suffix": "_광고_세트"},
+    "ad": {"label": "광고 소재", "sheet_suffix": "_광고_소재"},
+}
+DEFAULT_LEVELS = ["campaign", "ad"]
+
+# gridjs 테이블 선택자
+GRID_HEADER_SELECTOR = 'thead.gridjs-thead th div.gridjs-th-content'
+GRID_ROW_SELECTOR = 'tbody.gridjs-tbody tr.gridjs-tr'
+GRID_CELL_SELECTOR = 'td.gridjs-td'
+
+# 페이지 이동 감지용 지문 설정 (첫/마지막 행 + 현재 페이지 버튼/요약 문구)
+GRID_FINGERPRINT_SPEC = {
+    "layout": "rows",
+    "rowSelector": GRID_ROW_SELECTOR,
+    "labelSelectors": ['.gridjs-pages button.gridjs-currentPage', '.gridjs-summary'],
+    "firstPagePattern": '^1(\\||$)',
+}
+
+# 변경 감지 지문에 넣을 페이지 수/요약 문구 요소 (첫 페이지 행과 함께 비교)
+GRID_CHANGE_SIGNAL_SELECTORS = ['.gridjs-pages', '.gridjs-summary']
+
+# 앱 내 이동 모드: 페이지 하나를 유지하고 브랜드/날짜 변경 시 전체 로드 생략
+USE_SPA_NAVIGATION = os.getenv("CIGRO_SPA_NAVIGATION", "0") == "1"
+
+# 캠페인 파생 모드: 캠페인 시트를 광고 소재 스크래핑 결과에서 합산해 만듦 (--derive-campaign)
+DERIVE_CAMPAIGN = os.getenv("CIGRO_DERIVE_CAMPAIGN", "0") == "1"
+
+# 캠페인 파생 모드에서 실제 캠페인 화면과 비교할 (브랜드, 날짜) 비율 (실행마다 최소 1건)
+ROLLUP_CHECK_RATE = float(os.getenv("CIGRO_ROLLUP_CHECK_RATE", "0.2"))
+
+BRANDS = ["바르너", "색동서울", "보호리", "먼슬리픽", "릴리이브"]  # 브랜드 이름 리스트
+
+# 브라우저 모드 설정
+HEADLESS = True  # True: 백그라운드 실행, False: 브라우저 창 표시
+
+
+def ads_report(group_by):
+    """로컬 저장소/outbox/정산 기간에서 쓰는 리포트 이름 (cigro_runner의 리포트 키와 같음)"""
+    return f"ad/{group_by}"
+
+
+def ads_sheet_name(brand, group_by):
+    return f"{brand}{ADS_LEVELS[group_by]['sheet_suffix']}"
+
+
+def send_slack_notification(success: bool, message: str, details: dict = None, label: str = "광고"):
+    """
+    Slack Incoming Webhook으로 알림을 전송합니다. label은 제목에 들어갈 리포트 이름입니다.
+    """
+    if not SLACK_WEBHOOK_URL:
+        print("⚠️ SLACK_WEBHOOK_URL이 설정되지 않아 슬랙 알림을 건너뜁니다.")
+        return
+
+    if success:
+        emoji = "✅"
+        color = "#36a64f"
+        status = "성공"
+    else:
+        emoji = "❌"
+        color = "#dc3545"
+        status = "실패"
+
+    blocks = [
+        {
+            "type": "header",
+            "text": {
+                "type": "plain_text",
+                "text": f"{emoji} Cigro {label} 스크래핑 {status}",
+                "emoji": True
+            }
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": message
+            }
+        }
+    ]
+
+    if details:
+        fields = []
+        for key, value in details.items():
+            fields.append({
+                "type": "mrkdwn",
+                "text": f"*{key}:*\n{value}"
+            })
+        blocks.append({
+            "type": "section",
+            "fields": fields[:10]
+        })
+
+    KST = timezone(timedelta(hours=9))
+    now_kst = datetime.now(KST)
+    blocks.append({
+        "type": "context",
+        "elements": [
+            {
+                "type": "mrkdwn",
+                "text": f"🕐 {now_kst.strftime('%Y-%m-%d %H:%M:%S')} KST"
+            }
+        ]
+    })
+
+    payload = {
+        "blocks": blocks,
+        "attachments": [{"color": color, "blocks": []}]
+    }
+
+    try:
+        data = json.dumps(payload).encode('utf-8')
+        req = urllib.request.Request(
+            SLACK_WEBHOOK_URL,
+            data=data,
+            headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(req, timeout=10) as response:
+            if response.status == 200:
+                print("📨 슬랙 알림 전송 완료")
+            else:
+                print(f"⚠️ 슬랙 알림 전송 실패: HTTP {response.status}")
+    except Exception as e:
+        print(f"⚠️ 슬랙 알림 전송 중 오류: {e}")
+
+# 날짜 모드 설정
+USE_DATE_RANGE = False  # False: 어제 하루만, True: 날짜 범위 사용
+DATE_RANGE_START = "2025-12-30"  # USE_DATE_RANGE=True 일 때만 사용
+DATE_RANGE_END = "2026-01-04"    # USE_DATE_RANGE=True 일 때만 사용
+
+
+def upload_to_google_sheets(df, sheet_name, selected_date, session=None, group_by="campaign", scraped_at=None):
+    """
+    구글 시트에 group_by 분석 단위의 데이터를 업로드합니다.
+
+    - DF는 selected_date 하루치 데이터라고 가정.
+    - 시트가 없으면: 헤더 + 전체 데이터 업로드.
+    - 시트가 있으면:
+        1) 기존 시트에서 date == selected_date 인 행 개수(existing_count)를 구함
+        2) 새 DF의 행 개수(new_count)와 비교
+        3) new_count > existing_count 이면:
+            - 해당 날짜의 기존 행들만 모두 삭제(연속 구간으로 묶어서)
+            - 새 DF 전체를 append (overwrite)
+            - 삭제와 append는 spreadsheets.batchUpdate 한 번으로 전송
+        4) new_count <= existing_count 이면:
+            - 아무 작업도 하지 않음 (로컬 저장소에 Sheets 미반영으로 남은 데이터가 있으면 그 데이터를 다시 반영)
+    - 날짜 → 행 구간 인덱스(_date_index)가 있으면 시트를 읽지 않고 해당 날짜 구간만 다룸
+    - 로컬 저장소(cigro_store)에 있는 날짜는 저장소 데이터 기준으로 existing_count를 판단
+    - 아카이브된 월(cigro_archive)의 날짜는 연도별 아카이브 시트({시트}_{YYYY})로 업로드
+    - 변경 없음이 확인된 날짜(cigro_fingerprint)는 업로드하지 않고, 반영한 날짜는 스크래핑 지문을 저장소에 기록
+    - scraped_at(KST datetime)이 있으면 저장소의 스크래핑 시각을 지금 대신 그 시각으로 기록 (outbox 재업로드)
+    """
+    # 변경 없음이 확인된 날짜는 저장소와 Sheets에 이미 같은 데이터가 있음
+    if str(selected_date) in verified_dates(df):
+        print(f"🟰 '{selected_date}' 데이터는 변경 없음이 확인되어 업로드하지 않습니다. (시트: {sheet_name})")
+        return
+
+    if df.empty:
+        print(f"⚠️ 업로드할 데이터가 없습니다. (시트: {sheet_name}, 날짜: {selected_date})")
+        return
+
+    if "date" not in df.columns:
+        print("❌ DF에 'date' 컬럼이 없습니다. 업로드 중단.")
+        return
+
+    # 선택된 날짜만 필터링 (혹시라도 df 안에 다른 날짜가 섞여 있을 대비)
+    df = df[df["date"].astype(str) == str(selected_date)]
+    if df.empty:
+        print(f"⚠️ DF 안에 '{selected_date}' 날짜 데이터가 없습니다. (시트: {sheet_name})")
+        return
+
+    new_count = len(df)
+    print(f"📊 새로 가져온 '{selected_date}' 데이터 행 수: {new_count}")
+
+    # 로컬 저장소 (교체/유지 판단의 기준 데이터)
+    date_key = str(selected_date)
+    store_report = ads_report(group_by)
+    store = get_local_store()
+    stored_df, synced = store.load(store_report, sheet_name, [date_key])
+
+    # Google Sheets 세션 (프로세스 전체에서 인증/스프레드시트/워크시트 메타데이터 공유)
+    call_log = ApiCallLog()
+    session = session or get_sheets_session(GOOGLE_CRED_FILE, GOOGLE_SHEET_NAME)
+
+    # 시트 존재 여부 확인 (없으면 생성)
+    sheet, is_new_sheet = session.get_or_add_worksheet(sheet_name, call_log=call_log)
+    if is_new_sheet:
+        print(f"❌ '{sheet_name}' 시트가 없으므로 새로 생성했습니다.")
+    else:
+        print(f"✅ 기존 시트 '{sheet_name}' 찾기 완료")
+
+    # 날짜 → 행 구간 인덱스 (있으면 시트 전체를 읽지 않고 해당 날짜 구간으로 판단)
+    date_index = DateRowIndex(session, sheet_name, call_log).load()
+
+    # 아카이브된 월의 날짜(백필)는 연도별 아카이브 시트로 업로드
+    if date_index.is_archived(selected_date):
+        archive_name = archive_sheet_name(sheet_name, selected_date)
+        print(f"🗄️ '{selected_date}'는 아카이브된 월이므로 아카이브 시트 '{archive_name}'에 업로드합니다.")
+        return upload_to_google_sheets(df, archive_name, selected_date, get_archive_session(session), group_by,
+                                      scraped_at)
+
+    # 🔹 새 시트인 경우: 헤더 + 전체 데이터 바로 기록 (한 번의 update로)
+    if is_new_sheet:
+        values = [df.columns.tolist()] + df.values.tolist()
+        sheets_call(call_log, "update", sheet.update, "A1", values, value_input_option="RAW")
+        date_index.rebuild_from_dates(df["date"])
+        date_index.save()
+        store.put(store_report, sheet_name, df, synced=True)
+        store.mark_scraped(store_report, sheet_name, [date_key], scraped_fingerprints(df), scraped_at)
+        print(f"✅ 새 시트 '{sheet_name}'에 '{selected_date}' 데이터 {len(df)}행 업로드 완료")
+        print(f"📡 Sheets API 호출: {call_log.summary()}")
+        return
+
+    # 🔹 기존 시트인 경우
+    rows_to_delete = []
+    if date_index.is_indexed:
+        # 1) 인덱스에서 해당 날짜의 행 구간 조회 (시트 읽기 없음)
+        span = date_index.span(selected_date)
+        if span:
+            rows_to_delete = list(range(span[0], span[1] + 1))
+            print(f"📇 날짜 인덱스 사용: '{selected_date}' 행 구간 {span[0]} ~ {span[1]}")
+        else:
+            print(f"📇 날짜 인덱스 사용: '{selected_date}' 데이터 없음")
+    else:
+        # 1) 헤더 체크
+        header_row = sheets_call(call_log, "row_values", sheet.row_values, 1)
+        if not header_row:
+            print(f"⚠️ '{sheet_name}' 시트에 헤더가 없어 새로 작성합니다.")
+            values = [df.columns.tolist()] + df.values.tolist()
+            sheets_call(call_log, "update", sheet.update, "A1", values, value_input_option="RAW")
+            date_index.rebuild_from_dates(df["date"])
+            date_index.save()
+            store.put(store_report, sheet_name, df, synced=True)
+            store.mark_scraped(store_report, sheet_name, [date_key], scraped_fingerprints(df), scraped_at)
+            print(f"✅ 헤더가 없던 시트 '{sheet_name}'를 초기화하고 '{selected_date}' 데이터 업로드 완료")
+            print(f"📡 Sheets API 호출: {call_log.summary()}")
+            return
+
+        # 2) 모든 레코드 가져오기 (row1 = header, row2부터 데이터) + 읽은 김에 날짜 인덱스 생성
+        existing_records = sheets_call(call_log, "get_all_records", sheet.get_all_records)  # list[dict]
+        date_index.rebuild_from_dates([record.get("date", "") for record in existing_records])
+
+        # 3) 기존 데이터 중 해당 날짜의 row index 모으기
+        for idx, record in enumerate(existing_records):
+            record_date = str(record.get("date", "")).strip()
+            if record_date == str(selected_date):
+                # 실제 시트 row index = header(1) + data 시작(1) + idx
+                rows_to_delete.append(idx + 2)
+
+    existing_count = len(rows_to_delete)
+    print(f"📊 시트 '{sheet_name}'에 이미 저장된 '{selected_date}' 데이터 행 수: {existing_count}")
+
+    # 로컬 저장소에 있는 날짜는 저장소 기준으로 판단, 없으면 시트의 기존 데이터로 저장소를 채움
+    stored_count = existing_count
+    if date_key in synced:
+        stored_count = len(stored_df)
+        pending = "" if synced[date_key] else " (Sheets 미반영)"
+        print(f"💾 로컬 저장소의 '{selected_date}' 데이터 행 수: {stored_count}{pending}")
+    elif rows_to_delete:
+        sheet_df = read_date_spans(sheet, merge_row_ranges(rows_to_delete), call_log)
+        store.put(store_report, sheet_name, sheet_df, synced=True)
+
+    # 4) 비교 후 overwrite 여부 결정
+    if new_count > stored_count:
+        store.put(store_report, sheet_name, df)
+        push_df = df
+    elif date_key in synced and not synced[date_key]:
+        print(f"♻️ 로컬 저장소의 '{selected_date}' 데이터({stored_count}행)가 Sheets에 반영되지 않아 다시 반영합니다.")
+        push_df = stored_df
+    else:
+        print(
+            f"⛔ 기존 데이터({stored_count}행)가 새 데이터({new_count}행)보다 크거나 같음 → 업데이트 하지 않음"
+        )
+        if date_index.dirty:
+            date_index.save()
+        store.mark_scraped(store_report, sheet_name, [date_key], scraped_fingerprints(df), scraped_at)
+        print(f"📡 Sheets API 호출: {call_log.summary()}")
+        return
+
+    # 인덱스 구간의 행을 지우기 전에 구간 경계가 시트와 맞는지 점검, 맞지 않으면 시트 전체를 읽어 다시 찾음
+    if rows_to_delete and date_index.is_indexed and not date_index.verify_spans(sheet, [selected_date]):
+        existing_records = sheets_call(call_log, "get_all_records", sheet.get_all_records)
+        date_index.rebuild_from_dates([record.get("date", "") for record in existing_records])
+        rows_to_delete = [idx + 2 for idx, record in enumerate(existing_records)
+                          if str(record.get("date", "")).strip() == str(selected_date)]
+        existing_count = len(rows_to_delete)
+        print(f"📊 시트 '{sheet_name}'를 다시 읽은 '{selected_date}' 데이터 행 수: {existing_count}")
+
+    if existing_count == 0:
+        # 해당 날짜 데이터가 없으면 그냥 append (인덱스 갱신과 함께 한 번의 batchUpdate)
+        date_index.record_append([(selected_date, len(push_df))])
+        replace_rows(sheet, [], push_df.values.tolist(), call_log, date_index.save_requests())
+        print(f"✅ '{sheet_name}' 시트에 '{selected_date}' 날짜 신규 {len(push_df)}행 append 완료")
+    else:
+        print(f"🔄 새 데이터({len(push_df)}행)로 기존 데이터({existing_count}행) overwrite 진행")
+
+        # ----- ✅ 연속 구간 삭제 + 새 데이터 append를 batchUpdate 한 번으로 -----
+        for start, end in reversed(merge_row_ranges(rows_to_delete)):
+            print(f"🧹 '{selected_date}' 기존 행 삭제: {start} ~ {end}")
+        date_index.record_delete(rows_to_delete)
+        date_index.record_append([(selected_date, len(push_df))])
+        replace_rows(sheet, rows_to_delete, push_df.values.tolist(), call_log, date_index.save_requests())
+        print(f"✅ '{sheet_name}' 시트의 '{selected_date}' 데이터 {len(push_df)}행으로 교체(overwrite) 완료")
+
+    store.mark_synced(store_report, sheet_name, [date_key])
+    store.mark_scraped(store_report, sheet_name, [date_key], scraped_fingerprints(df), scraped_at)
+    print(f"📡 Sheets API 호출: {call_log.summary()}")
+
+def extract_all_pages_data(page, selected_date, change_check=None):
+    """
+    gridjs 테이블 구조 기반으로 모든 페이지 데이터를 수집합니다.
+    첫 페이지에서 gridjs가 가진 전체 행을 한 번에 읽고(cigro_gridjs), 읽지 못하면 aria-label="Next" 버튼 클릭으로 페이지 이동.
+    첫 페이지의 페이지 수/요약 문구와 행으로 만든 지문이 change_check(ChangeCheck)의 지난 지문과 같으면
+    페이지를 넘기지 않고 로컬 저장소 데이터("변경 없음 확인")를 반환합니다.
+    """
+    all_rows = []
+    headers = None
+    fingerprint = None
+    first_page = True
+
+    while True:
+        # -----------------------------
+        # 1) 헤더 추출 (최초 1번만)
+        # -----------------------------
+        if headers is None:
+            header_texts = read_grid_headers(page, GRID_HEADER_SELECTOR)
+            if not header_texts:
+                print("❌ 헤더를 찾을 수 없습니다.")
+                return pd.DataFrame()
+
+            headers = ["date"] + header_texts
+            print(f"✅ 헤더 추출 완료: {headers}")
+
+        # -----------------------------
+        # 2) 바디(rows) 추출 - 현재 페이지의 모든 행을 page.evaluate() 한 번으로
+        # -----------------------------
+        body_rows = read_grid_rows(page, GRID_ROW_SELECTOR, GRID_CELL_SELECTOR)
+        if not body_rows:
+            print("⚠️ 바디 row 없음 (페이지 로딩 문제?)")
+            break
+
+        all_rows.extend([selected_date] + cell_values for cell_values in body_rows)
+
+        # 첫 페이지의 싼 신호로 지난 실행 이후 변경 여부 확인
+        if fingerprint is None:
+            fingerprint = page_fingerprint("|".join(read_texts(page, GRID_CHANGE_SIGNAL_SELECTORS)), all_rows)
+            verified = change_check.verify(fingerprint) if change_check else None
+            if verified is not None:
+                print(f"🟰 변경 없음 확인 (지문 일치, 페이지 이동 생략, 저장소 데이터 {len(verified)}행 사용)")
+                return verified
+
+        # -----------------------------
+        # 3) Next 버튼 존재 여부 확인
+        # -----------------------------
+        next_btn = page.query_selector('button[aria-label="Next"]')
+
+        if not next_btn:
+            print("❌ Next 버튼을 찾을 수 없습니다. 페이지네이션 종료")
+            break
+
+        # disabled면 마지막 페이지
+        if next_btn.get_attribute("disabled") is not None:
+            print("⛔ 마지막 페이지 도달 (Next disabled)")
+            break
+
+        # 첫 페이지에서 gridjs가 가진 전체 행을 page.evaluate() 한 번으로 읽기 (성공하면 페이지 이동 없음)
+        if first_page and GRID_DATASET:
+            rows = extract_full_grid(page, [row[1:] for row in all_rows], GRID_ROW_SELECTOR, GRID_CELL_SELECTOR)
+            if rows is not None:
+                all_rows = [[selected_date] + cells for cells in rows]
+                break
+        first_page = False
+
+        # -----------------------------
+        # 4) 다음 페이지로 이동
+        # -----------------------------
+        # 첫/마지막 행과 페이지 표시가 바뀔 때까지 대기 (클릭이 반영되지 않으면 재클릭)
+        print("➡️  Next 페이지 이동")
+        if not click_and_wait_for_page_change(page, next_btn.click, GRID_FINGERPRINT_SPEC):
+            raise RuntimeError("다음 페이지로 이동하지 못했습니다. (행 변경 없음)")
+
+    # -----------------------------
+    # 5) DataFrame 생성
+    # -----------------------------
+    if not all_rows:
+        print("⚠️ 수집된 데이터가 없습니다.")
+        return pd.DataFrame(columns=headers if headers else None)
+
+    # 컬럼 수 mismatch 안전장치
+    row_len = len(all_rows[0])
+    if len(headers) < row_len:
+        headers = headers + [f"컬럼{idx+1}" for idx in range(row_len - len(headers))]
+    elif len(headers) > row_len:
+        headers = headers[:row_len]
+
+    df = pd.DataFrame(all_rows, columns=headers)
+    return with_fingerprint(df, selected_date, fingerprint)
+
+
+def level_url(brand, selected_date, group_by):
+    return (
+        f"https://app.cigro.io/?menu=analysis&tab=ad&group_by={group_by}"
+        f"&brand_name={brand}&start_date={selected_date}&end_date={selected_date}"
+    )
+
+
+def read_level_table(page, target_url, brand, selected_date, group_by):
+    """
+    이동을 시작한 페이지에서 테이블이 준비되기를 기다렸다가 group_by 분석 단위의 데이터를 추출합니다.
+    """
+    # 테이블 로딩 대기: 헤더/행이 나타나고 DOM 변경이 멈추면 바로 진행 (로그인 화면이 뜨면 바로 재로그인)
+    ready = wait_for_table_ready(page, GRID_HEADER_SELECTOR, GRID_ROW_SELECTOR, timeout=20000,
+                                 abort_selector=LOGIN_FORM_SELECTOR)
+    if not ready and ensure_logged_in(page):
+        # 세션 만료로 로그인 화면이 뜬 경우: 워커 공용 재로그인 후 다시 이동
+        page.goto(target_url)
+        ready = wait_for_table_ready(page, GRID_HEADER_SELECTOR, GRID_ROW_SELECTOR, timeout=20000,
+                                     abort_selector=LOGIN_FORM_SELECTOR)
+    if not ready:
+        print("⚠️ 테이블 로딩 대기 시간 초과 (데이터가 없을 수 있음)")
+    check = ChangeCheck(ads_report(group_by), ads_sheet_name(brand, group_by), selected_date) if CHANGE_CHECK else None
+    return extract_all_pages_data(page, selected_date, check)
+
+
+def scrape_brand(context, brand, selected_date, group_by="campaign"):
+    """
+    단일 브랜드/날짜의 group_by 분석 단위 테이블을 스크래핑해 DataFrame으로 반환합니다.
+    페이지는 함수 안에서 열고 닫습니다. 앱 내 이동 모드에서는 컨텍스트의 페이지를 재사용합니다.
+    """
+    target_url = level_url(brand, selected_date, group_by)
+
+    page = get_warm_page(context) if USE_SPA_NAVIGATION else context.new_page()
+    succeeded = False
+    try:
+        # 앱이 이미 로드된 재사용 페이지면 앱 내 이동, 아니면 전체 로드
+        if not (USE_SPA_NAVIGATION and is_app_loaded(page) and navigate_in_app(page, target_url, GRID_FINGERPRINT_SPEC)):
+            page.goto(target_url)
+
+        df = read_level_table(page, target_url, brand, selected_date, group_by)
+        succeeded = True
+        return df
+    finally:
+        if not USE_SPA_NAVIGATION:
+            page.close()
+        elif not succeeded:
+            # 실패한 페이지는 버리고 다음 작업은 새 페이지에서 전체 로드
+            discard_warm_page(context)
+
+
+def scrape_brand_levels(context, brand, selected_date, levels):
+    """
+    한 브랜드/날짜의 여러 분석 단위를 단위마다 탭 하나씩 열어 동시에 로드하고, levels 순서대로 추출합니다.
+    첫 탭의 테이블을 기다리고 페이지를 넘기는 동안 나머지 탭은 브라우저에서 계속 로드됩니다.
+    한 단위가 실패해도 나머지 단위는 계속 추출합니다. 단위가 하나면 scrape_brand()와 같습니다.
+
+    Returns:
+        {group_by: (df, error)}
+    """
+    results = {}
+    if len(levels) == 1:
+        try:
+            results[levels[0]] = (scrape_brand(context, brand, selected_date, levels[0]), None)
+        except Exception as e:
+            results[levels[0]] = (None, str(e))
+        return results
+
+    tabs = {}
+    try:
+        # 1) 모든 탭에서 이동을 시작만 하고(commit) 바로 다음 탭으로 넘어가 로드가 동시에 진행되도록 함
+        for group_by in levels:
+            page = context.new_page()
+            tabs[group_by] = page
+            try:
+                page.goto(level_url(brand, selected_date, group_by), wait_until="commit")
+            except Exception as e:
+                results[group_by] = (None, f"페이지 이동 실패: {e}")
+
+        # 2) 탭마다 테이블 준비를 기다리고 추출
+        for group_by, page in tabs.items():
+            if group_by in results:
+                continue
+            print(f"🗂️ {ADS_LEVELS[group_by]['label']} 탭 추출 중...")
+            try:
+                df = read_level_table(page, level_url(brand, selected_date, group_by), brand, selected_date, group_by)
+                results[group_by] = (df, None)
+            except Exception as e:
+                results[group_by] = (None, str(e))
+    finally:
+        for page in tabs.values():
+            try:
+                page.close()
+            except Exception:
+                pass
+    return {group_by: results[group_by] for group_by in levels}
+
+
+def plan_campaign_rollup(tasks, planned, brands, check_rate=ROLLUP_CHECK_RATE):
+    """
+    캠페인 파생 모드에서 (브랜드, 날짜)별 캠페인 처리 방법을 정합니다.
+    캠페인과 광고 소재를 모두 처리하는 작업만 파생 대상이고, 캠페인 시트 열(로컬 저장소)을 모르는 브랜드와
+    check_rate 비율만큼 무작위로 고른 작업은 실제 캠페인 화면도 스크래핑해 파생 결과와 비교합니다.
+
+    Returns:
+        ({브랜드: 캠페인 열 목록 또는 None}, 파생 대상 set, 비교 대상 set)
+    """
+    store = get_local_store()
+    templates = {brand: store.latest_columns(ads_report("campaign"), ads_sheet_name(brand, "campaign"))
+                 for brand in brands}
+    candidates = [task for task in tasks if {"campaign", "ad"} <= set(planned[task])]
+    checks = {task for task in candidates if templates[task[0]] is None}
+    unchecked = [task for task in candidates if task not in checks]
+    sample_size = min(len(unchecked), max(0, math.ceil(check_rate * len(candidates)) - len(checks)))
+    if check_rate > 0 and not checks and unchecked:
+        sample_size = max(sample_size, 1)
+    checks.update(random.sample(unchecked, sample_size))
+    return templates, set(candidates), checks
+
+
+def derive_campaign(ad_result, campaign_columns):
+    """
+    광고 소재 결과(df, error)에서 캠페인 데이터를 파생합니다.
+
+    Returns:
+        (DataFrame 또는 None, 파생하지 못한 이유)
+    """
+    ad_df, ad_error = ad_result
+    if ad_error is not None:
+        return None, f"광고 소재 스크래핑 실패 ({ad_error})"
+    if ad_df is None or ad_df.empty:
+        return None, "광고 소재 데이터 없음"
+    try:
+        return rollup_campaigns(ad_df, campaign_columns), None
+    except ValueError as e:
+        return None, str(e)
+
+
+def check_campaign_rollup(results):
+    """
+    실제 캠페인 화면 결과와 광고 소재에서 파생한 결과를 비교합니다.
+
+    Returns:
+        불일치 설명 목록 (비어 있으면 일치), 비교할 수 없으면 None
+    """
+    (campaign_df, campaign_error), (ad_df, ad_error) = results["campaign"], results["ad"]
+    if campaign_error is not None or ad_error is not None or campaign_df.empty or ad_df.empty:
+        return None
+    columns = campaign_df.columns.tolist()
+    try:
+        plan = plan_rollup(ad_df, columns)
+    except ValueError as e:
+        return [str(e)]
+    print(f"🧮 캠페인 파생 방법: {plan.summary()}")
+    return compare_rollup(rollup_campaigns(ad_df, columns, plan), campaign_df, plan)
+
+
+def build_target_dates(start_date=None, end_date=None):
+    """
+    수집 대상 날짜 리스트를 반환합니다.
+    start_date(--start-date)가 있으면 그 범위, 없으면 설정에 따라 날짜 범위 또는 어제 하루.
+    """
+    if start_date or USE_DATE_RANGE:
+        start = datetime.strptime(start_date or DATE_RANGE_START, "%Y-%m-%d").date()
+        end = datetime.strptime(end_date or start_date or DATE_RANGE_END, "%Y-%m-%d").date()
+        if end < start:
+            raise ValueError("종료 날짜가 시작 날짜보다 앞입니다.")
+        days = (end - start).days + 1
+        return [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+    else:
+        # 어제 하루 (KST 기준)
+        KST = timezone(timedelta(hours=9))
+        now_kst = datetime.now(KST)
+        yesterday = now_kst - timedelta(1)
+        return [yesterday.strftime("%Y-%m-%d")]
+
+
+def parse_arguments(default_levels=None):
+    parser = argparse.ArgumentParser(description='Cigro 광고 스크래핑 (분석 단위별 시트 업로드)')
+    parser.add_argument('--levels', nargs='+', choices=list(ADS_LEVELS), default=default_levels or DEFAULT_LEVELS,
+                        help=f'분석 단위 목록 (기본값: {" ".join(default_levels or DEFAULT_LEVELS)})')
+    parser.add_argument('--start-date', type=str, help='시작 날짜 (YYYY-MM-DD 형식, 기본값: 어제)')
+    parser.add_argument('--end-date', type=str, help='종료 날짜 (YYYY-MM-DD 형식, 기본값: 시작 날짜)')
+    parser.add_argument('--brands', type=str, nargs='+', help='스크래핑할 브랜드 목록 (공백으로 구분)')
+    parser.add_argument('--derive-campaign', action='store_true', default=DERIVE_CAMPAIGN,
+                        help='캠페인 시트를 광고 소재 데이터에서 합산해 만듦 (일부 작업은 실제 캠페인 화면과 비교)')
+    parser.add_argument('--upload-concurrency', type=int, default=4,
+                        help='동시에 업로드할 시트 수 (기본값: 4, 전체 속도는 Sheets 할당량 토큰 버킷으로 제한)')
+    return parser.parse_args()
+
+
+def main(levels=None):
+    args = parse_arguments(levels)
+
+    # 필수 환경 변수 검증
+    if not EMAIL or not PASSWORD:
+        print("❌ EMAIL과 PASSWORD 환경변수가 설정되지 않았습니다.")
+        print("   GitHub Secrets 또는 환경 변수를 확인하세요.")
+        sys.exit(1)
+
+    levels = list(dict.fromkeys(args.levels))
+    if args.derive_campaign and "campaign" in levels and "ad" not in levels:
+        # 캠페인 파생은 광고 소재 데이터에서 합산
+        print("🧮 캠페인 파생 모드: 광고 소재 단위도 함께 처리합니다.")
+        levels.append("ad")
+    brands = args.brands or BRANDS
+    label = " + ".join(ADS_LEVELS[group_by]["label"] for group_by in levels)
+    target_dates = build_target_dates(args.start_date, args.end_date)
+    print("🎯 수집 대상 날짜들:", target_dates)
+    print(f"🧭 분석 단위: {label}")
+
+    # 분석 단위별로 정산 기간이 지나 확정된 (브랜드, 날짜)는 제외하고, (브랜드, 날짜)마다 남은 단위를 한 번에 처리
+    planned = {}
+    total_frozen = 0
+    for group_by in levels:
+        level_tasks, frozen = plan_tasks(ads_report(group_by), brands, target_dates, ADS_LEVELS[group_by]["sheet_suffix"])
+        total_frozen += len(frozen)
+        for task in level_tasks:
+            planned.setdefault(task, []).append(group_by)
+    tasks = [(brand, selected_date) for selected_date in target_dates for brand in brands
+             if (brand, selected_date) in planned]
+    if total_frozen:
+        print(f"🧊 정산 기간이 지나 확정된 {total_frozen}건 제외 → 작업 {sum(map(len, planned.values()))}건")
+
+    # 캠페인 파생 모드: 비교 대상 작업을 먼저 처리해, 불일치하면 남은 작업은 실제 캠페인 화면 사용
+    rollup_templates, rollup_tasks, rollup_checks = {}, set(), set()
+    rollup_enabled = args.derive_campaign and "campaign" in levels
+    if rollup_enabled:
+        rollup_templates, rollup_tasks, rollup_checks = plan_campaign_rollup(tasks, planned, brands)
+        tasks.sort(key=lambda task: task not in rollup_checks)
+        print(f"🧮 캠페인 파생 대상 {len(rollup_tasks)}건 (실제 캠페인 화면과 비교 {len(rollup_checks)}건)")
+
+    # 결과 추적
+    total_success = 0
+    total_fail = 0
+    total_unchanged = 0
+    total_derived = 0
+    rollup_mismatches = []
+
+    try:
+        # 지난 실행에서 업로드하지 못하고 outbox에 남은 데이터를 먼저 업로드
+        flush_outbox([ads_report(group_by) for group_by in levels], args.upload_concurrency)
+
+        jobs = []
+        uploads = []
+        with sync_playwright() as p:
+            # 로그인/세션 (저장된 세션이 만료되었으면 다시 로그인, 리소스 차단 포함)
+            session = open_session(p, EMAIL, PASSWORD, headless=HEADLESS)
+            context = session.context
+
+            # 날짜별 + 브랜드별 반복, 분석 단위들은 탭 여러 개에서 동시에 로드
+            for brand, selected_date in tasks:
+                brand_levels = planned[(brand, selected_date)]
+                print(f"\n==============================")
+                print(f"🔍 {selected_date} / {brand} 데이터 추출 중... "
+                      f"({', '.join(ADS_LEVELS[group_by]['label'] for group_by in brand_levels)})")
+                print(f"==============================")
+
+                task = (brand, selected_date)
+                derive = rollup_enabled and task in rollup_tasks and task not in rollup_checks
+                scrape_levels = [group_by for group_by in brand_levels if not (derive and group_by == "campaign")]
+                results = scrape_brand_levels(context, brand, selected_date, scrape_levels)
+
+                if derive:
+                    # 캠페인 화면 대신 광고 소재 행을 캠페인 단위로 합산, 파생할 수 없으면 실제 캠페인 화면 스크래핑
+                    df, reason = derive_campaign(results["ad"], rollup_templates[brand])
+                    if df is not None:
+                        print(f"🧮 {brand} 캠페인 데이터를 광고 소재 {len(results['ad'][0])}행에서 파생: {len(df)}행")
+                        results["campaign"] = (df, None)
+                        total_derived += 1
+                    else:
+                        print(f"⚠️ {brand} 캠페인 파생 불가 → 실제 캠페인 화면 스크래핑: {reason}")
+                        results.update(scrape_brand_levels(context, brand, selected_date, ["campaign"]))
+                elif rollup_enabled and task in rollup_checks:
+                    mismatches = check_campaign_rollup(results)
+                    if mismatches:
+                        print(f"❌ {brand} 캠페인 파생 결과가 실제 캠페인 화면과 다릅니다: {'; '.join(mismatches)}")
+                        print("⚠️ 남은 작업은 실제 캠페인 화면을 스크래핑합니다.")
+                        rollup_mismatches.append(f"{brand} {selected_date}")
+                        rollup_enabled = False
+                    elif mismatches is not None:
+                        print(f"✅ {brand} 캠페인 파생 결과가 실제 캠페인 화면과 일치합니다.")
+
+                for group_by, (df, error) in results.items():
+                    level_label = ADS_LEVELS[group_by]["label"]
+                    if error is not None:
+                        print(f"❌ {brand} {level_label} 스크래핑 실패: {error}")
+                        total_fail += 1
+                        continue
+                    if verified_dates(df):
+                        total_unchanged += 1
+                    sheet_name = ads_sheet_name(brand, group_by)
+                    jobs.append((sheet_name, lambda df=df, sheet_name=sheet_name, selected_date=selected_date,
+                                 group_by=group_by: upload_to_google_sheets(df, sheet_name, selected_date,
+                                                                            group_by=group_by)))
+                    uploads.append((brand, selected_date, group_by, sheet_name, df))
+
+            log_blocker_summary(session.blocker)
+            session.close()
+
+        # 모든 분석 단위의 결과를 하나의 업로드 배치로 반영 (시트가 다르면 병렬, 같은 시트는 순서대로)
+        # 캠페인 파생 비교 작업을 먼저 처리했어도 시트에는 날짜 순서로 추가
+        if rollup_checks:
+            order = sorted(range(len(jobs)), key=lambda index: uploads[index][1])
+            jobs, uploads = [jobs[index] for index in order], [uploads[index] for index in order]
+        if jobs:
+            print(f"\n📤 Google Sheets 업로드 시작 ({len(jobs)}건, 동시 {args.upload_concurrency}개)...")
+        for (brand, selected_date, group_by, sheet_name, df), (_, error) in zip(
+                uploads, run_uploads(jobs, args.upload_concurrency)):
+            if error is None:
+                total_success += 1
+            else:
+                # 스크래핑한 데이터는 outbox에 보관해 다음 실행 때 다시 업로드
+                print(f"❌ {brand} {ADS_LEVELS[group_by]['label']} 업로드 실패 ({selected_date}): {error}")
+                get_upload_outbox().add(ads_report(group_by), sheet_name, df, {"selected_date": selected_date}, error)
+                total_fail += 1
+        print(f"📡 Sheets 할당량 사용: {SHEETS_QUOTA.summary()}")
+
+        # 성공 알림
+        date_str = target_dates[0] if len(target_dates) == 1 else f"{target_dates[0]} ~ {target_dates[-1]}"
+        details = {
+            "📅 기간": date_str,
+            "📦 브랜드": ", ".join(brands),
+            "🧭 분석 단위": label,
+            "✅ 성공": f"{total_success}건",
+            "🟰 변경 없음": f"{total_unchanged}건",
+            "❌ 실패": f"{total_fail}건",
+            "🧊 동결": f"{total_frozen}건"
+        }
+        if args.derive_campaign:
+            details["🧮 캠페인 파생"] = (f"{total_derived}건 (비교 {len(rollup_checks)}건"
+                                      f"{f', 불일치 {len(rollup_mismatches)}건' if rollup_mismatches else ''})")
+
+        if total_fail == 0:
+            message = f"*{len(target_dates)}일* x *{len(brands)}개 브랜드* {label} 스크래핑이 모두 완료되었습니다."
+            send_slack_notification(True, message, details, label)
+        else:
+            message = f"*{len(target_dates)}일* x *{len(brands)}개 브랜드* 중 *{total_success}건 성공*, *{total_fail}건 실패*했습니다."
+            send_slack_notification(False, message, details, label)
+
+    except Exception as e:
+        # 실패 알림
+        send_slack_notification(
+            False,
+            f"{label} 스크래핑 중 오류가 발생했습니다.\n\n```{str(e)}```",
+            {"📅 기간": target_dates[0] if target_dates else "N/A"},
+            label
+        )
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Cigro 시트 아카이브
+- 브랜드 시트(바르너, {브랜드}_광고, {브랜드}_광고_소재)에서 마감된 월의 데이터를 연도별 아카이브 시트
+  ({시트}_{YYYY})로 옮기고, 원래 시트에는 최근 N개월만 남겨 시트 크기를 제한
+- 옮긴 마지막 월은 날짜 인덱스(_date_index)의 archived_through 열에 기록하고, 업로더는 그 월 이하 날짜
+  (백필)를 해당 연도의 아카이브 시트로 보냄
+- CIGRO_ARCHIVE_SHEET_KEY를 지정하면 아카이브 시트를 별도 스프레드시트에 만듦
+
+로컬 저장소(cigro_store)가 다른 머신/캐시에 있으면(예: GitHub Actions의 워크플로별 캐시) 그 저장소에서
+--store-only로 실행해 이미 아카이브된 월(_date_index의 아카이브 월)의 파티션만 아카이브 시트 이름 아래로 옮기세요.
+
+업로드가 실행 중이지 않을 때 실행하세요. 아카이브 시트에 먼저 복사한 뒤 원래 시트에서 지우므로
+중간에 실패해도 데이터는 남고, 다시 실행하면 같은 날짜는 교체되어 중복되지 않습니다.
+
+사용 예:
+    python cigro_archive.py --dry-run
+    python cigro_archive.py --sheets 바르너 바르너_광고 --keep-months 3
+    python cigro_archive.py --store-only
+"""
+
+import argparse
+import logging
+import os
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+
+from cigro_sheets import (DATE_INDEX_SHEET_NAME, ApiCallLog, DateRowIndex, get_sheets_session, read_sheet_rows,
+                          replace_dates_chunked, replace_rows, sheets_call)
+from cigro_store import get_local_store
+
+logger = logging.getLogger(__name__)
+
+# 아카이브 시트를 둘 별도 스프레드시트 키 (없으면 같은 스프레드시트)
+ARCHIVE_SHEET_KEY = os.getenv("CIGRO_ARCHIVE_SHEET_KEY")
+
+# 원래 시트에 남길 최근 개월 수 (이번 달 포함)
+ARCHIVE_KEEP_MONTHS = int(os.getenv("CIGRO_ARCHIVE_KEEP_MONTHS", "3"))
+
+# 연도별 아카이브 시트 이름 ({시트}_{YYYY})
+ARCHIVE_SHEET_PATTERN = re.compile(r".+_\d{4}$")
+
+
+def archive_sheet_name(sheet_name, date):
+    return f"{sheet_name}_{str(date).strip()[:4]}"
+
+
+def get_archive_session(session):
+    """아카이브 시트가 있는 스프레드시트의 세션 (별도 스프레드시트를 지정하지 않으면 같은 세션)"""
+    if not ARCHIVE_SHEET_KEY:
+        return session
+    return get_sheets_session(session.cred_file, "archive", ARCHIVE_SHEET_KEY)
+
+
+def route_archived_dates(date_index, dates):
+    """아카이브된 월의 날짜를 {아카이브 시트 이름: [날짜]}로 묶습니다. 원래 시트에 남는 날짜는 제외"""
+    routes = {}
+    for date in dates:
+        if date_index.is_archived(date):
+            routes.setdefault(archive_sheet_name(date_index.sheet_name, date), []).append(date)
+    return routes
+
+
+def archive_cutoff(keep_months, today=None):
+    """옮길 마지막 월 (YYYY-MM). 이번 달을 포함한 최근 keep_months개월은 남깁니다."""
+    today = today or datetime.now(timezone(timedelta(hours=9)))
+    year, month = today.year, today.month - max(keep_months, 1)
+    while month < 1:
+        month += 12
+        year -= 1
+    return f"{year:04d}-{month:02d}"
+
+
+def copy_to_archive(archive_session, archive_name, header, rows, call_log=None):
+    """
+    rows를 아카이브 시트 끝에 날짜순으로 추가합니다. 아카이브 시트에 같은 날짜가 이미 있으면
+    (중간에 멈춘 뒤 다시 실행한 경우) 그 행들을 지우고 교체합니다. 1년치 데이터도 요청 크기가
+    제한되도록 날짜 경계의 청크로 나눠 보냅니다.
+    """
+    date_column = header.index("date")
+    rows = sorted(rows, key=lambda row: row[date_column])
+    dates = sorted({row[date_column] for row in rows})
+
+    archive, created = archive_session.get_or_add_worksheet(archive_name, cols=str(len(header)), call_log=call_log)
+    archive_index = DateRowIndex(archive_session, archive_name, call_log).load()
+    archive_header = [] if created else sheets_call(call_log, "row_values", archive.row_values, 1)
+
+    date_rows = {}
+    if not archive_header:
+        replace_rows(archive, [], [header], call_log)
+        archive_index.rebuild_from_dates([])
+    else:
+        if archive_header != header:
+            if not set(header) <= set(archive_header):
+                raise ValueError(f"{archive_name} 시트의 헤더에 없는 열이 있습니다: "
+                                 f"{[column for column in header if column not in archive_header]}")
+            rows = [[dict(zip(header, row)).get(column, "") for column in archive_header] for row in rows]
+        existing = read_sheet_rows(archive, archive_index, dates, call_log)
+        if "date" in existing.columns:
+            existing_dates = existing["date"].astype(str).str.strip()
+            for index, date in existing_dates[existing_dates.isin(dates)].items():
+                date_rows.setdefault(date, []).append(index + 2)  # +2는 헤더와 0-based 인덱스 때문
+
+    date_column = (archive_header or header).index("date")
+    rows_by_date = [(date, list(date_values)) for date, date_values in groupby(rows, key=lambda row: row[date_column])]
+    chunks = replace_dates_chunked(archive, rows_by_date, date_rows, archive_index, call_log, total_rows=len(rows))
+    logger.info(f"📦 {archive_name} 시트에 {len(dates)}개 날짜 복사 (기존 {sum(map(len, date_rows.values()))}행 교체, "
+                f"청크 {chunks}개)")
+
+
+def archive_sheet(session, sheet_name, cutoff, archive_session=None, dry_run=False):
+    """
+    sheet_name 시트에서 cutoff 월까지의 데이터를 연도별 아카이브 시트로 옮깁니다.
+
+    Returns:
+        옮긴 행 수
+    """
+    archive_session = archive_session or session
+    call_log = ApiCallLog()
+    sheet = session.worksheet(sheet_name, call_log)
+    values = sheets_call(call_log, "get_all_values", sheet.get_all_values)
+    if not values or "date" not in values[0]:
+        logger.warning(f"⚠️ {sheet_name} 시트에 date 열이 없어 건너뜁니다.")
+        return 0
+
+    header = values[0]
+    date_column = header.index("date")
+    dates = [row[date_column].strip() if len(row) > date_column else "" for row in values[1:]]
+    by_year = {}
+    rows_to_delete = []
+    months = set()
+    for row_number, (row, date) in enumerate(zip(values[1:], dates), start=2):
+        if not date or date[:7] > cutoff:
+            continue
+        by_year.setdefault(date[:4], []).append((list(row) + [""] * len(header))[:len(header)])
+        rows_to_delete.append(row_number)
+        months.add(date[:7])
+
+    logger.info(f"🔍 {sheet_name}: {cutoff}까지 {len(rows_to_delete)}행 / 전체 {len(dates)}행 "
+                f"({', '.join(f'{year}년 {len(rows)}행' for year, rows in sorted(by_year.items())) or '옮길 데이터 없음'})")
+    if dry_run:
+        return len(rows_to_delete)
+
+    # 1) 연도별 아카이브 시트에 복사
+    for year, rows in sorted(by_year.items()):
+        copy_to_archive(archive_session, f"{sheet_name}_{year}", header, rows, call_log)
+
+    # 2) 원래 시트에서 삭제하고, 날짜 인덱스에 아카이브 월을 기록 (batchUpdate 한 번)
+    date_index = DateRowIndex(session, sheet_name, call_log).load()
+    date_index.rebuild_from_dates(dates)
+    date_index.record_delete(rows_to_delete)
+    date_index.archived_through = max(cutoff, date_index.archived_through or "")
+    if rows_to_delete:
+        replace_rows(sheet, rows_to_delete, [], call_log, date_index.save_requests())
+    else:
+        date_index.save()
+
+    # 3) 로컬 저장소의 월 파티션도 아카이브 시트 이름 아래로 옮김 (백필 시 업로더가 아카이브 시트 기준으로 비교)
+    moved = get_local_store().move_months(sheet_name, {month: archive_sheet_name(sheet_name, month) for month in months})
+    logger.info(f"✅ {sheet_name}: {len(rows_to_delete)}행 아카이브 완료 (아카이브 월: ~{date_index.archived_through}, "
+                f"로컬 저장소 파티션 {moved}개 이동, Sheets API 호출: {call_log.summary()})")
+    return len(rows_to_delete)
+
+
+def read_archived_through(session):
+    """{시트 이름: 아카이브 월(YYYY-MM)} - 날짜 인덱스(_date_index)에 아카이브 월이 기록된 시트만"""
+    try:
+        worksheet = session.worksheet(DATE_INDEX_SHEET_NAME)
+    except Exception:
+        return {}
+    values = sheets_call(None, "get_all_values", worksheet.get_all_values)
+    return {row[0]: row[3] for row in values[1:] if len(row) > 3 and row[0] and row[3]}
+
+
+def archive_local_store(archived_through, store=None):
+    """
+    로컬 저장소에서 시트별 아카이브 월까지의 파티션을 아카이브 시트 이름 아래로 옮깁니다.
+    시트 아카이브를 다른 저장소에서 실행한 경우에 사용합니다. (이미 옮긴 파티션은 그대로)
+
+    Returns:
+        옮긴 파티션 수
+    """
+    store = store or get_local_store()
+    moved = 0
+    for sheet_name, months in store.brand_months().items():
+        through = archived_through.get(sheet_name)
+        if not through:
+            continue
+        targets = {month: archive_sheet_name(sheet_name, month) for month in sorted(months) if month <= through}
+        if targets:
+            moved += store.move_months(sheet_name, targets)
+    return moved
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='마감된 월 데이터를 연도별 아카이브 시트로 옮기기')
+    parser.add_argument('--sheets', type=str, nargs='+',
+                        help='대상 시트 이름 (기본값: date 열이 있는 모든 시트, 아카이브 시트 제외)')
+    parser.add_argument('--keep-months', type=int, default=ARCHIVE_KEEP_MONTHS,
+                        help=f'원래 시트에 남길 최근 개월 수, 이번 달 포함 (기본값: {ARCHIVE_KEEP_MONTHS})')
+    parser.add_argument('--dry-run', action='store_true', help='옮길 행 수만 출력')
+    parser.add_argument('--store-only', action='store_true',
+                        help='시트는 그대로 두고, 로컬 저장소에서 이미 아카이브된 월의 파티션만 아카이브 시트 이름 아래로 옮김')
+    return parser.parse_args()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_arguments()
+
+    session = get_sheets_session(os.getenv("GOOGLE_CRED_FILE", "google_sheet_credentials.json"),
+                                 os.getenv("GOOGLE_SHEET_NAME", "Cigro Sales"))
+    if args.store_only:
+        archived_through = read_archived_through(session)
+        moved = archive_local_store(archived_through)
+        logger.info(f"💾 로컬 저장소 파티션 {moved}개를 아카이브 시트 이름 아래로 옮겼습니다. "
+                    f"(아카이브 월이 기록된 시트 {len(archived_through)}개)")
+        return
+
+    archive_session = get_archive_session(session)
+    cutoff = archive_cutoff(args.keep_months)
+    sheet_names = args.sheets or [ws.title for ws in session.worksheets()
+                                  if ws.title != DATE_INDEX_SHEET_NAME and not ARCHIVE_SHEET_PATTERN.match(ws.title)]
+    logger.info(f"🗄️ {cutoff}까지의 데이터를 아카이브합니다. (시트 {len(sheet_names)}개, 최근 {args.keep_months}개월 유지"
+                f"{', dry-run' if args.dry_run else ''})")
+
+    failed = []
+    total = 0
+    for sheet_name in sheet_names:
+        try:
+            total += archive_sheet(session, sheet_name, cutoff, archive_session, args.dry_run)
+        except Exception as e:
+            failed.append(sheet_name)
+            logger.error(f"❌ {sheet_name} 시트 아카이브 실패: {e}")
+
+    logger.info(f"📊 아카이브 {'대상' if args.dry_run else '완료'}: {total}행 / 실패 시트 {len(failed)}개")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
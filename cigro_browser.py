@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Cigro 스크래퍼 공용 브라우저 유틸리티
+- 테이블 준비 상태 감지 (고정 대기 대신 이벤트 기반 대기)
+- 페이지 이동 감지 (첫/마지막 행과 페이지 라벨 지문 비교)
+- 요청 단위 리소스 차단 (이미지/폰트/분석 스크립트 등 테이블 렌더링에 불필요한 요청)
+- 앱 내 이동 (워커당 페이지 하나를 유지하고 전체 로드 없이 URL/상태만 변경, 앱이 반응하지 않으면 워커 단위로 중단)
+- HTTP/서비스 워커 캐시 적중률 측정 (영구 프로필 사용 시)
+"""
+
+import logging
+import os
+import time
+import weakref
+from urllib.parse import parse_qsl, urlparse
+
+logger = logging.getLogger(__name__)
+
+# 리소스 차단 사용 여부 (CIGRO_RESOURCE_BLOCKING=0 으로 끌 수 있음)
+RESOURCE_BLOCKING = os.getenv("CIGRO_RESOURCE_BLOCKING", "1") == "1"
+
+# 차단할 리소스 타입 (쉼표로 구분, 예: "image,media,font")
+BLOCKED_RESOURCE_TYPES = [t.strip() for t in os.getenv("CIGRO_BLOCKED_RESOURCE_TYPES", "image,media,font").split(",") if t.strip()]
+
+# 차단할 서드파티 도메인 (분석/광고/채팅 위젯 등). CIGRO_BLOCKED_DOMAINS로 추가 가능
+BLOCKED_DOMAINS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googleadservices.com",
+    "googlesyndication.com",
+    "connect.facebook.net",
+    "facebook.com",
+    "analytics.tiktok.com",
+    "hotjar.com",
+    "clarity.ms",
+    "mixpanel.com",
+    "amplitude.com",
+    "segment.io",
+    "segment.com",
+    "intercom.io",
+    "intercomcdn.com",
+    "channel.io",
+    "sentry.io",
+    "fullstory.com",
+    "logrocket.io",
+    "youtube.com",
+    "vimeo.com",
+] + [d.strip() for d in os.getenv("CIGRO_BLOCKED_DOMAINS", "").split(",") if d.strip()]
+
+# 차단한 요청의 절감량 추정에 쓰는 리소스 타입별 평균 크기 (bytes)
+ESTIMATED_RESOURCE_BYTES = {
+    "image": 30_000,
+    "media": 300_000,
+    "font": 50_000,
+    "script": 60_000,
+    "stylesheet": 20_000,
+}
+DEFAULT_ESTIMATED_BYTES = 5_000
+
+# 앱이 테이블 데이터를 불러오는 요청 URL 조각 (Bubble 앱 데이터 API)
+APP_DATA_URL_PATTERNS = [
+    "cigro.io/elasticsearch/",
+    "cigro.io/api/",
+    "cigro.io/workflow/",
+    "cigro.io/version-",
+]
+
+# CDP 차단 모드에서 리소스 타입을 URL 패턴으로 표현 (Network.setBlockedURLs는 타입 필터가 없음)
+RESOURCE_TYPE_URL_PATTERNS = {
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.ico*"],
+    "font": ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"],
+    "media": ["*.mp4*", "*.webm*", "*.mp3*", "*.m4a*", "*.mov*"],
+}
+
+# 테이블 구조가 준비되고 DOM 변경이 quiet_ms 동안 없으면 true를 반환하는 스크립트
+# MutationObserver는 문서당 한 번만 설치하고, 마지막 변경 시각을 window에 기록합니다.
+TABLE_READY_JS = """
+({columnSelector, cellSelector, minColumns, busySelector, quietMs, abortSelector}) => {
+    if (abortSelector && document.querySelector(abortSelector)) return 'abort';
+    const columns = document.querySelectorAll(columnSelector);
+    if (columns.length < minColumns) return false;
+    if (document.querySelectorAll(cellSelector).length === 0) return false;
+    if (busySelector) {
+        const busy = document.querySelector(busySelector);
+        if (busy) {
+            const style = getComputedStyle(busy);
+            if (style.display !== 'none' && style.visibility !== 'hidden' && busy.getClientRects().length > 0) return false;
+        }
+    }
+
+    const root = columns[0].parentElement || document.body;
+    const state = window.__cigroMutationState;
+    if (!state || state.root !== root) {
+        const next = {root, last: performance.now()};
+        if (state && state.observer) state.observer.disconnect();
+        next.observer = new MutationObserver(() => { next.last = performance.now(); });
+        next.observer.observe(root, {childList: true, subtree: true, characterData: true});
+        window.__cigroMutationState = next;
+        return false;
+    }
+    return performance.now() - state.last >= quietMs;
+}
+"""
+
+TABLE_STRUCTURE_JS = """
+({columnSelector, cellSelector, minColumns}) =>
+    document.querySelectorAll(columnSelector).length >= minColumns &&
+    document.querySelectorAll(cellSelector).length > 0
+"""
+
+
+def wait_for_table_ready(page, column_selector, cell_selector, min_columns=1, busy_selector='div.greyout',
+                         quiet_ms=300, timeout=20000, poll_ms=100, abort_selector=None):
+    """
+    테이블이 실제로 사용할 수 있는 상태가 될 때까지 기다립니다.
+
+    1) column_selector 요소가 min_columns개 이상, cell_selector 요소가 1개 이상
+    2) 로딩 오버레이(busy_selector)가 보이지 않음
+    3) 테이블 영역의 DOM 변경이 quiet_ms 동안 없음
+
+    Args:
+        page: Playwright Page
+        column_selector: 컬럼(또는 헤더 셀) 선택자
+        cell_selector: 데이터 셀(또는 행) 선택자
+        min_columns: 필요한 최소 컬럼 수
+        busy_selector: 보이는 동안 준비되지 않은 것으로 보는 오버레이 선택자 (None이면 무시)
+        quiet_ms: DOM 변경이 없어야 하는 시간 (ms)
+        timeout: 전체 대기 한도 (ms)
+        poll_ms: 조건 확인 간격 (ms)
+        abort_selector: 나타나면 바로 대기를 끝내는 요소 선택자 (예: 세션 만료 시 로그인 폼)
+
+    Returns:
+        bool - 테이블 구조가 준비되었으면 True.
+        한도 안에 DOM이 잠잠해지지 않았더라도 구조가 갖춰져 있으면 True를 반환합니다.
+        abort_selector 요소가 나타나면 바로 False를 반환합니다.
+    """
+    args = {
+        "columnSelector": column_selector,
+        "cellSelector": cell_selector,
+        "minColumns": min_columns,
+        "busySelector": busy_selector,
+        "quietMs": quiet_ms,
+        "abortSelector": abort_selector,
+    }
+    started = time.monotonic()
+    try:
+        handle = page.wait_for_function(TABLE_READY_JS, arg=args, polling=poll_ms, timeout=timeout)
+        if abort_selector and handle.json_value() == 'abort':
+            logger.debug(f"테이블 대기 중단: {abort_selector} 요소가 나타남 ({(time.monotonic() - started) * 1000:.0f}ms)")
+            return False
+        logger.debug(f"테이블 준비 완료 ({(time.monotonic() - started) * 1000:.0f}ms)")
+        return True
+    except Exception:
+        pass
+
+    try:
+        structured = page.evaluate(TABLE_STRUCTURE_JS, args)
+    except Exception:
+        structured = False
+    if structured:
+        logger.warning(f"⚠️ 테이블 DOM 변경이 {timeout}ms 안에 멈추지 않았지만 데이터가 있어 진행합니다.")
+    return bool(structured)
+
+
+# 현재 페이지의 지문(첫/마지막 행, 행 수, 페이지 라벨)을 문자열로 반환하는 스크립트
+# layout='columns': 컬럼 요소마다 셀이 세로로 나열된 구조 (row i = 각 컬럼의 i번째 셀)
+# layout='rows': 행 요소(tr) 단위 구조
+PAGE_FINGERPRINT_JS = """
+(spec) => {
+    const text = (el) => el ? (el.innerText || '').trim() : '';
+    let count = 0, first = '', last = '';
+    if (spec.layout === 'columns') {
+        const columns = Array.from(document.querySelectorAll(spec.columnSelector))
+            .map((col) => col.querySelectorAll(spec.cellSelector));
+        count = columns.length ? columns[0].length : 0;
+        if (count) {
+            first = columns.map((cells) => text(cells[0])).join('\\t');
+            last = columns.map((cells) => text(cells[count - 1])).join('\\t');
+        }
+    } else {
+        const rows = document.querySelectorAll(spec.rowSelector);
+        count = rows.length;
+        if (count) {
+            first = text(rows[0]);
+            last = text(rows[count - 1]);
+        }
+    }
+    const label = (spec.labelSelectors || []).map((sel) => text(document.querySelector(sel))).join('|');
+    return JSON.stringify([label, count, first, last]);
+}
+"""
+
+PAGE_CHANGED_JS = f"""
+(args) => {{
+    if (args.busySelector) {{
+        const busy = document.querySelector(args.busySelector);
+        if (busy && getComputedStyle(busy).display !== 'none' && busy.getClientRects().length > 0) return false;
+    }}
+    const [label, count, first, last] = JSON.parse(({PAGE_FINGERPRINT_JS.strip()})(args.spec));
+    const [beforeLabel, , beforeFirst, beforeLast] = JSON.parse(args.before);
+    // 라벨만 먼저 바뀌고 행이 아직 이전 페이지인 경우를 피하기 위해 행 내용 변경을 필수로 봄
+    const rowsChanged = count > 0 && (first !== beforeFirst || last !== beforeLast);
+    const labelChanged = !label || label !== beforeLabel;
+    return rowsChanged && labelChanged;
+}}
+"""
+
+
+def read_page_fingerprint(page, spec):
+    """현재 페이지의 지문 문자열을 반환합니다. spec은 PAGE_FINGERPRINT_JS 설명 참고."""
+    return page.evaluate(PAGE_FINGERPRINT_JS, spec)
+
+
+def click_and_wait_for_page_change(page, click, spec, busy_selector='div.greyout', timeout=15000,
+                                   retries=1, poll_ms=100):
+    """
+    click()으로 다음 페이지로 이동한 뒤 행 지문이 바뀔 때까지 기다립니다.
+    첫/마지막 행이 바뀌고, 페이지 라벨이 있으면 라벨도 바뀌어야 이동한 것으로 봅니다.
+
+    지문이 바뀌지 않으면(클릭이 반영되지 않음) retries만큼 다시 클릭하고,
+    끝내 바뀌지 않으면 False를 반환합니다. 호출부는 이때 같은 행을 다시 저장하지 않고 중단해야 합니다.
+
+    Args:
+        page: Playwright Page
+        click: 다음 페이지 버튼을 클릭하는 함수 (인자 없음)
+        spec: 지문 계산 설정 (layout, columnSelector/cellSelector 또는 rowSelector, labelSelectors)
+        busy_selector: 보이는 동안 이동 중으로 보는 로딩 오버레이 선택자
+        timeout: 클릭 1회당 대기 한도 (ms)
+        retries: 지문이 바뀌지 않을 때 다시 클릭할 횟수
+
+    Returns:
+        bool - 페이지가 바뀌었으면 True
+    """
+    before = read_page_fingerprint(page, spec)
+
+    for attempt in range(retries + 1):
+        # 이전 로딩 오버레이가 남아 있으면 클릭이 먹히지 않으므로 먼저 대기
+        if busy_selector:
+            try:
+                page.wait_for_selector(busy_selector, state='hidden', timeout=timeout)
+            except Exception:
+                pass
+
+        click()
+        try:
+            page.wait_for_function(
+                PAGE_CHANGED_JS,
+                arg={"spec": spec, "before": before, "busySelector": busy_selector},
+                polling=poll_ms,
+                timeout=timeout,
+            )
+            return True
+        except Exception:
+            if attempt < retries:
+                logger.warning(f"⚠️ 페이지 이동이 감지되지 않아 다시 클릭합니다. ({attempt + 1}/{retries})")
+
+    logger.warning("⚠️ 페이지 이동 후에도 행이 바뀌지 않았습니다. 중복 수집을 막기 위해 중단합니다.")
+    return False
+
+
+class ResourceBlocker:
+    """
+    BrowserContext의 모든 요청을 context.route로 검사해 불필요한 리소스를 차단합니다.
+
+    페이지가 닫힐 때 해당 페이지에서 차단한 요청 수와 절감량(추정), 실제 받은 용량을 로그로 남기고,
+    summary()로 컨텍스트 전체 누적값을 확인할 수 있습니다.
+
+    context.route를 쓰면 HTTP 캐시가 꺼지므로, 디스크 캐시를 살려야 하는 영구 프로필에서는
+    use_cdp=True로 설치해 CDP Network.setBlockedURLs(URL 패턴)로 차단합니다.
+    """
+
+    def __init__(self, resource_types=None, domains=None):
+        self.resource_types = set(BLOCKED_RESOURCE_TYPES if resource_types is None else resource_types)
+        self.domains = list(BLOCKED_DOMAINS if domains is None else domains)
+        self.totals = {"pages": 0, "blocked_requests": 0, "saved_bytes": 0, "loaded_requests": 0, "loaded_bytes": 0}
+        self._page_stats = {}
+        self._context = None
+        self._use_cdp = False
+
+    def install(self, context, use_cdp=False):
+        self._context = context
+        self._use_cdp = use_cdp
+        if not use_cdp:
+            context.route("**/*", self._handle_route)
+        context.on("page", self._track_page)
+        for page in context.pages:
+            self._track_page(page)
+        return self
+
+    def blocked_url_patterns(self):
+        patterns = []
+        for resource_type in sorted(self.resource_types):
+            patterns.extend(RESOURCE_TYPE_URL_PATTERNS.get(resource_type, []))
+        patterns.extend(f"*://*{domain}/*" for domain in self.domains)
+        return patterns
+
+    def is_blocked(self, url, resource_type):
+        if resource_type in self.resource_types:
+            return True
+        host = urlparse(url).hostname or ""
+        return any(host == domain or host.endswith("." + domain) for domain in self.domains)
+
+    def _stats_for(self, page):
+        return self._page_stats.setdefault(id(page), {"blocked_requests": 0, "saved_bytes": 0,
+                                                      "loaded_requests": 0, "loaded_bytes": 0})
+
+    def _track_page(self, page):
+        self._stats_for(page)
+        page.on("response", lambda response: self._record_response(page, response))
+        page.on("close", lambda _: self._report_page(page))
+        if self._use_cdp:
+            try:
+                session = self._context.new_cdp_session(page)
+                session.send("Network.enable")
+                session.send("Network.setBlockedURLs", {"urls": self.blocked_url_patterns()})
+                session.on("Network.loadingFailed", lambda params: self._record_cdp_failure(page, params))
+            except Exception as e:
+                logger.warning(f"⚠️ CDP 리소스 차단 설정 실패: {e}")
+
+    def _record_cdp_failure(self, page, params):
+        if params.get("blockedReason") != "inspector":
+            return
+        resource_type = str(params.get("type", "")).lower()
+        saved = ESTIMATED_RESOURCE_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+        for target in (self._stats_for(page), self.totals):
+            target["blocked_requests"] += 1
+            target["saved_bytes"] += saved
+
+    def _handle_route(self, route):
+        request = route.request
+        if not self.is_blocked(request.url, request.resource_type):
+            route.continue_()
+            return
+
+        route.abort("blockedbyclient")
+        try:
+            stats = self._stats_for(request.frame.page)
+        except Exception:
+            stats = None  # 서비스 워커 등 페이지에 속하지 않는 요청
+        saved = ESTIMATED_RESOURCE_BYTES.get(request.resource_type, DEFAULT_ESTIMATED_BYTES)
+        for target in (stats, self.totals):
+            if target is not None:
+                target["blocked_requests"] += 1
+                target["saved_bytes"] += saved
+
+    def _record_response(self, page, response):
+        try:
+            size = int(response.headers.get("content-length", 0))
+        except (TypeError, ValueError):
+            size = 0
+        stats = self._stats_for(page)
+        for target in (stats, self.totals):
+            target["loaded_requests"] += 1
+            target["loaded_bytes"] += size
+
+    def _report_page(self, page):
+        stats = self._page_stats.pop(id(page), None)
+        if not stats:
+            return
+        self.totals["pages"] += 1
+        logger.info(
+            f"🧹 리소스 차단: 요청 {stats['blocked_requests']}건 차단 "
+            f"(약 {stats['saved_bytes'] / 1024:.0f}KB 절감), "
+            f"실제 로드 {stats['loaded_requests']}건 / {stats['loaded_bytes'] / 1024:.0f}KB"
+        )
+
+    def summary(self):
+        return dict(self.totals)
+
+
+def install_resource_blocking(context, enabled=None, use_cdp=False):
+    """설정에 따라 컨텍스트에 ResourceBlocker를 설치하고 반환합니다. 비활성화면 None."""
+    if not (RESOURCE_BLOCKING if enabled is None else enabled):
+        return None
+    return ResourceBlocker().install(context, use_cdp=use_cdp)
+
+
+class CacheStats:
+    """
+    CDP 네트워크 이벤트로 컨텍스트의 캐시 적중률을 집계합니다.
+
+    메모리/디스크 HTTP 캐시 또는 서비스 워커에서 응답한 요청을 적중으로 보고,
+    네트워크로 실제 받은 용량(encodedDataLength)도 함께 기록합니다.
+    """
+
+    def __init__(self):
+        self.totals = {"responses": 0, "cache_hits": 0, "service_worker_hits": 0, "network_bytes": 0}
+        self._context = None
+
+    def install(self, context):
+        self._context = context
+        context.on("page", self._track_page)
+        for page in context.pages:
+            self._track_page(page)
+        return self
+
+    def _track_page(self, page):
+        try:
+            session = self._context.new_cdp_session(page)
+            served_from_cache = set()
+            session.on("Network.requestServedFromCache", lambda params: served_from_cache.add(params.get("requestId")))
+            session.on("Network.responseReceived", lambda params: self._record_response(params, served_from_cache))
+            session.on("Network.loadingFinished", self._record_finished)
+            session.send("Network.enable")
+        except Exception as e:
+            logger.warning(f"⚠️ 캐시 통계 설정 실패: {e}")
+
+    def _record_response(self, params, served_from_cache):
+        response = params.get("response", {})
+        self.totals["responses"] += 1
+        if response.get("fromServiceWorker"):
+            self.totals["service_worker_hits"] += 1
+        elif response.get("fromDiskCache") or response.get("fromPrefetchCache") or params.get("requestId") in served_from_cache:
+            self.totals["cache_hits"] += 1
+
+    def _record_finished(self, params):
+        self.totals["network_bytes"] += int(params.get("encodedDataLength") or 0)
+
+    def summary(self):
+        stats = dict(self.totals)
+        hits = stats["cache_hits"] + stats["service_worker_hits"]
+        stats["hit_ratio"] = hits / stats["responses"] if stats["responses"] else 0.0
+        return stats
+
+
+# 앱 내 이동: 로드된 앱에서 URL만 바꾸고 popstate를 발생시켜 앱이 URL 파라미터를 다시 읽게 함
+PUSH_STATE_JS = """
+(url) => {
+    history.pushState({}, '', url);
+    window.dispatchEvent(new PopStateEvent('popstate', {state: {}}));
+}
+"""
+
+# 앱의 로드 완료 상태: URL 파라미터가 반영되고 로딩 오버레이가 사라졌으며, 페이지 라벨이 첫 페이지를 가리킴
+# (같은 내용/빈 테이블로 바뀌는 경우도 있으므로 행 변경은 조건으로 보지 않음)
+NAVIGATION_SETTLED_JS = f"""
+(args) => {{
+    const search = new URLSearchParams(location.search);
+    for (const [key, value] of Object.entries(args.params)) {{
+        if (search.get(key) !== value) return false;
+    }}
+    if (args.busySelector) {{
+        const busy = document.querySelector(args.busySelector);
+        if (busy && getComputedStyle(busy).display !== 'none' && busy.getClientRects().length > 0) return false;
+    }}
+    const [label] = JSON.parse(({PAGE_FINGERPRINT_JS.strip()})(args.spec));
+    return !args.spec.firstPagePattern || !label || new RegExp(args.spec.firstPagePattern).test(label);
+}}
+"""
+
+# BrowserContext별로 재사용하는 페이지 (워커마다 컨텍스트가 따로 있으므로 워커당 하나)
+_warm_pages = weakref.WeakKeyDictionary()
+
+# BrowserContext별 앱 내 이동 지원 여부 (True: 앱이 popstate에 반응함, False: 반응하지 않아 이후 시도하지 않음)
+_in_app_navigation = weakref.WeakKeyDictionary()
+
+
+def is_app_data_request(request):
+    """앱이 테이블 데이터를 불러오는 요청(XHR/fetch)인지 확인합니다."""
+    return request.resource_type in ("xhr", "fetch") and any(pattern in request.url for pattern in APP_DATA_URL_PATTERNS)
+
+
+def get_warm_page(context):
+    """컨텍스트에서 재사용 중인 페이지를 반환합니다. 없거나 닫혔으면 새로 엽니다."""
+    page = _warm_pages.get(context)
+    if page is None or page.is_closed():
+        page = context.new_page()
+        _warm_pages[context] = page
+    return page
+
+
+def discard_warm_page(context):
+    """재사용 페이지를 닫아 다음 작업이 새 페이지에서 전체 로드하도록 합니다."""
+    page = _warm_pages.pop(context, None)
+    if page is not None:
+        try:
+            page.close()
+        except Exception:
+            pass
+
+
+def is_app_loaded(page, app_url="https://app.cigro.io"):
+    return page.url.startswith(app_url)
+
+
+def navigate_in_app(page, url, spec, busy_selector='div.greyout', timeout=10000, react_timeout=3000, poll_ms=100):
+    """
+    이미 앱이 로드된 페이지에서 전체 로드 없이 url로 이동합니다.
+
+    history.pushState + popstate로 URL 파라미터를 바꾼 뒤, 앱이 데이터 요청으로 반응하는지 react_timeout 동안 확인하고
+    응답을 받은 뒤 앱의 로드 완료 상태(NAVIGATION_SETTLED_JS)가 될 때까지 기다립니다.
+    컨텍스트(워커)의 첫 이동에서 앱이 반응하지 않으면 popstate를 무시하는 것으로 보고, 그 컨텍스트에서는 더 시도하지 않습니다.
+
+    Returns:
+        bool - 이동이 확인되면 True. False면 호출부에서 page.goto로 전체 로드해야 합니다.
+    """
+    context = page.context
+    if _in_app_navigation.get(context) is False:
+        return False
+
+    params = dict(parse_qsl(urlparse(url).query))
+    started = time.monotonic()
+    try:
+        try:
+            with page.expect_response(lambda response: is_app_data_request(response.request), timeout=react_timeout):
+                page.evaluate(PUSH_STATE_JS, url)
+        except Exception as e:
+            if context not in _in_app_navigation:
+                _in_app_navigation[context] = False
+                logger.warning(f"⚠️ 앱이 URL 변경(popstate)에 반응하지 않아 이 워커는 이후 전체 로드로 이동합니다: {e}")
+            else:
+                logger.warning(f"⚠️ 앱 내 이동 후 데이터 요청이 없어 전체 로드합니다: {e}")
+            return False
+        _in_app_navigation[context] = True
+
+        page.wait_for_function(
+            NAVIGATION_SETTLED_JS,
+            arg={"params": params, "spec": spec, "busySelector": busy_selector},
+            polling=poll_ms,
+            timeout=timeout,
+        )
+        logger.debug(f"앱 내 이동 완료 ({(time.monotonic() - started) * 1000:.0f}ms)")
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ 앱 내 이동이 확인되지 않아 전체 로드합니다: {e}")
+        return False
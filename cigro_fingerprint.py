@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Cigro 변경 감지 지문
+- 전체 페이지를 넘기기 전에 싼 신호(페이지 수 라벨, 첫 페이지 행, 화면의 합계)만 읽어 지문을 만듦
+- 로컬 저장소에 (리포트, 브랜드, 날짜)별로 기록된 지난 지문과 같으면 나머지 페이지 이동을 생략하고,
+  저장소 데이터를 "변경 없음 확인(verified unchanged)" 결과로 사용
+- 지문은 그 날짜 데이터가 Sheets에 반영된 뒤 업로더가 기록하고, 저장소 데이터가 바뀌면 지워짐
+
+첫 페이지 밖의 행만 바뀌고 페이지 수가 같으면 변경을 놓칠 수 있으므로 기본값은 꺼짐입니다.
+화면의 합계처럼 전체 데이터가 반영되는 신호(CIGRO_TOTALS_SELECTORS)가 있을 때 CIGRO_CHANGE_CHECK=1
+(cigro_yesterday.py는 --change-check)로 켜세요. 지문만 일치한 날짜는 스크래핑 시각을 기록하지 않으므로
+정산 기간 동결(cigro_planner)은 전체 스크래핑으로만 확정됩니다.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+import pandas as pd
+
+from cigro_archive import archive_sheet_name
+from cigro_store import get_local_store
+
+logger = logging.getLogger(__name__)
+
+# 지난 지문과 비교해 변경이 없으면 전체 페이지 이동 생략 (기본값: 꺼짐)
+CHANGE_CHECK = os.getenv("CIGRO_CHANGE_CHECK", "0") == "1"
+
+# 지정한 요소들의 텍스트를 읽는 스크립트 (선택자마다 일치하는 요소 텍스트를 '|'로 연결)
+READ_TEXTS_JS = """
+(selectors) => selectors.map((sel) =>
+    Array.from(document.querySelectorAll(sel)).map((el) => (el.innerText || '').trim()).join('|'))
+"""
+
+
+def read_texts(page, selectors):
+    """선택자별 요소 텍스트 목록 (합계 등). 선택자가 없으면 페이지를 조회하지 않습니다."""
+    if not selectors:
+        return []
+    return page.evaluate(READ_TEXTS_JS, list(selectors))
+
+
+def page_fingerprint(label, rows, totals=()):
+    """페이지 수 라벨, 첫 페이지 행, 합계 텍스트로 만든 지문"""
+    payload = json.dumps([label or "", rows, list(totals)], ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class ChangeCheck:
+    """(리포트, 시트, 날짜)의 지난 지문과 새 지문을 비교합니다."""
+
+    def __init__(self, report, sheet_name, date, store=None):
+        self.report = report
+        self.date = str(date).strip()
+        self.store = store or get_local_store()
+        self.fingerprint = None
+        self.store_name = None
+        # 아카이브된 월의 날짜는 로컬 저장소에서도 아카이브 시트 이름 아래에 있음 (cigro_archive)
+        for name in (sheet_name, archive_sheet_name(sheet_name, self.date)):
+            fingerprint = self.store.fingerprints(report, name, [self.date]).get(self.date)
+            if fingerprint:
+                self.fingerprint, self.store_name = fingerprint, name
+                break
+
+    def verify(self, fingerprint):
+        """
+        fingerprint가 지난 지문과 같으면 저장소 데이터를 "변경 없음 확인" 결과로 반환합니다.
+        첫 페이지 밖의 변경을 놓쳤을 수 있으므로 스크래핑 시각은 기록하지 않습니다. (지문 일치로 날짜가 동결되지 않도록)
+
+        Returns:
+            DataFrame 또는 None (지난 지문이 없거나 다르면)
+        """
+        if not self.fingerprint or fingerprint != self.fingerprint:
+            return None
+        df, _ = self.store.load(self.report, self.store_name, [self.date])
+        if df.empty:
+            return None
+        df.attrs["verified_dates"] = [self.date]
+        return df
+
+
+def with_fingerprint(df, date, fingerprint):
+    """스크래핑 결과에 날짜의 지문을 붙입니다. 업로더가 Sheets 반영 후 저장소에 기록합니다."""
+    df.attrs["fingerprints"] = {str(date).strip(): fingerprint}
+    return df
+
+
+def scraped_fingerprints(df):
+    """{날짜: 지문} - 지문 없이 얻은 데이터(네트워크 캡처, outbox)는 빈 dict"""
+    return dict(df.attrs.get("fingerprints") or {})
+
+
+def verified_dates(df):
+    return list(df.attrs.get("verified_dates") or [])
+
+
+def split_verified(df):
+    """
+    "변경 없음 확인" 날짜를 뺀 데이터와 그 날짜 목록을 반환합니다.
+    해당 날짜는 저장소/Sheets에 이미 같은 데이터가 있으므로 업로드하지 않습니다.
+    """
+    verified = verified_dates(df)
+    if not verified or "date" not in df.columns:
+        return df, []
+    return df[~df["date"].astype(str).str.strip().isin(verified)], verified
+
+
+def combine_frames(dfs):
+    """
+    여러 날짜의 스크래핑 결과를 합칩니다.
+    pd.concat은 attrs가 서로 다르면 버리므로 지문과 "변경 없음 확인" 날짜를 따로 합칩니다.
+    """
+    combined = pd.concat(dfs, ignore_index=True)
+    fingerprints = {}
+    verified = []
+    for df in dfs:
+        fingerprints.update(scraped_fingerprints(df))
+        verified.extend(verified_dates(df))
+    combined.attrs = {"fingerprints": fingerprints, "verified_dates": verified}
+    return combined
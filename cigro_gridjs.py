@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Cigro gridjs 전체 데이터 추출 모듈
+- gridjs는 보통 전체 행을 브라우저에 들고 화면만 페이지로 나눠 보여줌
+- 1) gridjs 설정(config)의 파이프라인 캐시/스토어에서 전체 행을 page.evaluate() 한 번으로 읽음
+  (셀 값이 화면 표시값과 같을 때만 사용: 첫 페이지 행과 앞부분이 일치하고, 요약 문구의 전체 건수와 행 수가 같아야 함)
+- 2) 1)을 쓸 수 없으면 gridjs 인스턴스의 페이지 크기(pagination.limit)를 전체 건수로 올려 다시 그리고,
+  모든 행을 page.evaluate() 한 번으로 읽음 (실패하면 원래 페이지 크기로 되돌림)
+- 둘 다 안 되면 None을 반환 → 호출부에서 Next 버튼으로 페이지 이동
+
+gridjs 설정은 Preact 렌더 트리(렌더 대상 DOM의 __k → vnode.__k 자식, vnode.__c 컴포넌트)에서 찾습니다.
+"""
+
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# 전체 데이터 추출 사용 여부 (끄면 항상 페이지 이동)
+GRID_DATASET = os.getenv("CIGRO_GRID_DATASET", "1") == "1"
+
+# gridjs 루트/요약 문구 선택자
+GRID_ROOT_SELECTOR = 'div.gridjs-container'
+GRID_SUMMARY_SELECTOR = '.gridjs-summary'
+
+# gridjs 설정 객체를 찾는 함수 (Grid 인스턴스는 config.instance)
+FIND_GRID_CONFIG_JS = """
+(rootSelector) => {
+    const root = document.querySelector(rootSelector);
+    if (!root) return null;
+    const isConfig = (v) => !!v && typeof v === 'object' && !!(v.pipeline || v.store)
+        && !!(v.instance || v.header || v.columns || v.data || v.server);
+    const seen = new Set();
+    const visit = (vnode) => {
+        if (!vnode || typeof vnode !== 'object' || seen.has(vnode)) return null;
+        seen.add(vnode);
+        const props = vnode.props || {};
+        const component = vnode.__c || {};
+        for (const v of [props.config, props.value, component.props && component.props.config, component.config]) {
+            if (isConfig(v)) return v;
+        }
+        for (const child of (Array.isArray(vnode.__k) ? vnode.__k : [])) {
+            const found = visit(child);
+            if (found) return found;
+        }
+        return null;
+    };
+    for (let el = root; el; el = el.parentElement) {
+        if (el.__k) {
+            const found = visit(el.__k);
+            if (found) return found;
+        }
+    }
+    return null;
+}
+"""
+
+# 설정이 가진 행 집합(파이프라인 단계별 캐시, 스토어, 원본 배열) 중 화면 첫 페이지와 앞부분이 같은 것을 반환
+READ_DATASET_JS = f"""
+(args) => {{
+    const config = ({FIND_GRID_CONFIG_JS.strip()})(args.rootSelector);
+    if (!config) return {{error: 'gridjs 설정을 찾지 못함'}};
+    // html()/h()로 만든 셀은 문자열로 바꿀 수 없음 → null
+    const text = (value) => value === null || value === undefined ? ''
+        : typeof value === 'object' ? null : String(value).trim();
+    const tables = [];
+    const addTabular = (tabular) => {{
+        if (tabular && Array.isArray(tabular.rows)) {{
+            tables.push(tabular.rows.map((row) => (row.cells || []).map((cell) =>
+                cell && typeof cell === 'object' && 'data' in cell ? cell.data : cell)));
+        }}
+    }};
+    const cache = config.pipeline && config.pipeline.cache;
+    if (cache && typeof cache.forEach === 'function') cache.forEach(addTabular);
+    const state = config.store && (typeof config.store.getState === 'function' ? config.store.getState() : config.store.state);
+    if (state) addTabular(state.data);
+    if (Array.isArray(config.data)) tables.push(config.data.filter(Array.isArray));
+
+    // 숨김 열은 화면에 없음
+    const columns = (config.header && config.header.columns) || [];
+    tables.sort((a, b) => b.length - a.length);
+    for (const rows of tables) {{
+        if (rows.length < args.visible.length || (args.total && rows.length !== args.total)) continue;
+        const shown = columns.length && columns.length === (rows[0] || []).length
+            ? rows.map((cells) => cells.filter((_, i) => !columns[i].hidden)) : rows;
+        const values = shown.map((cells) => cells.map(text));
+        if (values.some((cells) => cells.includes(null))) continue;
+        if (args.visible.every((cells, i) => JSON.stringify(cells) === JSON.stringify(values[i]))) {{
+            return {{rows: values}};
+        }}
+    }}
+    return {{error: `화면과 일치하는 행 집합 없음 (후보 ${{tables.length}}개)`}};
+}}
+"""
+
+# 페이지 크기를 바꿔 다시 그림 (원래 pagination 설정은 window에 보관해 되돌릴 때 사용)
+SET_PAGE_LIMIT_JS = f"""
+(args) => {{
+    const config = ({FIND_GRID_CONFIG_JS.strip()})(args.rootSelector);
+    const grid = config && config.instance;
+    if (!grid || typeof grid.updateConfig !== 'function' || typeof grid.forceRender !== 'function') return false;
+    if (!('__cigroGridPagination' in window)) window.__cigroGridPagination = grid.config.pagination;
+    const original = window.__cigroGridPagination;
+    const pagination = args.limit === null ? original
+        : {{...(original && typeof original === 'object' ? original : {{}}), limit: args.limit}};
+    if (args.limit === null) delete window.__cigroGridPagination;
+    grid.updateConfig({{pagination}}).forceRender();
+    return true;
+}}
+"""
+
+# 현재 화면의 모든 행을 셀 텍스트 목록으로
+READ_ROWS_JS = """
+(args) => Array.from(document.querySelectorAll(args.rowSelector)).map((row) =>
+    Array.from(row.querySelectorAll(args.cellSelector)).map((cell) => (cell.innerText || '').trim()))
+"""
+
+# 헤더 셀 텍스트 목록
+READ_HEADERS_JS = """
+(selector) => Array.from(document.querySelectorAll(selector)).map((cell) => (cell.innerText || '').trim())
+"""
+
+# 행 수가 count가 되고(at_least면 count 이상) 로딩 오버레이가 사라질 때까지 대기
+ROW_COUNT_JS = """
+(args) => {
+    if (args.busySelector) {
+        const busy = document.querySelector(args.busySelector);
+        if (busy && getComputedStyle(busy).display !== 'none' && busy.getClientRects().length > 0) return false;
+    }
+    const count = document.querySelectorAll(args.rowSelector).length;
+    return args.atLeast ? count >= args.count : count === args.count;
+}
+"""
+
+
+def read_grid_total(page, summary_selector=GRID_SUMMARY_SELECTOR):
+    """
+    요약 문구(예: "Showing 1 to 10 of 253 results")의 전체 건수. 요약 문구가 없으면 None
+    문구 안의 가장 큰 숫자를 전체 건수로 봅니다.
+    """
+    element = page.query_selector(summary_selector)
+    numbers = [int(n.replace(",", "")) for n in re.findall(r"\d[\d,]*", element.inner_text())] if element else []
+    return max(numbers) if numbers else None
+
+
+def read_grid_headers(page, header_selector):
+    """헤더 셀 텍스트를 page.evaluate() 한 번으로 읽습니다."""
+    return page.evaluate(READ_HEADERS_JS, header_selector)
+
+
+def read_grid_rows(page, row_selector, cell_selector):
+    """현재 화면의 모든 행을 page.evaluate() 한 번으로 읽습니다."""
+    return page.evaluate(READ_ROWS_JS, {"rowSelector": row_selector, "cellSelector": cell_selector})
+
+
+def read_grid_dataset(page, visible_rows, total=None, root_selector=GRID_ROOT_SELECTOR):
+    """
+    gridjs 설정이 가진 전체 행을 읽습니다. visible_rows(화면 첫 페이지 행)와 앞부분이 같고,
+    total이 있으면 행 수도 같은 행 집합만 반환합니다.
+
+    Returns:
+        [[셀 텍스트, ...], ...] 또는 None
+    """
+    result = page.evaluate(READ_DATASET_JS, {"rootSelector": root_selector, "visible": visible_rows, "total": total})
+    if not result or result.get("rows") is None:
+        logger.info(f"ℹ️ gridjs 설정에서 전체 데이터를 읽지 못함: {(result or {}).get('error')}")
+        return None
+    return result["rows"]
+
+
+def _wait_for_row_count(page, row_selector, count, at_least, busy_selector, timeout):
+    try:
+        page.wait_for_function(
+            ROW_COUNT_JS,
+            arg={"rowSelector": row_selector, "count": count, "atLeast": at_least, "busySelector": busy_selector},
+            polling=100,
+            timeout=timeout,
+        )
+        return True
+    except Exception:
+        return False
+
+
+def read_expanded_grid(page, visible_rows, total, row_selector, cell_selector, root_selector=GRID_ROOT_SELECTOR,
+                       busy_selector='div.greyout', timeout=20000):
+    """
+    gridjs 페이지 크기를 total로 올려 한 화면에 모든 행을 그린 뒤 읽습니다.
+    읽은 행이 total과 다르거나 첫 페이지 행과 앞부분이 다르면 원래 페이지 크기로 되돌리고 None을 반환합니다.
+
+    Raises:
+        RuntimeError: 원래 페이지 크기로 되돌리지 못했을 때 (호출부가 같은 화면에서 페이지 이동을 이어갈 수 없음)
+    """
+    if not page.evaluate(SET_PAGE_LIMIT_JS, {"rootSelector": root_selector, "limit": total}):
+        logger.info("ℹ️ gridjs 인스턴스를 찾지 못해 페이지 크기를 바꿀 수 없음")
+        return None
+
+    rows = None
+    if _wait_for_row_count(page, row_selector, total, True, busy_selector, timeout):
+        rows = read_grid_rows(page, row_selector, cell_selector)
+    if rows and len(rows) == total and rows[:len(visible_rows)] == visible_rows:
+        return rows
+
+    logger.warning(f"⚠️ 페이지 크기 변경 후 행이 {len(rows or [])}개로 전체 {total}개와 다릅니다. 원래 페이지 크기로 되돌립니다.")
+    page.evaluate(SET_PAGE_LIMIT_JS, {"rootSelector": root_selector, "limit": None})
+    if not (_wait_for_row_count(page, row_selector, len(visible_rows), False, busy_selector, timeout)
+            and read_grid_rows(page, row_selector, cell_selector) == visible_rows):
+        raise RuntimeError("gridjs 페이지 크기를 원래대로 되돌리지 못했습니다.")
+    return None
+
+
+def extract_full_grid(page, visible_rows, row_selector, cell_selector, summary_selector=GRID_SUMMARY_SELECTOR,
+                      root_selector=GRID_ROOT_SELECTOR):
+    """
+    첫 페이지에서 페이지 이동 없이 gridjs 테이블의 전체 행을 읽습니다.
+    설정의 행 집합 → 페이지 크기 확대 순서로 시도하고, 둘 다 안 되면 None을 반환합니다.
+    """
+    try:
+        total = read_grid_total(page, summary_selector)
+        rows = read_grid_dataset(page, visible_rows, total, root_selector)
+        if rows is not None:
+            logger.info(f"📦 gridjs 설정에서 전체 {len(rows)}행 추출 (페이지 이동 생략)")
+            return rows
+        if total is None:
+            return None
+        rows = read_expanded_grid(page, visible_rows, total, row_selector, cell_selector, root_selector)
+        if rows is not None:
+            logger.info(f"📦 gridjs 페이지 크기를 {total}행으로 올려 전체 {len(rows)}행 추출 (페이지 이동 생략)")
+        return rows
+    except RuntimeError:
+        raise
+    except Exception as e:
+        logger.warning(f"⚠️ gridjs 전체 데이터 추출 실패: {e}")
+        return None
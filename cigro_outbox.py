@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Cigro 업로드 outbox
+- Sheets 업로드에 실패한 데이터를 (리포트, 시트, 업로드 옵션, 데이터) JSON 파일로 디스크에 보관
+- 다음 실행 시작 시 또는 flush-outbox 명령으로 먼저 다시 업로드하고, 성공한 항목만 삭제
+- 일시적인 Sheets 오류 때문에 스크래핑을 다시 할 필요가 없도록 함
+- 다시 업로드한 날짜의 스크래핑 시각은 재업로드 시각이 아니라 항목 생성(스크래핑 직후) 시각으로 기록
+  (정산 기간 전에 스크래핑한 데이터가 정산 기간이 지나 재업로드되어도 동결되지 않도록, cigro_planner)
+
+파일 구조:
+    .cigro_outbox/<생성 시각>_<리포트>_<시트>_<id>.json
+
+사용 예:
+    python cigro_outbox.py status
+    python cigro_outbox.py flush-outbox --reports ad/campaign ad/ad
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime
+
+import pandas as pd
+
+from cigro_sheets import SHEETS_QUOTA, run_uploads
+from cigro_store import KST
+
+logger = logging.getLogger(__name__)
+
+# outbox 디렉토리
+OUTBOX_DIR = os.getenv("CIGRO_OUTBOX_DIR", ".cigro_outbox")
+
+# 리포트 → (upload_to_google_sheets를 가진 모듈, 항목 옵션에 더할 기본 인수)
+# 업로더 모듈이 이 모듈을 import하므로 이름으로 지정
+UPLOAD_MODULES = {
+    "product/option": ("cigro_yesterday", {}),
+    "ad/campaign": ("cigro_ads", {"group_by": "campaign"}),
+    "ad/adset": ("cigro_ads", {"group_by": "adset"}),
+    "ad/ad": ("cigro_ads", {"group_by": "ad"}),
+}
+
+
+class UploadOutbox:
+    """업로드에 실패한 데이터를 항목당 JSON 파일 하나로 보관합니다."""
+
+    def __init__(self, root=OUTBOX_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def add(self, report, sheet_name, df, options=None, error=None):
+        """
+        업로드할 데이터를 outbox에 기록합니다.
+        options는 업로드 함수에 그대로 넘길 키워드 인수 (예: upload_mode, selected_date)
+        """
+        created_at = datetime.now(KST)
+        entry = {
+            "report": report,
+            "sheet_name": sheet_name,
+            "options": options or {},
+            "created_at": created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            "attempts": 0,
+            "last_error": str(error) if error is not None else "업로드 실패 (원인 미상)",
+            "data": json.loads(df.to_json(orient="split", index=False, force_ascii=False)),
+        }
+        file_name = f"{created_at:%Y%m%d%H%M%S%f}_{report.replace('/', '_')}_{sheet_name}_{uuid.uuid4().hex[:8]}.json"
+        path = os.path.join(self.root, file_name)
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            self._write(path, entry)
+        logger.warning(f"📮 [{report}] {sheet_name} 업로드 실패 데이터 {len(df)}행을 outbox에 보관: {path}")
+        return path
+
+    @staticmethod
+    def _write(path, entry):
+        # 쓰는 도중 중단되어도 반쯤 쓴 파일이 남지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def entries(self, reports=None):
+        """[(파일 경로, 항목)] - 생성 순서대로"""
+        if not os.path.isdir(self.root):
+            return []
+        results = []
+        for file_name in sorted(os.listdir(self.root)):
+            if not file_name.endswith(".json"):
+                continue
+            path = os.path.join(self.root, file_name)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"❌ outbox 항목을 읽을 수 없습니다: {path} ({e})")
+                continue
+            if reports and entry["report"] not in reports:
+                continue
+            results.append((path, entry))
+        return results
+
+    def record_failure(self, path, entry, error):
+        entry["attempts"] += 1
+        entry["last_error"] = str(error)
+        with self._lock:
+            self._write(path, entry)
+
+    def remove(self, path):
+        with self._lock:
+            os.remove(path)
+
+
+def entry_frame(entry):
+    data = entry["data"]
+    return pd.DataFrame(data["data"], columns=data["columns"])
+
+
+def upload_entry(entry):
+    """
+    outbox 항목 하나를 원래 리포트의 업로드 함수로 업로드합니다. 실패하면 예외를 발생시킵니다.
+    저장소의 스크래핑 시각은 항목 생성 시각(KST)으로 기록합니다.
+    """
+    module_name, defaults = UPLOAD_MODULES[entry["report"]]
+    module = importlib.import_module(module_name)
+    scraped_at = datetime.strptime(entry["created_at"], '%Y-%m-%d %H:%M:%S').replace(tzinfo=KST)
+    uploaded = module.upload_to_google_sheets(entry_frame(entry), entry["sheet_name"],
+                                              **{**defaults, **entry["options"]}, scraped_at=scraped_at)
+    if uploaded is False:
+        raise RuntimeError("업로드 실패")
+
+
+def flush_outbox(reports=None, upload_concurrency=4, outbox=None):
+    """
+    outbox 항목들을 다시 업로드합니다. 같은 시트의 항목은 생성 순서대로 업로드합니다.
+
+    Returns:
+        (성공 건수, 실패 건수)
+    """
+    outbox = outbox or get_upload_outbox()
+    entries = outbox.entries(reports)
+    if not entries:
+        return 0, 0
+
+    logger.info(f"📮 outbox 항목 {len(entries)}건 먼저 업로드합니다...")
+    jobs = [(entry["sheet_name"], lambda entry=entry: upload_entry(entry)) for _, entry in entries]
+    flushed = 0
+    failed = 0
+    for (path, entry), (_, error) in zip(entries, run_uploads(jobs, upload_concurrency)):
+        if error is None:
+            outbox.remove(path)
+            flushed += 1
+            logger.info(f"✅ outbox [{entry['report']}] {entry['sheet_name']} 업로드 완료 (생성: {entry['created_at']})")
+        else:
+            outbox.record_failure(path, entry, error)
+            failed += 1
+            logger.error(f"❌ outbox [{entry['report']}] {entry['sheet_name']} 업로드 실패 "
+                         f"({entry['attempts']}회째): {error}")
+    logger.info(f"📮 outbox 업로드 결과 - ✅ 성공: {flushed}건 / ❌ 실패: {failed}건")
+    return flushed, failed
+
+
+_UPLOAD_OUTBOX = None
+_UPLOAD_OUTBOX_LOCK = threading.Lock()
+
+
+def get_upload_outbox():
+    """프로세스 전체에서 공유하는 UploadOutbox를 반환합니다."""
+    global _UPLOAD_OUTBOX
+    with _UPLOAD_OUTBOX_LOCK:
+        if _UPLOAD_OUTBOX is None:
+            _UPLOAD_OUTBOX = UploadOutbox()
+        return _UPLOAD_OUTBOX
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Cigro 업로드 outbox')
+    parser.add_argument('command', choices=['status', 'flush-outbox'],
+                        help='status: 보관 중인 항목 출력 / flush-outbox: 보관 중인 항목 다시 업로드')
+    parser.add_argument('--reports', nargs='+', choices=list(UPLOAD_MODULES), help='대상 리포트 (기본값: 전체)')
+    parser.add_argument('--upload-concurrency', type=int, default=4,
+                        help='동시에 업로드할 시트 수 (기본값: 4, 전체 속도는 Sheets 할당량 토큰 버킷으로 제한)')
+    return parser.parse_args()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    args = parse_arguments()
+
+    if args.command == 'status':
+        entries = get_upload_outbox().entries(args.reports)
+        if not entries:
+            logger.info(f"ℹ️ outbox가 비어 있습니다. ({OUTBOX_DIR})")
+            return
+        for _, entry in entries:
+            logger.info(f"[{entry['report']}] {entry['sheet_name']}: {len(entry['data']['data'])}행, "
+                        f"생성 {entry['created_at']}, 재시도 {entry['attempts']}회, 마지막 오류: {entry['last_error']}")
+        return
+
+    _, failed = flush_outbox(args.reports, args.upload_concurrency)
+    logger.info(f"📡 Sheets 할당량 사용: {SHEETS_QUOTA.summary()}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
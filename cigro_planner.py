@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Cigro 스크래핑 작업 계획
+- 리포트별 정산 기간(settlement window): 이 일수보다 오래된 날짜는 더 이상 숫자가 바뀌지 않는다고 봄
+- 정산 기간이 지난 뒤 한 번이라도 스크래핑해 로컬 저장소에 확정된 날짜는 동결(frozen)하고 건너뜀
+- 요청한 (브랜드, 날짜) 범위에서 실제로 스크래핑해야 하는 최소 작업 목록을 계산
+
+정산 기간은 CIGRO_SETTLEMENT_DAYS로 바꿀 수 있습니다. (예: "product/option=14,ad/campaign=7")
+동결된 날짜도 다시 스크래핑하려면 --include-frozen 또는 CIGRO_INCLUDE_FROZEN=1
+
+사용 예:
+    python cigro_planner.py --start-date 2025-01-01 --end-date 2025-03-31
+    python cigro_planner.py --reports ad/campaign --brands 바르너
+"""
+
+import argparse
+import logging
+import os
+from datetime import datetime, timedelta
+
+from cigro_archive import archive_sheet_name
+from cigro_store import KST, get_local_store
+
+logger = logging.getLogger(__name__)
+
+# 리포트별 정산 기간 (일)
+DEFAULT_SETTLEMENT_DAYS = {"product/option": 14, "ad/campaign": 7, "ad/adset": 7, "ad/ad": 7}
+
+# 동결된 날짜도 다시 스크래핑
+INCLUDE_FROZEN = os.getenv("CIGRO_INCLUDE_FROZEN", "0") == "1"
+
+
+def parse_settlement_days(text):
+    """'리포트=일수,리포트=일수' 형식을 기본값에 덮어씁니다."""
+    settlement_days = dict(DEFAULT_SETTLEMENT_DAYS)
+    for item in filter(None, (text or "").split(",")):
+        report, _, days = item.partition("=")
+        settlement_days[report.strip()] = int(days)
+    return settlement_days
+
+
+SETTLEMENT_DAYS = parse_settlement_days(os.getenv("CIGRO_SETTLEMENT_DAYS"))
+
+
+def is_frozen(date, scraped_at, settlement_days, today):
+    """
+    date가 정산 기간이 지났고, 정산 기간이 지난 뒤 스크래핑한 데이터가 저장되어 있으면 True
+    (date, today는 date 객체, scraped_at은 'YYYY-MM-DD HH:MM:SS' 문자열 또는 None)
+    """
+    settled_on = date + timedelta(days=settlement_days)
+    if today < settled_on or not scraped_at:
+        return False
+    return datetime.strptime(scraped_at[:10], "%Y-%m-%d").date() >= settled_on
+
+
+def plan_tasks(report, brands, dates, sheet_suffix="", include_frozen=None, settlement_days=None, today=None,
+               store=None):
+    """
+    (브랜드, 날짜) 작업 중 동결되지 않은 것만 남깁니다.
+
+    Args:
+        sheet_suffix: 브랜드 이름 → 시트(로컬 저장소) 이름 접미사 (예: "_광고")
+
+    Returns:
+        (스크래핑할 [(브랜드, 날짜)], 동결되어 건너뛴 [(브랜드, 날짜)]) - 날짜 → 브랜드 순서
+    """
+    include_frozen = INCLUDE_FROZEN if include_frozen is None else include_frozen
+    if include_frozen:
+        return [(brand, date) for date in dates for brand in brands], []
+
+    settlement_days = SETTLEMENT_DAYS.get(report) if settlement_days is None else settlement_days
+    if settlement_days is None:
+        return [(brand, date) for date in dates for brand in brands], []
+    today = today or datetime.now(KST).date()
+    store = store or get_local_store()
+
+    frozen_keys = set()
+    for brand in brands:
+        sheet_name = f"{brand}{sheet_suffix}"
+        scraped = store.scraped_at(report, sheet_name, dates)
+        # 아카이브된 월의 날짜는 로컬 저장소에서도 아카이브 시트 이름 아래에 있음 (cigro_archive)
+        for year in sorted({date[:4] for date in dates if date not in scraped}):
+            year_dates = [date for date in dates if date[:4] == year and date not in scraped]
+            scraped.update(store.scraped_at(report, archive_sheet_name(sheet_name, year), year_dates))
+        for date in dates:
+            if is_frozen(datetime.strptime(date, "%Y-%m-%d").date(), scraped.get(date), settlement_days, today):
+                frozen_keys.add((brand, date))
+
+    tasks = [(brand, date) for date in dates for brand in brands if (brand, date) not in frozen_keys]
+    frozen = [(brand, date) for date in dates for brand in brands if (brand, date) in frozen_keys]
+    if frozen:
+        logger.info(f"🧊 [{report}] 정산 기간({settlement_days}일)이 지나 확정된 {len(frozen)}건은 건너뜁니다. "
+                    f"(스크래핑 {len(tasks)}건 / 요청 {len(tasks) + len(frozen)}건)")
+    return tasks, frozen
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='정산 기간 기준 스크래핑 작업 계획 출력')
+    parser.add_argument('--reports', nargs='+', choices=list(DEFAULT_SETTLEMENT_DAYS),
+                        default=list(DEFAULT_SETTLEMENT_DAYS), help='리포트 목록 (기본값: 전체)')
+    parser.add_argument('--start-date', type=str, help='시작 날짜 (YYYY-MM-DD 형식)')
+    parser.add_argument('--end-date', type=str, help='종료 날짜 (YYYY-MM-DD 형식)')
+    parser.add_argument('--brands', type=str, nargs='+', help='브랜드 목록 (공백으로 구분)')
+    return parser.parse_args()
+
+
+def main():
+    # 리포트 스크립트들이 이 모듈을 import하므로 실행할 때만 import
+    import cigro_runner
+    from cigro_yesterday import get_date_range
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    args = parse_arguments()
+    date_range = get_date_range(args.start_date, args.end_date)
+    for report in args.reports:
+        brands = args.brands or cigro_runner.REPORTS[report]["module"].BRANDS
+        tasks, frozen = plan_tasks(report, brands, date_range, cigro_runner.REPORTS[report]["sheet_suffix"])
+        logger.info(f"📋 [{report}] 정산 기간 {SETTLEMENT_DAYS.get(report)}일: 스크래핑 {len(tasks)}건, 동결 {len(frozen)}건")
+        for brand, date in tasks:
+            logger.info(f"   - {brand} / {date}")
+
+
+if __name__ == "__main__":
+    main()
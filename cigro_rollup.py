@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Cigro 광고 캠페인 리포트 파생 (roll-up)
+- 광고 소재(group_by=ad) 행을 캠페인 식별 열로 묶어 캠페인 합계를 로컬에서 계산 (pandas groupby 한 번)
+- 더할 수 있는 지표(비용, 노출, 클릭, 매출 등)는 합계
+- 비율 지표(ROAS, CTR, CPC, CPM, CVR)는 합계한 구성 요소로 다시 계산.
+  배율(예: ROAS 350% → 100배)은 광고 소재 행의 표시값과 구성 요소 비율에서 추정
+- 열 구성은 캠페인 시트(로컬 저장소에 저장된 캠페인 데이터의 열)를, 표시 형식은 광고 소재 표시값을 따름
+
+캠페인 열을 광고 소재 테이블에서 만들 수 없으면 ValueError를 발생시키고, 호출부(cigro_ads --derive-campaign)는
+실제 캠페인 화면을 스크래핑합니다. 일부 (브랜드, 날짜)는 실제 캠페인 화면과 파생 결과를 비교(compare_rollup)합니다.
+"""
+
+import math
+import re
+
+import numpy as np
+import pandas as pd
+
+# 비율 지표: 열 이름 패턴 → (분자 열 패턴, 분모 열 패턴, 배율을 추정할 수 없을 때 기본 배율)
+# 분자/분모는 더할 수 있는 지표 열에서만 찾습니다. (예: "클릭"은 "클릭률"이 아닌 클릭 수 열)
+COST_PATTERN = r"비용|광고비|지출|spend|cost"
+RATIO_METRICS = [
+    (r"roas|광고\s*수익률", r"매출|전환\s*금액|구매\s*금액|revenue", COST_PATTERN, 100),
+    (r"ctr|클릭률", r"클릭|click", r"노출|impression", 100),
+    (r"cpc|클릭당", COST_PATTERN, r"클릭|click", 1),
+    (r"cpm|천\s*회", COST_PATTERN, r"노출|impression", 1000),
+    (r"cvr|전환율", r"전환|구매|conversion|purchase", r"클릭|click", 100),
+]
+
+# 위 목록에 없는 비율/평균 지표 (합계도, 재계산도 할 수 없음)
+NON_ADDITIVE_PATTERN = r"율|률|당|평균|%|rate|avg|average"
+
+# 숫자여도 식별 열로 보는 이름 (캠페인 ID 등)
+IDENTITY_PATTERN = r"id|아이디|번호|코드|code"
+
+# 표시값 → 숫자 (쉼표, 통화/단위 기호 제거)
+NUMBER_PATTERN = re.compile(r"^[^\d\-.]*(-?[\d,]*\.?\d+)[^\d]*$")
+
+
+def parse_numbers(values):
+    """표시값 Series를 float Series로 바꿉니다. 숫자가 아니거나 빈 값은 NaN"""
+    text = values.astype(str).str.strip()
+    return pd.to_numeric(text.str.extract(NUMBER_PATTERN, expand=False).str.replace(",", "", regex=False),
+                         errors="coerce")
+
+
+def is_numeric_column(values):
+    text = values.astype(str).str.strip()
+    filled = text[text != ""]
+    return not filled.empty and parse_numbers(filled).notna().all()
+
+
+def _match(pattern, name):
+    return re.search(pattern, str(name), re.IGNORECASE) is not None
+
+
+class RollupPlan:
+    """광고 소재 열 → 캠페인 열 계산 방법"""
+
+    def __init__(self, campaign_columns, key_columns, additive_columns, ratio_columns):
+        self.campaign_columns = campaign_columns
+        self.key_columns = key_columns            # 캠페인 식별 열 (date 제외)
+        self.additive_columns = additive_columns  # 합계 열 (비율 구성 요소 포함)
+        self.ratio_columns = ratio_columns        # {비율 열: (분자 열, 분모 열, 기본 배율)}
+
+    def summary(self):
+        ratios = ", ".join(f"{column}={numerator}/{denominator}"
+                           for column, (numerator, denominator, _) in self.ratio_columns.items())
+        return (f"식별 열 {self.key_columns}, 합계 열 {len(self.additive_columns)}개"
+                f"{f', 재계산 {ratios}' if ratios else ''}")
+
+
+def plan_rollup(ad_df, campaign_columns):
+    """
+    캠페인 열을 광고 소재 열에서 어떻게 만들지 정합니다.
+
+    Raises:
+        ValueError: 광고 소재 테이블에 없는 캠페인 열, 구성 요소를 찾을 수 없는 비율 지표가 있을 때
+    """
+    missing = [column for column in campaign_columns if column not in ad_df.columns]
+    if missing:
+        raise ValueError(f"광고 소재 테이블에 없는 캠페인 열: {missing}")
+
+    numeric = {column for column in ad_df.columns
+               if column != "date" and not _match(IDENTITY_PATTERN, column) and is_numeric_column(ad_df[column])}
+    ratio_patterns = [metric[0] for metric in RATIO_METRICS]
+    additive_candidates = [column for column in ad_df.columns if column in numeric
+                           and not any(_match(pattern, column) for pattern in ratio_patterns)
+                           and not _match(NON_ADDITIVE_PATTERN, column)]
+
+    key_columns = []
+    additive_columns = []
+    ratio_columns = {}
+    for column in campaign_columns:
+        if column == "date":
+            continue
+        if column not in numeric:
+            key_columns.append(column)
+        elif column in additive_candidates:
+            additive_columns.append(column)
+        else:
+            for pattern, numerator_pattern, denominator_pattern, default_scale in RATIO_METRICS:
+                if not _match(pattern, column):
+                    continue
+                numerator = next((c for c in additive_candidates if _match(numerator_pattern, c)), None)
+                denominator = next((c for c in additive_candidates if _match(denominator_pattern, c)), None)
+                if numerator and denominator:
+                    ratio_columns[column] = (numerator, denominator, default_scale)
+                break
+            if column not in ratio_columns:
+                raise ValueError(f"'{column}' 열은 합계도 재계산도 할 수 없습니다. (비율 구성 요소를 찾지 못함)")
+
+    if not key_columns:
+        raise ValueError("캠페인 식별 열(텍스트 열)을 찾지 못했습니다.")
+    for numerator, denominator, _ in ratio_columns.values():
+        for column in (numerator, denominator):
+            if column not in additive_columns:
+                additive_columns.append(column)
+    return RollupPlan(list(campaign_columns), key_columns, additive_columns, ratio_columns)
+
+
+def estimate_scale(shown, numerator, denominator, default_scale):
+    """광고 소재 행의 표시값 / (분자 / 분모)의 중앙값에 가장 가까운 배율 (1, 100, 1000)"""
+    base = numerator / denominator.replace(0, np.nan)
+    factors = (shown / base).replace([np.inf, -np.inf], np.nan).dropna()
+    factors = factors[factors > 0]
+    if factors.empty:
+        return default_scale
+    median = float(factors.median())
+    return min((1, 100, 1000), key=lambda scale: abs(math.log10(median) - math.log10(scale)))
+
+
+def format_like(values, samples):
+    """
+    숫자 Series를 samples(같은 열의 광고 소재 표시값)와 같은 형식의 문자열로 바꿉니다.
+    접두/접미 기호, 천 단위 쉼표, 소수 자릿수를 따릅니다. NaN은 빈 문자열
+    """
+    text = samples.astype(str).str.strip()
+    text = text[text != ""]
+    prefix = suffix = ""
+    decimals = 0
+    commas = text.str.contains(",", regex=False).any()
+    if not text.empty:
+        match = re.match(r"^([^\d\-.]*)-?[\d,]*\.?\d+([^\d]*)$", text.iloc[0])
+        if match:
+            prefix, suffix = match.group(1), match.group(2)
+        decimals = int(text.str.extract(r"\.(\d+)", expand=False).str.len().max() if
+                       text.str.contains(".", regex=False).any() else 0)
+
+    def render(value):
+        if pd.isna(value):
+            return ""
+        number = f"{value:,.{decimals}f}" if commas else f"{value:.{decimals}f}"
+        return f"{prefix}{number}{suffix}"
+
+    return values.map(render)
+
+
+def rollup_campaigns(ad_df, campaign_columns, plan=None):
+    """
+    광고 소재 DataFrame(한 브랜드/날짜)을 캠페인 단위로 묶어 campaign_columns 열의 DataFrame을 반환합니다.
+    행 순서는 캠페인이 광고 소재 테이블에 처음 나온 순서입니다.
+    """
+    plan = plan or plan_rollup(ad_df, campaign_columns)
+    keys = ["date"] + plan.key_columns
+    numbers = ad_df[plan.additive_columns].apply(parse_numbers)
+    grouped = numbers.groupby([ad_df[key].astype(str).str.strip() for key in keys], sort=False, dropna=False) \
+        .sum(min_count=1).reset_index()
+
+    result = grouped[keys].copy()
+    for column in plan.campaign_columns:
+        if column in plan.ratio_columns:
+            numerator, denominator, default_scale = plan.ratio_columns[column]
+            scale = estimate_scale(parse_numbers(ad_df[column]), numbers[numerator], numbers[denominator],
+                                   default_scale)
+            values = grouped[numerator] / grouped[denominator].replace(0, np.nan) * scale
+            result[column] = format_like(values, ad_df[column])
+        elif column in plan.additive_columns:
+            result[column] = format_like(grouped[column], ad_df[column])
+    return result[plan.campaign_columns]
+
+
+def compare_rollup(derived_df, live_df, plan, tolerance=0.01):
+    """
+    파생 결과와 실제 캠페인 화면 데이터를 캠페인 식별 열 기준으로 비교합니다.
+    지표는 상대 오차 tolerance (표시 반올림 때문에 마지막 자리 ±1도 허용)까지 같다고 봅니다.
+
+    Returns:
+        불일치 설명 목록 (비어 있으면 일치)
+    """
+    keys = ["date"] + plan.key_columns
+    derived = derived_df.assign(**{key: derived_df[key].astype(str).str.strip() for key in keys})
+    live = live_df.assign(**{key: live_df[key].astype(str).str.strip() for key in keys})
+    merged = derived.merge(live, on=keys, how="outer", suffixes=("_derived", "_live"), indicator=True)
+
+    mismatches = []
+    only_derived = merged[merged["_merge"] == "left_only"]
+    only_live = merged[merged["_merge"] == "right_only"]
+    if len(only_derived) or len(only_live):
+        mismatches.append(f"캠페인 구성 다름 (파생에만 {len(only_derived)}개, 실제 화면에만 {len(only_live)}개)")
+
+    both = merged[merged["_merge"] == "both"]
+    for column in plan.campaign_columns:
+        if column in keys:
+            continue
+        derived_values = parse_numbers(both[f"{column}_derived"])
+        live_values = parse_numbers(both[f"{column}_live"])
+        unit = 10.0 ** -int(both[f"{column}_live"].astype(str).str.extract(r"\.(\d+)", expand=False)
+                            .str.len().fillna(0).max() if len(both) else 0)
+        allowed = np.maximum((live_values.abs() * tolerance), unit)
+        different = ((derived_values - live_values).abs() > allowed) | (derived_values.isna() != live_values.isna())
+        if different.any():
+            row = both[different].iloc[0]
+            mismatches.append(f"{column}: {int(different.sum())}개 캠페인 불일치 "
+                              f"(예: {' / '.join(str(row[key]) for key in plan.key_columns)} 파생 {row[f'{column}_derived']} / "
+                              f"실제 {row[f'{column}_live']})")
+    return mismatches
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Cigro 통합 스크래핑 실행 스크립트
+- 매출(상품/옵션), 광고 캠페인/광고 세트/광고 소재 리포트를 한 프로세스에서 실행
+- 브라우저 실행과 로그인은 한 번만 하고, 모든 리포트 작업을 하나의 작업 큐로 처리
+- 광고 리포트는 (브랜드, 날짜)마다 작업 하나로 묶어, 남은 분석 단위를 cigro_ads 엔진이 탭 여러 개에서 동시에 로드
+- 업로드/알림 규칙은 각 리포트 스크립트와 동일
+
+사용 예:
+    python cigro_runner.py --reports product/option ad/campaign ad/ad --concurrency 3
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+from playwright.sync_api import sync_playwright
+
+import cigro_ads
+import cigro_yesterday
+from cigro_fingerprint import combine_frames, verified_dates
+from cigro_outbox import flush_outbox, get_upload_outbox
+from cigro_planner import INCLUDE_FROZEN, plan_tasks
+from cigro_runtime import PROFILE_DIR, log_blocker_summary, open_session, run_tasks
+from cigro_sheets import SHEETS_QUOTA, run_uploads
+
+logger = logging.getLogger(__name__)
+
+EMAIL = os.getenv("EMAIL")
+PASSWORD = os.getenv("PASSWORD")
+
+# 리포트 종류 → 스크래핑/업로드를 담당하는 모듈 (광고는 분석 단위별로 cigro_ads 엔진 사용)
+REPORTS = {
+    "product/option": {"label": "매출", "module": cigro_yesterday, "sheet_suffix": ""},
+    **{cigro_ads.ads_report(group_by): {"label": level["label"], "module": cigro_ads, "group_by": group_by,
+                                        "sheet_suffix": level["sheet_suffix"]}
+       for group_by, level in cigro_ads.ADS_LEVELS.items()},
+}
+
+# 기본 실행 리포트 (광고는 엔진의 기본 분석 단위)
+DEFAULT_REPORTS = ["product/option"] + [cigro_ads.ads_report(group_by) for group_by in cigro_ads.DEFAULT_LEVELS]
+
+
+# 광고 작업의 리포트 자리 표시 (작업 하나 = 한 브랜드/날짜의 여러 분석 단위)
+ADS_TASK = "ad"
+
+
+def build_tasks(reports, brands_by_report, date_range, planned):
+    """
+    날짜 → 브랜드 순서로 작업 목록을 만듭니다. 리포트들이 동시에 진행되도록 섞습니다.
+    - 매출: (리포트, 브랜드, 날짜)
+    - 광고: (ADS_TASK, 브랜드, 날짜, 분석 단위 tuple) - 정산 기간이 지나지 않은 분석 단위만
+    """
+    ads_reports = [report for report in reports if report != "product/option"]
+    tasks = []
+    for selected_date in date_range:
+        if "product/option" in reports:
+            tasks.extend(("product/option", brand, selected_date) for brand in brands_by_report["product/option"]
+                         if ("product/option", brand, selected_date) in planned)
+        ads_brands = list(dict.fromkeys(brand for report in ads_reports for brand in brands_by_report[report]))
+        for brand in ads_brands:
+            levels = tuple(REPORTS[report]["group_by"] for report in ads_reports
+                           if (report, brand, selected_date) in planned)
+            if levels:
+                tasks.append((ADS_TASK, brand, selected_date, levels))
+    return tasks
+
+
+def run_report_task(context, task):
+    """
+    작업 하나를 스크래핑합니다. (data, error)를 반환합니다.
+    광고 작업의 data는 {group_by: (df, error)} (cigro_ads.scrape_brand_levels 결과)
+    """
+    if task[0] == ADS_TASK:
+        _, brand, selected_date, levels = task
+        return cigro_ads.scrape_brand_levels(context, brand, selected_date, list(levels)), None
+    _, brand, selected_date = task
+    _, df, error = cigro_yesterday.scrape_brand(context, brand, selected_date)
+    return df, error
+
+
+def split_results(tasks, results):
+    """
+    작업 결과를 리포트별 [(리포트, 브랜드, 날짜)] 작업 목록과 [(df, error)] 결과 목록으로 나눕니다.
+    광고 작업 전체가 실패하면 그 작업의 모든 분석 단위를 같은 오류로 실패 처리합니다.
+    """
+    by_report = {}
+    for task, (data, error) in zip(tasks, results):
+        if task[0] != ADS_TASK:
+            report_tasks, report_results = by_report.setdefault(task[0], ([], []))
+            report_tasks.append(task)
+            report_results.append((data, error))
+            continue
+        _, brand, selected_date, levels = task
+        for group_by in levels:
+            report = cigro_ads.ads_report(group_by)
+            report_tasks, report_results = by_report.setdefault(report, ([], []))
+            report_tasks.append((report, brand, selected_date))
+            report_results.append(data[group_by] if data is not None else (None, error))
+    return by_report
+
+
+def upload_results(report, tasks, results, upload_concurrency=4):
+    """
+    리포트별 업로드 규칙에 따라 결과를 업로드하고 (성공, 실패) 건수를 반환합니다.
+    - 매출: 스크래핑 성공 기준으로 집계하고, 브랜드별로 모든 날짜를 병합해 업로드
+    - 광고: 날짜별로 업로드하고, 업로드까지 성공해야 성공으로 집계
+    시트가 다른 업로드는 Sheets 할당량 안에서 병렬로, 같은 시트의 업로드는 순서대로 실행합니다.
+    업로드에 실패한 데이터는 outbox에 보관해 다음 실행 때 다시 업로드합니다.
+    """
+    module = REPORTS[report]["module"]
+    success = 0
+    fail = 0
+
+    if report == "product/option":
+        by_brand = {}
+        for (_, brand, selected_date), (df, error) in zip(tasks, results):
+            if df is not None:
+                by_brand.setdefault(brand, []).append(df)
+                success += 1
+            else:
+                fail += 1
+                logger.error(f"❌ {brand} - {selected_date} 스크래핑 실패: {error}")
+        combined = {brand: combine_frames(dfs) for brand, dfs in by_brand.items()}
+        jobs = [(brand, lambda df=df, brand=brand: module.upload_to_google_sheets(df, brand))
+                for brand, df in combined.items()]
+        for (brand, _), (uploaded, error) in zip(jobs, run_uploads(jobs, upload_concurrency)):
+            if uploaded:
+                logger.info(f"✅ {brand} 업로드 완료 ({len(by_brand[brand])}일치 데이터)")
+            else:
+                get_upload_outbox().add(report, brand, combined[brand], {"upload_mode": module.UPLOAD_MODE}, error)
+        return success, fail
+
+    jobs = []
+    labels = []
+    for (_, brand, selected_date), (df, error) in zip(tasks, results):
+        if df is None:
+            fail += 1
+            logger.error(f"❌ [{report}] {brand} - {selected_date} 스크래핑 실패: {error}")
+            continue
+        sheet_name = f"{brand}{REPORTS[report]['sheet_suffix']}"
+        jobs.append((sheet_name, lambda df=df, sheet_name=sheet_name, selected_date=selected_date:
+                     module.upload_to_google_sheets(df, sheet_name, selected_date,
+                                                    group_by=REPORTS[report]["group_by"])))
+        labels.append((brand, selected_date, sheet_name, df))
+    for (brand, selected_date, sheet_name, df), (_, error) in zip(labels, run_uploads(jobs, upload_concurrency)):
+        if error is None:
+            success += 1
+        else:
+            fail += 1
+            logger.error(f"❌ [{report}] {brand} - {selected_date} 업로드 실패: {error}")
+            get_upload_outbox().add(report, sheet_name, df, {"selected_date": selected_date}, error)
+    return success, fail
+
+
+def count_unchanged(results):
+    """변경 없음이 확인된(지문 일치) 스크래핑 결과 수"""
+    return sum(1 for df, _ in results if df is not None and verified_dates(df))
+
+
+def notify(report, date_range, brands, success, fail, unchanged=0, frozen=0):
+    """리포트별 Slack 알림을 각 스크립트의 알림 함수로 전송합니다. (각 스크립트와 같은 항목)"""
+    module = REPORTS[report]["module"]
+    label = REPORTS[report]["label"]
+    date_info = date_range[0] if len(date_range) == 1 else f"{date_range[0]} ~ {date_range[-1]}"
+    details = {"📅 기간": date_info, "📋 브랜드": ", ".join(brands)}
+    if report != "product/option":
+        details["🧭 분석 단위"] = label
+    details.update({
+        "✅ 성공": f"{success}건",
+        "🟰 변경 없음": f"{unchanged}건",
+        "❌ 실패": f"{fail}건",
+        "🧊 동결": f"{frozen}건",
+    })
+    if report == "product/option":
+        total = success + fail
+        details["📈 성공률"] = f"{success / total * 100 if total else 0:.1f}%"
+    if fail == 0:
+        message = f"*{len(date_range)}일* x *{len(brands)}개 브랜드* {label} 스크래핑이 모두 완료되었습니다."
+    else:
+        message = f"*{len(date_range)}일* x *{len(brands)}개 브랜드* 중 *{success}건 성공*, *{fail}건 실패*했습니다."
+    if report == "product/option":
+        module.send_slack_notification(fail == 0, message, details)
+    else:
+        module.send_slack_notification(fail == 0, message, details, label)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Cigro 통합 스크래핑 실행 스크립트')
+    parser.add_argument('--reports', nargs='+', choices=list(REPORTS), default=DEFAULT_REPORTS,
+                        help=f'실행할 리포트 목록 (기본값: {" ".join(DEFAULT_REPORTS)})')
+    parser.add_argument('--start-date', type=str, help='시작 날짜 (YYYY-MM-DD 형식)')
+    parser.add_argument('--end-date', type=str, help='종료 날짜 (YYYY-MM-DD 형식)')
+    parser.add_argument('--brands', type=str, nargs='+', help='스크래핑할 브랜드 목록 (공백으로 구분)')
+    parser.add_argument('--concurrency', type=int, default=1, help='동시에 실행할 작업 수 (기본값: 1)')
+    parser.add_argument('--upload-concurrency', type=int, default=4,
+                        help='동시에 업로드할 시트 수 (기본값: 4, 전체 속도는 Sheets 할당량 토큰 버킷으로 제한)')
+    parser.add_argument('--profile-dir', type=str, default=PROFILE_DIR,
+                        help='영구 브라우저 프로필 디렉토리 (실행 간 정적 리소스 캐시 유지)')
+    parser.add_argument('--include-frozen', action='store_true', default=INCLUDE_FROZEN,
+                        help='정산 기간이 지나 확정된(동결) 날짜도 다시 스크래핑')
+    parser.add_argument('--headless', action='store_true', default=True, help='헤드리스 모드로 실행')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    if not EMAIL or not PASSWORD:
+        logger.error("❌ EMAIL과 PASSWORD 환경변수가 설정되지 않았습니다.")
+        sys.exit(1)
+
+    try:
+        date_range = cigro_yesterday.get_date_range(args.start_date, args.end_date)
+    except ValueError as e:
+        logger.error(f"❌ 잘못된 날짜 형식입니다. YYYY-MM-DD 형식을 사용하세요. 오류: {e}")
+        sys.exit(1)
+
+    brands_by_report = {report: args.brands or REPORTS[report]["module"].BRANDS for report in args.reports}
+
+    # 리포트별로 정산 기간이 지나 확정된 (브랜드, 날짜)는 제외
+    planned = set()
+    frozen_by_report = {}
+    for report in args.reports:
+        report_tasks, frozen = plan_tasks(report, brands_by_report[report], date_range,
+                                          REPORTS[report]["sheet_suffix"], args.include_frozen)
+        planned.update((report, brand, selected_date) for brand, selected_date in report_tasks)
+        frozen_by_report[report] = len(frozen)
+
+    tasks = build_tasks(args.reports, brands_by_report, date_range, planned)
+
+    logger.info(f"🚀 통합 스크래핑 시작: 리포트 {', '.join(args.reports)} / {len(date_range)}일 / 작업 {len(tasks)}건")
+
+    # 지난 실행에서 업로드하지 못하고 outbox에 남은 데이터를 먼저 업로드
+    flush_outbox(args.reports, args.upload_concurrency)
+
+    with sync_playwright() as p:
+        session = open_session(p, EMAIL, PASSWORD, args.headless, args.profile_dir)
+        try:
+            results = run_tasks(session.context, tasks, run_report_task, args.concurrency, args.headless,
+                                args.profile_dir)
+            log_blocker_summary(session.blocker)
+            session.log_cache_summary()
+        finally:
+            session.close()
+
+    # 리포트별 업로드 및 알림
+    by_report = split_results(tasks, results)
+    for report in args.reports:
+        report_tasks, report_results = by_report.get(report, ([], []))
+        success, fail = upload_results(report, report_tasks, report_results, args.upload_concurrency)
+        unchanged = count_unchanged(report_results)
+        frozen = frozen_by_report[report]
+        logger.info(f"📊 [{report}] ✅ 성공: {success}건 (🟰 변경 없음 확인 {unchanged}건) / ❌ 실패: {fail}건 / "
+                    f"🧊 동결: {frozen}건")
+        notify(report, date_range, brands_by_report[report], success, fail, unchanged, frozen)
+    logger.info(f"📡 Sheets 할당량 사용: {SHEETS_QUOTA.summary()}")
+
+
+if __name__ == "__main__":
+    main()
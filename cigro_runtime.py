@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Cigro 스크래퍼 공용 브라우저 런타임
+- 브라우저 실행 옵션과 로그인 세션(auth.json) 관리
+- 작업 큐 기반 워커 풀 (여러 리포트/브랜드/날짜 작업을 한 프로세스에서 실행)
+- 영구 프로필 (실행 간 HTTP/서비스 워커 캐시 유지, 용량 제한과 오래된 파일 정리)
+- 세션 유효성 확인과 워커 공용 단일 재로그인
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from playwright.sync_api import sync_playwright
+
+from cigro_browser import CacheStats, install_resource_blocking, is_app_loaded
+
+logger = logging.getLogger(__name__)
+
+CIGRO_URL = "https://app.cigro.io"
+AUTH_STATE_FILE = "auth.json"
+
+# 로그인 화면/앱 화면 판별용 선택자
+LOGIN_FORM_SELECTOR = 'input[type="password"]'
+APP_READY_SELECTOR = 'div.sc-dkrFOg.cGhOUg, thead.gridjs-thead, label.text-cigro-page-number'
+
+# 영구 프로필 디렉토리 (설정 시 launch_persistent_context 사용, 워커마다 하위 디렉토리)
+PROFILE_DIR = os.getenv("CIGRO_PROFILE_DIR")
+# 프로필당 캐시 최대 용량 (MB). Chromium 디스크 캐시 한도와 실행 후 정리 기준으로 사용
+PROFILE_CACHE_MAX_MB = int(os.getenv("CIGRO_PROFILE_CACHE_MAX_MB", "300"))
+
+# 프로필 안의 캐시 디렉토리 (용량 정리 대상)
+PROFILE_CACHE_DIRS = [
+    os.path.join("Default", "Cache"),
+    os.path.join("Default", "Code Cache"),
+    os.path.join("Default", "Service Worker", "CacheStorage"),
+    os.path.join("Default", "Service Worker", "ScriptCache"),
+]
+
+# 브라우저 실행 설정 - 최적화된 옵션
+BROWSER_ARGS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--disable-web-security',
+    '--disable-features=VizDisplayCompositor',
+    '--disable-extensions',
+    '--disable-plugins',
+]
+
+
+def launch_browser(playwright, headless=True):
+    return playwright.chromium.launch(headless=headless, args=BROWSER_ARGS)
+
+
+def _dir_files(path):
+    files = []
+    for root, _, names in os.walk(path):
+        for name in names:
+            file_path = os.path.join(root, name)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, file_path))
+    return files
+
+
+def enforce_profile_cache_limit(profile_path, max_bytes):
+    """
+    프로필 캐시 디렉토리 전체 용량이 max_bytes를 넘으면 오래된 파일부터 삭제합니다.
+    브라우저가 닫힌 뒤에 호출해야 합니다. (삭제한 바이트 수 반환)
+    """
+    files = []
+    for cache_dir in PROFILE_CACHE_DIRS:
+        files.extend(_dir_files(os.path.join(profile_path, cache_dir)))
+
+    total = sum(size for _, size, _ in files)
+    if total <= max_bytes:
+        return 0
+
+    removed = 0
+    for _, size, file_path in sorted(files):
+        if total - removed <= max_bytes:
+            break
+        try:
+            os.remove(file_path)
+            removed += size
+        except OSError:
+            pass
+    logger.info(f"🧽 프로필 캐시 정리: {total / 1024 / 1024:.1f}MB → {(total - removed) / 1024 / 1024:.1f}MB")
+    return removed
+
+
+class BrowserSession:
+    """
+    스크래핑에 쓰는 BrowserContext 하나와 그 부가 기능(리소스 차단, 캐시 통계)을 묶습니다.
+
+    profile_dir가 있으면 launch_persistent_context로 {profile_dir}/{profile_name} 프로필을 쓰고
+    (Chromium 프로필은 동시에 한 프로세스만 쓸 수 있어 워커마다 이름을 달리함),
+    없으면 일반 브라우저를 띄워 auth.json 세션으로 컨텍스트를 만듭니다.
+    """
+
+    def __init__(self, playwright, headless=True, profile_dir=None, profile_name="main"):
+        self.browser = None
+        self.profile_path = None
+        self.cache_stats = None
+
+        if profile_dir:
+            self.profile_path = os.path.join(profile_dir, profile_name)
+            os.makedirs(self.profile_path, exist_ok=True)
+            cache_bytes = PROFILE_CACHE_MAX_MB * 1024 * 1024
+            self.context = playwright.chromium.launch_persistent_context(
+                self.profile_path,
+                headless=headless,
+                args=BROWSER_ARGS + [f"--disk-cache-size={cache_bytes}"],
+            )
+            self._load_auth_cookies()
+            self.cache_stats = CacheStats().install(self.context)
+            # context.route는 HTTP 캐시를 끄므로 CDP 차단 사용
+            self.blocker = install_resource_blocking(self.context, use_cdp=True)
+        else:
+            self.browser = launch_browser(playwright, headless)
+            storage_state = AUTH_STATE_FILE if os.path.exists(AUTH_STATE_FILE) else None
+            self.context = self.browser.new_context(storage_state=storage_state)
+            self.blocker = install_resource_blocking(self.context)
+
+    def _load_auth_cookies(self):
+        if not os.path.exists(AUTH_STATE_FILE):
+            return
+        try:
+            with open(AUTH_STATE_FILE, 'r', encoding='utf-8') as f:
+                cookies = json.load(f).get("cookies", [])
+            if cookies:
+                self.context.add_cookies(cookies)
+        except Exception as e:
+            logger.warning(f"⚠️ auth.json 쿠키 불러오기 실패: {e}")
+
+    def log_cache_summary(self, prefix=""):
+        if not self.cache_stats:
+            return
+        stats = self.cache_stats.summary()
+        logger.info(
+            f"💾 {prefix}캐시 적중률: {stats['hit_ratio'] * 100:.1f}% "
+            f"(응답 {stats['responses']}건 중 HTTP 캐시 {stats['cache_hits']}건, 서비스 워커 {stats['service_worker_hits']}건, "
+            f"네트워크 수신 {stats['network_bytes'] / 1024 / 1024:.1f}MB)"
+        )
+
+    def close(self):
+        try:
+            if self.browser:
+                self.browser.close()
+            else:
+                self.context.close()
+        finally:
+            if self.profile_path:
+                enforce_profile_cache_limit(self.profile_path, PROFILE_CACHE_MAX_MB * 1024 * 1024)
+
+
+def login(context, email, password):
+    """로그인 폼을 자동 입력해 로그인하고 세션을 auth.json에 저장합니다."""
+    page = context.new_page()
+    try:
+        page.goto(CIGRO_URL, wait_until='domcontentloaded')
+        logger.info("📝 로그인 자동화 중...")
+
+        # 이메일, 비밀번호 자동 입력
+        page.fill('input.bubble-element.Input.cnaNaCaE0.a1746627658297x1166[type="email"]', email)
+        page.fill('input[type="password"]', password)
+
+        # 로그인 버튼 클릭
+        page.click('div.clickable-element.bubble-element.Group.cnaNaCaF0.bubble-r-container')
+        page.wait_for_load_state('networkidle', timeout=15000)
+
+        logger.info("🔐 로그인 완료 후 세션 저장 중...")
+        context.storage_state(path=AUTH_STATE_FILE)
+    finally:
+        page.close()
+
+
+def is_login_page(page):
+    """로그인 폼이 보이는 페이지인지 확인합니다. (세션 만료로 로그인 화면으로 돌아간 경우)"""
+    try:
+        return page.query_selector(LOGIN_FORM_SELECTOR) is not None
+    except Exception:
+        return False
+
+
+def auth_cookies_expired(path=AUTH_STATE_FILE):
+    """auth.json의 쿠키가 모두 만료되었으면 True (네트워크 없이 확인하는 1차 검사)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cookies = json.load(f).get("cookies", [])
+    except Exception:
+        return True
+    now = time.time()
+    expiring = [c for c in cookies if c.get("expires", -1) > 0]
+    return bool(expiring) and all(c["expires"] <= now for c in expiring)
+
+
+def probe_session(context, timeout=20000):
+    """
+    세션이 유효한지 확인합니다.
+    쿠키 만료 여부를 먼저 보고, 분석 화면을 한 번 열어 로그인 폼과 테이블 중 무엇이 뜨는지 확인합니다.
+    판별이 안 되면(시간 초과) 유효한 것으로 보고 스크래핑 중 감지에 맡깁니다.
+    """
+    if auth_cookies_expired():
+        logger.info("⌛ 저장된 세션 쿠키가 만료되었습니다.")
+        return False
+
+    page = context.new_page()
+    try:
+        page.goto(f"{CIGRO_URL}/?menu=analysis", wait_until='domcontentloaded', timeout=60000)
+        page.wait_for_selector(f"{LOGIN_FORM_SELECTOR}, {APP_READY_SELECTOR}", timeout=timeout)
+        return not is_login_page(page)
+    except Exception as e:
+        logger.warning(f"⚠️ 세션 확인 실패 (유효한 것으로 간주): {e}")
+        return True
+    finally:
+        page.close()
+
+
+class SessionManager:
+    """
+    여러 워커가 공유하는 로그인 세션 관리자입니다.
+
+    재로그인은 잠금으로 한 번만 실행되고(generation 증가), 기다리던 다른 워커와
+    이후 작업을 시작하는 워커는 새 auth.json을 자기 컨텍스트에 다시 불러옵니다.
+    각 컨텍스트는 자기 스레드에서만 다루므로 재로그인/불러오기도 해당 워커 스레드에서 실행됩니다.
+    """
+
+    def __init__(self):
+        self.email = None
+        self.password = None
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._seen = weakref.WeakKeyDictionary()
+
+    def configure(self, email, password):
+        self.email = email
+        self.password = password
+
+    def mark_current(self, context):
+        self._seen[context] = self.generation
+
+    def sync(self, context):
+        """다른 워커가 재로그인했으면 새 세션을 이 컨텍스트에 불러옵니다."""
+        if self._seen.get(context, 0) < self.generation:
+            self._apply(context)
+
+    def relogin(self, context):
+        """세션 만료를 감지한 워커가 호출합니다. 동시에 여러 워커가 호출해도 로그인은 한 번만 합니다."""
+        observed = self._seen.get(context, 0)
+        with self._lock:
+            if self.generation > observed:
+                logger.info("🔁 다른 워커가 이미 재로그인했습니다. 새 세션을 불러옵니다.")
+                self._apply(context)
+                return
+            if not self.email or not self.password:
+                raise RuntimeError("재로그인에 필요한 EMAIL/PASSWORD가 설정되지 않았습니다.")
+
+            logger.warning("🔐 세션 만료 감지 ➜ 재로그인")
+            context.clear_cookies()
+            login(context, self.email, self.password)
+            self.generation += 1
+            self._seen[context] = self.generation
+
+    def _apply(self, context):
+        with open(AUTH_STATE_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        context.clear_cookies()
+        context.add_cookies(state.get("cookies", []))
+        for page in context.pages:
+            if is_app_loaded(page):
+                try:
+                    page.reload(wait_until='domcontentloaded', timeout=60000)
+                except Exception as e:
+                    logger.warning(f"⚠️ 세션 갱신 후 페이지 새로고침 실패: {e}")
+        self._seen[context] = self.generation
+
+
+# 프로세스 전체에서 공유하는 세션 관리자
+SESSION_MANAGER = SessionManager()
+
+
+def ensure_logged_in(page):
+    """
+    페이지가 로그인 화면이면 (단일) 재로그인 후 True를 반환합니다.
+    호출부는 True를 받으면 원래 URL로 다시 이동해야 합니다.
+    """
+    if not is_login_page(page):
+        return False
+    SESSION_MANAGER.relogin(page.context)
+    return True
+
+
+def open_session(playwright, email, password, headless=True, profile_dir=None):
+    """
+    로그인된 BrowserSession을 엽니다.
+    저장된 세션(auth.json)이 없거나 만료되었으면 로그인해 세션을 저장합니다.
+    """
+    SESSION_MANAGER.configure(email, password)
+    has_auth = os.path.exists(AUTH_STATE_FILE)
+    if has_auth:
+        logger.info("🔐 기존 로그인 세션 불러오는 중...")
+    session = BrowserSession(playwright, headless, profile_dir)
+    try:
+        if not has_auth:
+            logger.info("🧭 세션 없음 ➜ 수동 로그인 시작")
+            login(session.context, email, password)
+        elif not probe_session(session.context):
+            logger.info("🧭 세션 만료 ➜ 다시 로그인")
+            session.context.clear_cookies()
+            login(session.context, email, password)
+        else:
+            logger.info("✅ 세션 유효")
+    except Exception:
+        session.close()
+        raise
+    SESSION_MANAGER.mark_current(session.context)
+    return session
+
+
+def log_blocker_summary(blocker, prefix=""):
+    if blocker and blocker.summary()['pages']:
+        stats = blocker.summary()
+        logger.info(f"🧹 {prefix}리소스 차단: {stats['pages']}개 페이지, 요청 {stats['blocked_requests']}건 차단 (약 {stats['saved_bytes'] / 1024 / 1024:.1f}MB 절감)")
+
+
+def _worker(worker_id, task_queue, run_task, headless, profile_dir):
+    """
+    작업 큐에서 (순번, 작업)을 꺼내 처리하는 워커입니다.
+
+    Playwright sync API 객체는 생성한 스레드에서만 사용할 수 있으므로
+    워커마다 자체 브라우저를 띄우고, 컨텍스트는 auth.json 세션을 공유합니다.
+    """
+    results = []
+    with sync_playwright() as p:
+        session = BrowserSession(p, headless, profile_dir, profile_name=f"worker-{worker_id}")
+        SESSION_MANAGER.mark_current(session.context)  # 생성 시점의 auth.json을 이미 불러옴
+        try:
+            while True:
+                try:
+                    task_idx, task = task_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                logger.info(f"🔍 [워커 {worker_id}] {task} 처리 중...")
+                try:
+                    SESSION_MANAGER.sync(session.context)
+                    result = run_task(session.context, task)
+                except Exception as e:
+                    result = (None, str(e))
+                results.append((task_idx, result))
+
+            log_blocker_summary(session.blocker, f"[워커 {worker_id}] ")
+            session.log_cache_summary(f"[워커 {worker_id}] ")
+        finally:
+            session.close()
+    return results
+
+
+def run_tasks(context, tasks, run_task, concurrency=1, headless=True, profile_dir=None):
+    """
+    작업 목록을 실행하고 작업 순서대로 결과를 반환합니다.
+
+    Args:
+        context: 로그인된 BrowserContext (순차 실행 시 사용)
+        tasks: 작업 목록 (run_task에 그대로 전달)
+        run_task: run_task(context, task) -> (data, error)
+        concurrency: 동시에 실행할 워커 수 (1이면 순차 실행)
+        headless: 워커 브라우저 헤드리스 여부
+        profile_dir: 워커 영구 프로필 상위 디렉토리 (None이면 일반 컨텍스트)
+
+    Returns:
+        [(data, error), ...] - tasks와 같은 순서
+    """
+    if concurrency <= 1 or len(tasks) <= 1:
+        results = []
+        for task_idx, task in enumerate(tasks):
+            logger.info(f"🔍 [{task_idx + 1}/{len(tasks)}] {task} 처리 중...")
+            try:
+                results.append(run_task(context, task))
+            except Exception as e:
+                results.append((None, str(e)))
+        return results
+
+    worker_count = min(concurrency, len(tasks))
+    logger.info(f"⚡ {worker_count}개 워커로 {len(tasks)}개 작업 병렬 실행")
+
+    task_queue = queue.Queue()
+    for task_idx, task in enumerate(tasks):
+        task_queue.put((task_idx, task))
+
+    # 워커가 비정상 종료하면 처리하지 못한 작업은 실패로 기록
+    collected = {}
+    with ThreadPoolExecutor(max_workers=worker_count) as executor:
+        futures = [executor.submit(_worker, worker_id + 1, task_queue, run_task, headless, profile_dir)
+                   for worker_id in range(worker_count)]
+        for future in as_completed(futures):
+            try:
+                for task_idx, result in future.result():
+                    collected[task_idx] = result
+            except Exception as e:
+                logger.error(f"❌ 스크래핑 워커 오류: {e}")
+
+    return [collected.get(task_idx, (None, "워커 오류로 작업이 처리되지 않음")) for task_idx in range(len(tasks))]
@@ -0,0 +1,1084 @@
+#!/usr/bin/env python3
+"""
+Cigro 스크래퍼 공용 Google Sheets 유틸리티
+- 행 삭제/추가를 하나의 spreadsheets.batchUpdate로 묶어 전송
+- 업로드별 API 호출 수 집계
+- 기존/새 데이터의 날짜별 벡터화 비교 (교체 여부 판단)
+- 날짜 → 행 구간 인덱스 (해당 날짜 구간만 읽고 쓰기)
+- 프로세스 전체에서 공유하는 Sheets 세션 (인증 1회, 키로 열기, 워크시트 메타데이터 캐시)
+- 읽기/쓰기 할당량 토큰 버킷 + 429/5xx 재시도, 시트별 병렬 업로드
+- 큰 백필은 날짜 경계에서 나눈 청크 단위로 전송 (청크마다 삭제 + 추가 + 인덱스 저장)
+
+인덱스 점검/재생성:
+    python cigro_sheets.py verify-index [--sheets 바르너 바르너_광고]
+    python cigro_sheets.py rebuild-index
+"""
+
+import argparse
+import bisect
+import logging
+import math
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import gspread
+import pandas as pd
+from oauth2client.service_account import ServiceAccountCredentials
+
+logger = logging.getLogger(__name__)
+
+
+class ApiCallLog:
+    """업로드 한 번에 사용한 Sheets API 호출 수를 이름별로 집계합니다."""
+
+    def __init__(self):
+        self.calls = {}
+
+    def add(self, name, count=1):
+        self.calls[name] = self.calls.get(name, 0) + count
+
+    @property
+    def total(self):
+        return sum(self.calls.values())
+
+    def summary(self):
+        detail = ", ".join(f"{name} {count}" for name, count in self.calls.items())
+        return f"{self.total}회 ({detail})" if detail else "0회"
+
+
+GOOGLE_SCOPES = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+
+# 스프레드시트 키 (지정하면 이름으로 찾는 Drive 검색 없이 바로 열기)
+GOOGLE_SHEET_KEY = os.getenv("GOOGLE_SHEET_KEY")
+
+
+class SheetsSession:
+    """
+    프로세스 전체에서 공유하는 Google Sheets 연결.
+    - 인증 파일은 처음 한 번만 읽고 authorize
+    - 스프레드시트는 키로 열고, 키가 없으면 이름으로 한 번만 찾은 뒤 키를 기억
+    - 워크시트 제목 → Worksheet를 메타데이터 한 번 조회로 캐시
+    """
+
+    def __init__(self, cred_file, spreadsheet_name, spreadsheet_key=None):
+        self.cred_file = cred_file
+        self.spreadsheet_name = spreadsheet_name
+        self.spreadsheet_key = spreadsheet_key
+        self._spreadsheet = None
+        self._worksheets = None
+        self._lock = threading.RLock()
+
+    def spreadsheet(self, call_log=None):
+        with self._lock:
+            if self._spreadsheet is None:
+                creds = ServiceAccountCredentials.from_json_keyfile_name(self.cred_file, GOOGLE_SCOPES)
+                client = gspread.authorize(creds)
+                if self.spreadsheet_key:
+                    self._spreadsheet = sheets_call(call_log, "open_by_key", client.open_by_key, self.spreadsheet_key)
+                else:
+                    # Drive 검색 + 메타데이터
+                    self._spreadsheet = sheets_call(call_log, "open", client.open, self.spreadsheet_name, count=2)
+                    self.spreadsheet_key = self._spreadsheet.id
+                    logger.info(f"🔑 '{self.spreadsheet_name}' 스프레드시트 키: {self.spreadsheet_key} "
+                                f"(GOOGLE_SHEET_KEY로 지정하면 이름 검색 생략)")
+            return self._spreadsheet
+
+    def _load_worksheets(self, call_log=None):
+        spreadsheet = self.spreadsheet(call_log)
+        if self._worksheets is None:
+            worksheets = sheets_call(call_log, "fetch_sheet_metadata", spreadsheet.worksheets)
+            self._worksheets = {worksheet.title: worksheet for worksheet in worksheets}
+        return self._worksheets
+
+    def worksheet(self, title, call_log=None):
+        """캐시된 워크시트를 반환합니다. 없으면 gspread.exceptions.WorksheetNotFound"""
+        with self._lock:
+            worksheets = self._load_worksheets(call_log)
+            if title not in worksheets:
+                raise gspread.exceptions.WorksheetNotFound(title)
+            return worksheets[title]
+
+    def get_or_add_worksheet(self, title, rows="100", cols="20", call_log=None):
+        """워크시트를 반환하고, 없으면 만듭니다. (worksheet, 새로 만들었는지)를 반환합니다."""
+        with self._lock:
+            worksheets = self._load_worksheets(call_log)
+            if title in worksheets:
+                return worksheets[title], False
+            worksheet = sheets_call(call_log, "add_worksheet", self.spreadsheet(call_log).add_worksheet,
+                                    title=title, rows=rows, cols=cols)
+            worksheets[title] = worksheet
+            return worksheet, True
+
+    def worksheets(self, call_log=None):
+        with self._lock:
+            return list(self._load_worksheets(call_log).values())
+
+    def refresh(self):
+        """시트를 직접 추가/삭제한 경우 워크시트 캐시를 비웁니다."""
+        with self._lock:
+            self._worksheets = None
+
+
+_SHEETS_SESSIONS = {}
+_SHEETS_SESSIONS_LOCK = threading.Lock()
+
+
+def get_sheets_session(cred_file, spreadsheet_name, spreadsheet_key=None):
+    """같은 (인증 파일, 스프레드시트)에 대해 프로세스 전체에서 하나의 SheetsSession을 반환합니다."""
+    spreadsheet_key = spreadsheet_key or GOOGLE_SHEET_KEY
+    key = (cred_file, spreadsheet_key or spreadsheet_name)
+    with _SHEETS_SESSIONS_LOCK:
+        if key not in _SHEETS_SESSIONS:
+            _SHEETS_SESSIONS[key] = SheetsSession(cred_file, spreadsheet_name, spreadsheet_key)
+        return _SHEETS_SESSIONS[key]
+
+
+def _add_call(call_log, name, count=1):
+    if call_log is not None:
+        call_log.add(name, count)
+
+
+# Sheets API 할당량 (서비스 계정 = 사용자 1명 기준, 분당 요청 수)
+SHEETS_READS_PER_MINUTE = int(os.getenv("CIGRO_SHEETS_READS_PER_MIN", "60"))
+SHEETS_WRITES_PER_MINUTE = int(os.getenv("CIGRO_SHEETS_WRITES_PER_MIN", "60"))
+SHEETS_MAX_RETRIES = 5
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# 쓰기는 요청이 반영된 뒤 5xx가 올 수도 있어, 반영되지 않은 것이 확실한 응답에만 재시도 (중복 삭제/추가 방지)
+RETRYABLE_WRITE_STATUS = {429, 503}
+WRITE_CALLS = {"batchUpdate", "values.batchUpdate", "update", "append_rows", "add_worksheet"}
+
+
+class TokenBucket:
+    """분당 rate_per_minute개 토큰이 채워지는 버킷. acquire()는 토큰이 생길 때까지 기다린 시간을 반환합니다."""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, count=1):
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= count:
+                    self.tokens -= count
+                    return waited
+                delay = (count - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def drain(self):
+        """429를 받으면 버킷을 비워, 다른 스레드도 토큰이 다시 찰 때까지 기다리게 합니다."""
+        with self._lock:
+            self.tokens = 0.0
+            self.updated = time.monotonic()
+
+
+class SheetsQuota:
+    """읽기/쓰기 토큰 버킷과 실행 전체의 할당량 사용량 집계"""
+
+    def __init__(self, reads_per_minute=SHEETS_READS_PER_MINUTE, writes_per_minute=SHEETS_WRITES_PER_MINUTE):
+        self.buckets = {"read": TokenBucket(reads_per_minute), "write": TokenBucket(writes_per_minute)}
+        self.used = {"read": 0, "write": 0}
+        self.waited = 0.0
+        self.retries = {}
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, name, count=1):
+        kind = "write" if name in WRITE_CALLS else "read"
+        waited = self.buckets[kind].acquire(count)
+        with self._lock:
+            self.used[kind] += count
+            self.waited += waited
+
+    def record_retry(self, name, status):
+        kind = "write" if name in WRITE_CALLS else "read"
+        if status == 429:
+            self.buckets[kind].drain()
+        with self._lock:
+            self.retries[status] = self.retries.get(status, 0) + 1
+
+    def summary(self):
+        with self._lock:
+            minutes = max((time.monotonic() - self.started) / 60.0, 1 / 60.0)
+            retries = ", ".join(f"{status} x{count}" for status, count in sorted(self.retries.items())) or "없음"
+            return (f"읽기 {self.used['read']}회 / 쓰기 {self.used['write']}회 "
+                    f"(분당 {self.used['read'] / minutes:.1f} / {self.used['write'] / minutes:.1f}, "
+                    f"한도 {SHEETS_READS_PER_MINUTE} / {SHEETS_WRITES_PER_MINUTE}), "
+                    f"할당량 대기 {self.waited:.1f}초, 재시도 {retries}")
+
+
+SHEETS_QUOTA = SheetsQuota()
+
+
+def _retry_delay(error, attempt):
+    """Retry-After 헤더가 있으면 따르고, 없으면 지수 백오프 + 지터"""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return min(2 ** attempt, 64) + random.random()
+
+
+def sheets_call(call_log, name, fn, *args, count=1, **kwargs):
+    """
+    Sheets API 호출을 할당량 토큰을 받은 뒤 실행하고, 429/5xx면 Retry-After/백오프로 재시도합니다.
+    성공하면 call_log에 호출 수를 기록하고 결과를 반환합니다.
+    """
+    retryable = RETRYABLE_WRITE_STATUS if name in WRITE_CALLS else RETRYABLE_STATUS
+    for attempt in range(SHEETS_MAX_RETRIES + 1):
+        SHEETS_QUOTA.acquire(name, count)
+        try:
+            result = fn(*args, **kwargs)
+            break
+        except gspread.exceptions.APIError as e:
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            if status not in retryable or attempt == SHEETS_MAX_RETRIES:
+                raise
+            delay = _retry_delay(e, attempt)
+            SHEETS_QUOTA.record_retry(name, status)
+            logger.warning(f"⏳ Sheets API {name} 응답 {status} → {delay:.1f}초 후 재시도 ({attempt + 1}/{SHEETS_MAX_RETRIES})")
+            time.sleep(delay)
+    _add_call(call_log, name, count)
+    return result
+
+
+def run_uploads(jobs, concurrency=4):
+    """
+    (시트 이름, 업로드 함수) 목록을 병렬로 실행하고 작업 순서대로 (결과, 오류) 목록을 반환합니다.
+    같은 시트의 작업은 행 번호/인덱스가 꼬이지 않도록 한 스레드에서 순서대로 실행하고,
+    전체 속도는 SHEETS_QUOTA 토큰 버킷이 할당량 한도에 맞춥니다.
+    """
+    by_sheet = {}
+    for position, (sheet_name, upload) in enumerate(jobs):
+        by_sheet.setdefault(sheet_name, []).append((position, upload))
+
+    results = [(None, None)] * len(jobs)
+
+    def run_sheet(entries):
+        for position, upload in entries:
+            try:
+                results[position] = (upload(), None)
+            except Exception as e:
+                results[position] = (None, e)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        list(executor.map(run_sheet, by_sheet.values()))
+    return results
+
+
+# 청크 하나(batchUpdate 한 번)에 보낼 최대 셀 수 (셀당 JSON 50~100바이트 → 요청 1~2MB, Sheets 권장 크기 이하)
+UPLOAD_CHUNK_CELLS = int(os.getenv("CIGRO_UPLOAD_CHUNK_CELLS", "20000"))
+
+
+def merge_row_ranges(row_numbers):
+    """행 번호 목록을 연속 구간 [(start, end), ...]으로 묶습니다. (오름차순, 양끝 포함)"""
+    rows = sorted(set(row_numbers))
+    if not rows:
+        return []
+
+    ranges = []
+    start = prev = rows[0]
+    for row in rows[1:]:
+        if row == prev + 1:
+            prev = row
+        else:
+            ranges.append((start, prev))
+            start = prev = row
+    ranges.append((start, prev))
+    return ranges
+
+
+def to_cell_data(value):
+    """파이썬 값을 CellData로 변환합니다. (append_rows의 RAW 입력과 같은 해석)"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return {}
+    if isinstance(value, bool):
+        return {"userEnteredValue": {"boolValue": value}}
+    if isinstance(value, (int, float)):
+        return {"userEnteredValue": {"numberValue": value}}
+    if hasattr(value, "item"):  # numpy 스칼라
+        return to_cell_data(value.item())
+    return {"userEnteredValue": {"stringValue": str(value)}}
+
+
+def delete_rows_requests(sheet_id, row_numbers):
+    """행 번호(1-based) 목록을 연속 구간별 DeleteDimension 요청으로 만듭니다. 뒤 구간부터 삭제합니다."""
+    return [
+        {
+            "deleteDimension": {
+                "range": {
+                    "sheetId": sheet_id,
+                    "dimension": "ROWS",
+                    "startIndex": start - 1,
+                    "endIndex": end,
+                }
+            }
+        }
+        for start, end in reversed(merge_row_ranges(row_numbers))
+    ]
+
+
+def append_cells_request(sheet_id, rows):
+    return {
+        "appendCells": {
+            "sheetId": sheet_id,
+            "rows": [{"values": [to_cell_data(value) for value in row]} for row in rows],
+            "fields": "userEnteredValue",
+        }
+    }
+
+
+def replace_rows(sheet, rows_to_delete, rows_to_add, call_log=None, extra_requests=None):
+    """
+    rows_to_delete 행들을 지우고 rows_to_add를 시트 끝에 추가하는 작업을
+    spreadsheets.batchUpdate 한 번으로 전송합니다.
+
+    Args:
+        sheet: gspread Worksheet
+        rows_to_delete: 삭제할 행 번호(1-based, 헤더 포함 기준) 목록
+        rows_to_add: 추가할 행 값 목록 (list of list)
+        call_log: ApiCallLog (호출 수 집계용, 선택)
+        extra_requests: 같은 batchUpdate에 함께 보낼 요청 (인덱스 저장 등)
+
+    Returns:
+        삭제한 연속 구간 수
+    """
+    delete_requests = delete_rows_requests(sheet.id, rows_to_delete)
+    requests = list(delete_requests)
+    if rows_to_add:
+        requests.append(append_cells_request(sheet.id, rows_to_add))
+    if not requests:
+        return 0
+    requests.extend(extra_requests or [])
+
+    sheets_call(call_log, "batchUpdate", sheet.spreadsheet.batch_update, {"requests": requests})
+    return len(delete_requests)
+
+
+def replace_dates_chunked(sheet, rows_by_date, date_rows=None, date_index=None, call_log=None,
+                          chunk_cells=None, on_chunk=None, total_rows=None):
+    """
+    날짜별로 기존 행을 지우고 새 행을 시트 끝에 추가하는 작업을 청크 단위 batchUpdate로 보냅니다.
+
+    청크는 날짜 경계에서 나누고 (한 날짜는 한 청크에), 셀 수가 chunk_cells를 넘지 않게 묶습니다.
+    청크마다 그 날짜들의 기존 행 삭제 + 새 행 추가 + 날짜 인덱스 저장을 batchUpdate 한 번으로 보내므로,
+    중간에 실패해도 이미 반영된 청크의 날짜들은 완전히 교체된 상태입니다.
+
+    Args:
+        rows_by_date: [(날짜, 행 값 목록)] 순서대로 (iterable이면 청크만큼씩 꺼내 씀)
+        date_rows: {날짜: 기존 행 번호 목록} - 앞 청크의 삭제로 당겨진 행 번호는 자동으로 보정
+        on_chunk: 청크가 반영될 때마다 그 청크의 날짜 목록으로 호출 (로컬 저장소 반영 기록 등)
+        total_rows: 진행률 출력용 전체 행 수 (선택)
+
+    Returns:
+        보낸 청크 수
+    """
+    chunk_cells = chunk_cells or UPLOAD_CHUNK_CELLS
+    date_rows = dict(date_rows or {})
+    deleted = []  # 지금까지 삭제한 원래 행 번호 (정렬)
+    sent_rows = 0
+    chunks = 0
+
+    def send(chunk):
+        nonlocal sent_rows, chunks
+        dates = [date for date, _ in chunk]
+        original = sorted(row for date in dates for row in date_rows.get(date, []))
+        rows_to_delete = [row - bisect.bisect_left(deleted, row) for row in original]
+        rows = [row for _, date_values in chunk for row in date_values]
+        requests = []
+        if date_index is not None:
+            located = date_index.row is not None
+            date_index.record_delete(rows_to_delete)
+            date_index.record_append([(date, len(date_values)) for date, date_values in chunk])
+            requests = date_index.save_requests() if date_index.dirty else []
+        replace_rows(sheet, rows_to_delete, rows, call_log, requests)
+        if date_index is not None:
+            date_index.dirty = False
+            if requests and not located:
+                date_index.locate()  # 새로 추가된 인덱스 행 위치 (다음 청크는 그 행을 갱신)
+        for row in original:
+            bisect.insort(deleted, row)
+        sent_rows += len(rows)
+        chunks += 1
+        progress = f"{sent_rows}/{total_rows}행" if total_rows else f"{sent_rows}행"
+        logger.info(f"📤 {sheet.title} 시트 청크 {chunks}: {len(dates)}개 날짜, 삭제 {len(rows_to_delete)}행 / "
+                    f"추가 {len(rows)}행 반영 (누적 {progress})")
+        if on_chunk:
+            on_chunk(dates)
+
+    chunk = []
+    cells = 0
+    for date, date_values in rows_by_date:
+        date_cells = sum(len(row) for row in date_values)
+        if chunk and cells + date_cells > chunk_cells:
+            send(chunk)
+            chunk = []
+            cells = 0
+        chunk.append((date, date_values))
+        cells += date_cells
+    if chunk:
+        send(chunk)
+    return chunks
+
+
+# 매출(상품/옵션) 시트의 행 식별 키와 비교 대상 지표
+PRODUCT_KEY_COLUMNS = ['판매처', '제품명', '옵션명', 'date']
+PRODUCT_METRIC_COLUMNS = ['원가', '판매량', '결제금액']
+# 증가가 아니라 0에서 실제 값으로 채워질 때만 교체 사유가 되는 지표
+FILL_METRIC_COLUMNS = ['원가']
+
+
+def parse_numbers(values):
+    """'1,234원', '12%', '-', '' 같은 문자열 열을 한 번에 숫자로 변환합니다. 변환할 수 없는 값은 0입니다."""
+    text = values.astype(str).str.replace(r'[,원%]', '', regex=True).str.strip()
+    return pd.to_numeric(text, errors='coerce').fillna(0.0).astype(float)
+
+
+def _key_frame(df, key_columns, metric_columns):
+    """키 열은 공백을 제거한 문자열로, 지표 열은 숫자로 정규화한 비교용 DataFrame을 만듭니다."""
+    frame = pd.DataFrame(index=df.index)
+    for column in key_columns:
+        frame[column] = df[column].astype(str).str.strip() if column in df.columns else ''
+    for column in metric_columns:
+        frame[column] = parse_numbers(df[column]) if column in df.columns else 0.0
+    return frame
+
+
+class DateDiff:
+    """한 날짜의 기존 시트 데이터와 새 데이터의 비교 결과"""
+
+    def __init__(self, date, new_count, existing_count, added, removed, changed, replace_reason=None):
+        self.date = date
+        self.new_count = new_count
+        self.existing_count = existing_count
+        self.added = added  # 새 데이터에만 있는 키
+        self.removed = removed  # 기존 시트에만 있는 키
+        self.changed = changed  # 양쪽에 있고 지표 값이 다른 키
+        self.replace_reason = replace_reason  # 교체가 필요하면 사유, 아니면 None
+
+    @property
+    def is_new(self):
+        return self.existing_count == 0
+
+    @property
+    def should_replace(self):
+        return self.replace_reason is not None
+
+
+def _row_keys(rows, key_columns):
+    return set(rows[key_columns].itertuples(index=False, name=None))
+
+
+def _replace_reason(new_count, existing_count, matched, metric_columns):
+    """
+    매출 시트 교체 규칙에 따라 교체 사유를 반환합니다.
+    1. 새 데이터 행 수가 더 많으면 교체
+    2. 같은 키의 지표가 증가했으면 교체 (FILL_METRIC_COLUMNS의 지표는 0에서 실제 값으로 바뀐 경우만)
+       (새 데이터 순서상 처음 해당하는 행 기준으로 사유 표시, 같은 행이면 metric_columns 순서)
+    """
+    if new_count > existing_count:
+        return f"새 데이터가 더 많음 ({new_count} > {existing_count})"
+    if not metric_columns:
+        return None
+
+    rules = []
+    for column in metric_columns:
+        old, new = f'{column}_old', f'{column}_new'
+        if column in FILL_METRIC_COLUMNS:
+            rules.append(((matched[old] == 0) & (matched[new] > 0),
+                          lambda row, new=new, column=column: f"{column} 업데이트 (0 → {row[new]})"))
+        else:
+            rules.append((matched[new] > matched[old],
+                          lambda row, old=old, new=new, column=column: f"{column} 증가 ({row[old]} → {row[new]})"))
+    triggered = pd.concat([mask for mask, _ in rules], axis=1).any(axis=1)
+    if not triggered.any():
+        return None
+
+    first_row = matched[triggered].sort_values('_order').iloc[0]
+    for mask, describe in rules:
+        if mask[first_row.name]:
+            return describe(first_row)
+    return None
+
+
+def diff_by_date(existing_df, new_df, key_columns=PRODUCT_KEY_COLUMNS, metric_columns=PRODUCT_METRIC_COLUMNS):
+    """
+    기존 시트 데이터와 새 데이터를 (판매처, 제품명, 옵션명, date) 키로 조인해 날짜별로 비교합니다.
+    행마다 마스크를 만드는 대신 키 조인 한 번과 열 단위 숫자 변환으로 처리하므로
+    수천 행 규모의 브랜드도 밀리초 단위로 비교합니다.
+
+    Args:
+        existing_df: 시트에서 읽은 기존 데이터 (get_all_records 결과)
+        new_df: 새로 스크래핑한 데이터
+        key_columns: 행 식별 키 열 (마지막 열은 날짜)
+        metric_columns: 비교할 지표 열
+
+    Returns:
+        {날짜: DateDiff} (새 데이터에 있는 날짜만)
+    """
+    date_column = key_columns[-1]
+    new_dates = list(new_df[date_column].unique()) if date_column in new_df.columns else []
+    if not new_dates:
+        return {}
+
+    new_keys = _key_frame(new_df, key_columns, metric_columns)
+    new_keys['_order'] = range(len(new_keys))
+    if date_column in existing_df.columns and not existing_df.empty:
+        relevant = existing_df[existing_df[date_column].astype(str).str.strip().isin(new_keys[date_column])]
+    else:
+        relevant = existing_df.iloc[0:0]
+    old_keys = _key_frame(relevant, key_columns, metric_columns)
+
+    new_counts = new_keys[date_column].value_counts()
+    old_counts = old_keys[date_column].value_counts()
+
+    # 같은 키가 여러 번 나오면 첫 행 기준으로 비교
+    merged = new_keys.drop_duplicates(key_columns).merge(
+        old_keys.drop_duplicates(key_columns), on=key_columns, how='outer',
+        suffixes=('_new', '_old'), indicator=True,
+    )
+    metric_changed = pd.Series(False, index=merged.index)
+    for column in metric_columns:
+        metric_changed |= merged[f'{column}_new'] != merged[f'{column}_old']
+    merged['_changed'] = (merged['_merge'] == 'both') & metric_changed
+
+    groups = dict(tuple(merged.groupby(date_column, sort=False)))
+    diffs = {}
+    for date in new_dates:
+        key = str(date).strip()
+        group = groups.get(key, merged.iloc[0:0])
+        new_count = int(new_counts.get(key, 0))
+        existing_count = int(old_counts.get(key, 0))
+        matched = group[group['_merge'] == 'both']
+        diffs[date] = DateDiff(
+            date,
+            new_count,
+            existing_count,
+            added=_row_keys(group[group['_merge'] == 'left_only'], key_columns),
+            removed=_row_keys(group[group['_merge'] == 'right_only'], key_columns),
+            changed=_row_keys(group[group['_changed']], key_columns),
+            replace_reason=None if existing_count == 0 else _replace_reason(new_count, existing_count, matched, metric_columns),
+        )
+    return diffs
+
+
+def _cell_text(frame):
+    """셀 비교용으로 값을 공백을 제거한 문자열로 정규화합니다. (빈 값/NaN은 '')"""
+    return frame.fillna('').astype(str).apply(lambda column: column.str.strip())
+
+
+def _plain_value(value):
+    """values.batchUpdate에 보낼 수 있도록 numpy 스칼라/NaN을 파이썬 값으로 바꿉니다."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    if hasattr(value, "item"):
+        return _plain_value(value.item())
+    return value
+
+
+def column_letter(number):
+    """1-based 열 번호를 A1 표기 열 문자로 바꿉니다. (1 → A, 27 → AA)"""
+    letters = ''
+    while number:
+        number, remainder = divmod(number - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+class UpsertPlan:
+    """키 기준 셀 단위 반영 계획 (행 번호는 모두 반영 전 시트 기준)"""
+
+    def __init__(self, header, columns):
+        self.header = header  # 시트 헤더 순서
+        self.columns = columns  # 새 데이터에 있는 (비교/기록 대상) 열
+        self.cell_updates = []  # [(행 번호, 열 번호, 값)]
+        self.rows_to_delete = []  # 사라진 키의 행 번호
+        self.inserts = {}  # {이 행 번호 뒤에: [행 값, ...]} (기존 날짜 구간 안에 새 키 추가)
+        self.appends = []  # [(날짜, [행 값, ...])] (시트에 없던 날짜)
+        self.row_deltas = {}  # {날짜: 행 수 변화}
+
+    @property
+    def cells_touched(self):
+        inserted = sum(len(rows) for rows in self.inserts.values()) + sum(len(rows) for _, rows in self.appends)
+        return (len(self.cell_updates) + inserted * len(self.columns)
+                + len(self.rows_to_delete) * len(self.header))
+
+    def summary(self):
+        inserted = sum(len(rows) for rows in self.inserts.values())
+        appended = sum(len(rows) for _, rows in self.appends)
+        return (f"셀 {self.cells_touched}개 (변경 셀 {len(self.cell_updates)}, 키 추가 {inserted}행, "
+                f"신규 날짜 {appended}행, 키 삭제 {len(self.rows_to_delete)}행)")
+
+
+def _sheet_row(record, header, columns):
+    """새 데이터 한 행을 시트 헤더 순서의 값 목록으로 만듭니다. (새 데이터에 없는 열은 빈 값)"""
+    return [_plain_value(record[column]) if column in columns else None for column in header]
+
+
+def plan_upsert(existing_df, new_df, append_df=None, key_columns=PRODUCT_KEY_COLUMNS):
+    """
+    기존 행(existing_df, 인덱스 = 행 번호 - 2)과 새 데이터를 키로 맞춰
+    바뀐 셀만 수정, 새 키는 해당 날짜 구간 끝에 삽입, 사라진 키는 삭제하는 계획을 만듭니다.
+    append_df는 시트에 없던 날짜의 행으로 시트 끝에 추가합니다.
+    새 데이터에 시트 헤더에 없는 열이 있으면 셀 단위로 맞출 수 없으므로 None을 반환합니다.
+    """
+    header = list(existing_df.columns)
+    columns = [column for column in header if column in new_df.columns]
+    if any(column not in header for column in new_df.columns) or any(k not in columns for k in key_columns):
+        return None
+
+    date_column = key_columns[-1]
+    plan = UpsertPlan(header, columns)
+
+    # 새 데이터의 행은 위치(_order)로 찾으므로 필터링된 DataFrame도 0부터 다시 번호를 매김
+    new_records = new_df.reset_index(drop=True)
+    old = _cell_text(existing_df[columns])
+    old['_row'] = existing_df.index + 2
+    new = _cell_text(new_records[columns])
+    new['_order'] = range(len(new))
+
+    # 같은 키가 여러 행이면 첫 행끼리 맞추고, 나머지는 기존 쪽은 삭제 / 새 쪽은 추가
+    old_duplicated = old.duplicated(key_columns)
+    new_duplicated = new.duplicated(key_columns)
+    merged = new[~new_duplicated].merge(old[~old_duplicated], on=key_columns, how='outer',
+                                        suffixes=('', '_old'), indicator=True)
+
+    matched = merged[merged['_merge'] == 'both']
+    for column_number, column in enumerate(header, start=1):
+        if column not in columns or column in key_columns:
+            continue
+        changed = matched[matched[column] != matched[f'{column}_old']]
+        for row, order in zip(changed['_row'], changed['_order']):
+            plan.cell_updates.append((int(row), column_number, _plain_value(new_records.at[int(order), column])))
+
+    removed = pd.concat([merged.loc[merged['_merge'] == 'right_only', [date_column, '_row']],
+                         old.loc[old_duplicated, [date_column, '_row']]])
+    plan.rows_to_delete = sorted(int(row) for row in removed['_row'])
+    for date, count in removed[date_column].value_counts().items():
+        plan.row_deltas[date] = plan.row_deltas.get(date, 0) - int(count)
+
+    added_orders = sorted(int(order) for order in merged.loc[merged['_merge'] == 'left_only', '_order'])
+    added_orders += [int(order) for order in new.loc[new_duplicated, '_order']]
+    last_row_by_date = old.groupby(date_column)['_row'].max()
+    for order in sorted(added_orders):
+        date = new.at[order, date_column]
+        anchor = int(last_row_by_date[date])  # diff 대상 날짜이므로 기존 행이 항상 있음
+        plan.inserts.setdefault(anchor, []).append(_sheet_row(new_records.loc[order], header, columns))
+        plan.row_deltas[date] = plan.row_deltas.get(date, 0) + 1
+
+    if append_df is not None and not append_df.empty:
+        append_records = append_df.reset_index(drop=True)
+        for date, rows in append_records.groupby(date_column, sort=False):
+            plan.appends.append((date, [_sheet_row(record, header, columns) for _, record in rows.iterrows()]))
+    return plan
+
+
+def cell_update_ranges(cell_updates):
+    """(행, 열, 값) 목록을 같은 행에서 이어진 열끼리 묶어 values.batchUpdate 데이터로 만듭니다."""
+    data = []
+    for row, column, value in sorted(cell_updates):
+        last = data[-1] if data else None
+        if last and last["_row"] == row and last["_end"] == column - 1:
+            last["values"][0].append(value)
+            last["_end"] = column
+        else:
+            data.append({"_row": row, "_start": column, "_end": column, "values": [[value]]})
+    return [
+        {"range": f"{column_letter(item['_start'])}{item['_row']}:{column_letter(item['_end'])}{item['_row']}",
+         "values": item["values"]}
+        for item in data
+    ]
+
+
+def apply_upsert(sheet, plan, call_log=None, date_index=None):
+    """
+    계획을 시트에 반영합니다.
+    1. 바뀐 셀만 values.batchUpdate 한 번으로 수정 (행 위치는 그대로)
+    2. 키 삭제/삽입은 아래 행부터 처리해 반영 전 행 번호를 그대로 쓰고,
+       신규 날짜 추가와 날짜 인덱스 갱신까지 spreadsheets.batchUpdate 한 번으로 전송
+    """
+    if plan.cell_updates:
+        sheets_call(call_log, "values.batchUpdate", sheet.batch_update,
+                    cell_update_ranges(plan.cell_updates), value_input_option="RAW")
+
+    # 삭제 구간은 시작 행, 삽입은 기준 행 바로 뒤를 위치로 잡고 아래쪽부터 처리
+    # (삽입 위치를 가로지르는 삭제 구간은 나눠서, 먼저 처리한 작업이 나중 작업의 행 번호를 바꾸지 않게 함)
+    operations = []
+    for start, end in merge_row_ranges(plan.rows_to_delete):
+        for anchor in sorted(anchor for anchor in plan.inserts if start <= anchor < end):
+            operations.append((start, "delete", (start, anchor)))
+            start = anchor + 1
+        operations.append((start, "delete", (start, end)))
+    operations += [(anchor + 0.5, "insert", (anchor, rows)) for anchor, rows in plan.inserts.items()]
+    requests = []
+    for _, kind, detail in sorted(operations, key=lambda operation: operation[0], reverse=True):
+        if kind == "delete":
+            start, end = detail
+            requests.append({"deleteDimension": {"range": {
+                "sheetId": sheet.id, "dimension": "ROWS", "startIndex": start - 1, "endIndex": end}}})
+        else:
+            anchor, rows = detail
+            requests.append({"insertDimension": {"range": {
+                "sheetId": sheet.id, "dimension": "ROWS", "startIndex": anchor, "endIndex": anchor + len(rows)},
+                "inheritFromBefore": True}})
+            requests.append({"updateCells": {
+                "start": {"sheetId": sheet.id, "rowIndex": anchor, "columnIndex": 0},
+                "rows": [{"values": [to_cell_data(value) for value in row]} for row in rows],
+                "fields": "userEnteredValue"}})
+
+    appended_rows = [row for _, rows in plan.appends for row in rows]
+    if appended_rows:
+        requests.append(append_cells_request(sheet.id, appended_rows))
+
+    if date_index is not None:
+        date_index.record_resize(plan.row_deltas)
+        date_index.record_append([(date, len(rows)) for date, rows in plan.appends])
+        if date_index.dirty:
+            requests.extend(date_index.save_requests())
+
+    if requests:
+        sheets_call(call_log, "batchUpdate", sheet.spreadsheet.batch_update, {"requests": requests})
+    return plan.cells_touched
+
+
+# 날짜 → 행 구간 인덱스를 저장하는 숨김 워크시트
+DATE_INDEX_SHEET_NAME = "_date_index"
+DATE_INDEX_HEADERS = ["sheet", "layout", "updated_at", "archived_through"]
+
+
+def runs_from_dates(dates):
+    """
+    2행부터의 date 열 값을 위에서부터 [(날짜, 연속 행 수), ...]로 묶습니다.
+    날짜가 빈 행은 ('', 행 수)로 남기고, 한 날짜가 떨어진 두 구간에 있으면 None을 반환합니다.
+    """
+    runs = []
+    for date in dates:
+        date = str(date).strip()
+        if runs and runs[-1][0] == date:
+            runs[-1] = (date, runs[-1][1] + 1)
+        elif date and any(run_date == date for run_date, _ in runs):
+            return None
+        else:
+            runs.append((date, 1))
+    return runs
+
+
+def encode_layout(runs):
+    return ",".join(f"{date}:{count}" for date, count in runs)
+
+
+def decode_layout(text):
+    runs = []
+    for item in filter(None, str(text).split(",")):
+        date, _, count = item.rpartition(":")
+        runs.append((date, int(count)))
+    return runs
+
+
+class DateRowIndex:
+    """
+    데이터 시트 하나의 날짜 → (첫 행, 마지막 행) 인덱스.
+
+    숨김 워크시트(_date_index)에 시트별로 [시트 이름, 레이아웃, 갱신 시각, 아카이브 월] 한 행을 저장합니다.
+    레이아웃은 2행부터 아래로 이어지는 '날짜:행 수' 목록입니다. 시트별로 행이 나뉘어 있어
+    다른 시트를 올리는 스크립트가 동시에 실행되어도 서로의 인덱스를 덮어쓰지 않습니다.
+    레이아웃이 비어 있으면 인덱스가 없는 것으로 보고 업로더는 시트 전체를 읽습니다.
+    아카이브 월(YYYY-MM)이 있으면 그 월까지의 데이터는 연도별 아카이브 시트로 옮겨진 것입니다. (cigro_archive)
+    """
+
+    def __init__(self, session, sheet_name, call_log=None):
+        self.session = session
+        self.spreadsheet = session.spreadsheet(call_log)
+        self.sheet_name = sheet_name
+        self.call_log = call_log
+        self.worksheet = None
+        self.row = None  # 인덱스 워크시트에서 이 시트가 저장된 행 번호
+        self.runs = None
+        self.archived_through = None  # 이 월(YYYY-MM)까지의 데이터는 아카이브 시트에 있음
+        self.dirty = False
+
+    def load(self):
+        self.worksheet, created = self.session.get_or_add_worksheet(
+            DATE_INDEX_SHEET_NAME, rows="100", cols=str(len(DATE_INDEX_HEADERS)), call_log=self.call_log)
+        if created:
+            sheets_call(self.call_log, "batchUpdate", self.spreadsheet.batch_update, {"requests": [
+                {"updateSheetProperties": {"properties": {"sheetId": self.worksheet.id, "hidden": True},
+                                           "fields": "hidden"}},
+                {"updateCells": {"start": {"sheetId": self.worksheet.id, "rowIndex": 0, "columnIndex": 0},
+                                 "rows": [{"values": [to_cell_data(h) for h in DATE_INDEX_HEADERS]}],
+                                 "fields": "userEnteredValue"}},
+            ]})
+            return self
+
+        values = sheets_call(self.call_log, "get_all_values", self.worksheet.get_all_values)
+        if values and len(values[0]) < len(DATE_INDEX_HEADERS):
+            self._add_header_columns(len(values[0]))
+        for row_number, row in enumerate(values, start=1):
+            if row_number > 1 and row and row[0] == self.sheet_name:
+                self.row = row_number
+                self.archived_through = row[3] if len(row) > 3 and row[3] else None
+                layout = row[1] if len(row) > 1 else ""
+                try:
+                    self.runs = decode_layout(layout) if layout else None
+                except ValueError:
+                    logger.warning(f"⚠️ {self.sheet_name} 시트 인덱스를 해석할 수 없어 무시합니다: {layout[:50]}")
+                    self.runs = None
+        return self
+
+    def _add_header_columns(self, header_length):
+        """이전 버전에서 만든 인덱스 워크시트에 새 열(헤더)을 추가합니다."""
+        requests = []
+        if self.worksheet.col_count < len(DATE_INDEX_HEADERS):
+            requests.append({"appendDimension": {"sheetId": self.worksheet.id, "dimension": "COLUMNS",
+                                                 "length": len(DATE_INDEX_HEADERS) - self.worksheet.col_count}})
+        requests.append({"updateCells": {
+            "start": {"sheetId": self.worksheet.id, "rowIndex": 0, "columnIndex": header_length},
+            "rows": [{"values": [to_cell_data(h) for h in DATE_INDEX_HEADERS[header_length:]]}],
+            "fields": "userEnteredValue"}})
+        sheets_call(self.call_log, "batchUpdate", self.spreadsheet.batch_update, {"requests": requests})
+
+    def locate(self):
+        """인덱스 워크시트에서 이 시트의 행 번호를 다시 찾습니다. (appendCells로 처음 저장한 뒤)"""
+        values = sheets_call(self.call_log, "get_all_values", self.worksheet.get_all_values)
+        for row_number, row in enumerate(values, start=1):
+            if row_number > 1 and row and row[0] == self.sheet_name:
+                self.row = row_number
+
+    @property
+    def is_indexed(self):
+        return self.runs is not None
+
+    @property
+    def data_end(self):
+        """인덱스 기준 마지막 데이터 행 번호 (헤더만 있으면 1)"""
+        return 1 + sum(count for _, count in self.runs or [])
+
+    def spans(self):
+        spans = {}
+        row = 2
+        for date, count in self.runs or []:
+            if date:
+                spans[date] = (row, row + count - 1)
+            row += count
+        return spans
+
+    def span(self, date):
+        return self.spans().get(str(date).strip())
+
+    def verify_spans(self, sheet, dates):
+        """
+        dates의 인덱스 구간이 시트와 맞는지 batch_get 한 번으로 점검합니다. (시트에서 행을 직접 넣거나 정렬한 경우 대비)
+        구간의 첫/마지막 행 date 값이 그 날짜이고, 바로 위/아래 행은 다른 날짜여야 합니다.
+        맞지 않으면 인덱스를 비우고 False를 반환합니다. 호출부는 시트 전체를 읽어 인덱스를 다시 만들어야 합니다.
+        """
+        spans = {str(date).strip(): self.span(date) for date in dates}
+        spans = {date: span for date, span in spans.items() if span}
+        if not spans:
+            return True
+
+        rows = sorted({row for first, last in spans.values() for row in (first - 1, first, last, last + 1) if row >= 2})
+        results = sheets_call(self.call_log, "batch_get", sheet.batch_get, ["1:1"] + [f"{row}:{row}" for row in rows])
+        header = results[0][0] if results[0] else []
+        mismatched = "date" not in header
+        if not mismatched:
+            column = header.index("date")
+            cells = {row: str(values[0][column]).strip() if values and len(values[0]) > column else ""
+                     for row, values in zip(rows, results[1:])}
+            mismatched = any(cells.get(first) != date or cells.get(last) != date
+                             or cells.get(first - 1) == date or cells.get(last + 1) == date
+                             for date, (first, last) in spans.items())
+        if mismatched:
+            logger.warning(f"⚠️ {self.sheet_name} 시트가 날짜 인덱스와 맞지 않습니다. (시트 직접 편집?) "
+                           f"시트 전체를 읽어 인덱스를 다시 만듭니다.")
+            self.runs = None
+            self.dirty = True
+            return False
+        return True
+
+    def is_archived(self, date):
+        """날짜가 아카이브 시트로 옮겨진 월에 속하는지"""
+        return bool(self.archived_through) and str(date).strip()[:7] <= self.archived_through
+
+    def rebuild_from_dates(self, dates):
+        """시트 전체를 읽은 김에 date 열 값으로 인덱스를 다시 만듭니다."""
+        runs = runs_from_dates(dates)
+        if runs != self.runs:
+            self.runs = runs
+            self.dirty = True
+        if runs is None:
+            logger.warning(f"⚠️ {self.sheet_name} 시트에 같은 날짜가 떨어져 있어 인덱스를 만들 수 없습니다.")
+
+    def record_delete(self, row_numbers):
+        """행 삭제를 인덱스에 반영합니다. (삭제 후 아래 행들이 당겨짐)"""
+        if self.runs is None or not row_numbers:
+            return
+        ranges = merge_row_ranges(row_numbers)
+        runs = []
+        row = 2
+        for date, count in self.runs:
+            first, last = row, row + count - 1
+            removed = sum(max(0, min(last, end) - max(first, start) + 1) for start, end in ranges)
+            row += count
+            if count == removed:
+                continue
+            if runs and runs[-1][0] == date:
+                runs[-1] = (date, runs[-1][1] + count - removed)
+            else:
+                runs.append((date, count - removed))
+        self.runs = runs
+        self.dirty = True
+
+    def record_resize(self, row_deltas):
+        """날짜 구간 안에서 행이 늘거나 줄어든 것을 인덱스에 반영합니다. (구간 위치는 유지)"""
+        if self.runs is None or not any(row_deltas.values()):
+            return
+        runs = []
+        for date, count in self.runs:
+            count += row_deltas.get(date, 0) if date else 0
+            if count <= 0:
+                continue
+            if runs and runs[-1][0] == date:
+                runs[-1] = (date, runs[-1][1] + count)
+            else:
+                runs.append((date, count))
+        self.runs = runs
+        self.dirty = True
+
+    def record_append(self, date_counts):
+        """시트 끝에 날짜별로 이어서 추가한 행을 인덱스에 반영합니다."""
+        if self.runs is None:
+            return
+        for date, count in date_counts:
+            date = str(date).strip()
+            if not count:
+                continue
+            self.dirty = True
+            if self.runs and self.runs[-1][0] == date:
+                self.runs[-1] = (date, self.runs[-1][1] + count)
+            elif date and date in self.spans():
+                logger.warning(f"⚠️ {self.sheet_name} 시트의 {date} 데이터가 떨어진 구간에 추가되어 인덱스를 비웁니다.")
+                self.runs = None
+                break
+            else:
+                self.runs.append((date, count))
+
+    def save_requests(self):
+        """인덱스 저장 요청 (데이터 변경과 같은 batchUpdate에 넣어 함께 반영)"""
+        values = [self.sheet_name, encode_layout(self.runs) if self.runs else "",
+                  datetime.now().strftime('%Y-%m-%d %H:%M:%S'), self.archived_through or ""]
+        rows = [{"values": [to_cell_data(value) for value in values]}]
+        if self.row is None:
+            return [{"appendCells": {"sheetId": self.worksheet.id, "rows": rows, "fields": "userEnteredValue"}}]
+        return [{"updateCells": {"start": {"sheetId": self.worksheet.id, "rowIndex": self.row - 1, "columnIndex": 0},
+                                 "rows": rows, "fields": "userEnteredValue"}}]
+
+    def save(self):
+        sheets_call(self.call_log, "batchUpdate", self.spreadsheet.batch_update, {"requests": self.save_requests()})
+        self.dirty = False
+
+
+def read_date_spans(sheet, spans, call_log=None):
+    """
+    헤더와 지정한 행 구간들만 batch_get 한 번으로 읽어 DataFrame으로 반환합니다.
+    인덱스는 get_all_records 결과와 같게 '행 번호 - 2'입니다.
+    """
+    results = sheets_call(call_log, "batch_get", sheet.batch_get, ["1:1"] + [f"{first}:{last}" for first, last in spans])
+    headers = results[0][0] if results[0] else []
+
+    rows = []
+    index = []
+    for (first, last), values in zip(spans, results[1:]):
+        for offset in range(last - first + 1):
+            row = list(values[offset]) if offset < len(values) else []
+            rows.append((row + [''] * len(headers))[:len(headers)])
+            index.append(first + offset - 2)
+    return pd.DataFrame(rows, columns=headers, index=index)
+
+
+def read_sheet_rows(sheet, date_index, dates, call_log=None):
+    """
+    dates의 기존 행을 읽습니다. 인덱스가 있으면 해당 날짜 구간만 읽고, 없으면 시트 전체를 읽은 뒤
+    읽은 김에 인덱스를 만듭니다. 반환 DataFrame의 인덱스는 '행 번호 - 2'입니다.
+    """
+    if date_index.is_indexed:
+        spans = [span for span in (date_index.span(date) for date in dates) if span]
+        logger.info(f"📇 {date_index.sheet_name} 시트 날짜 인덱스 사용: {len(spans)}개 구간만 읽음")
+        return read_date_spans(sheet, spans, call_log) if spans else pd.DataFrame()
+
+    records = sheets_call(call_log, "get_all_records", sheet.get_all_records)
+    sheet_df = pd.DataFrame(records)
+    if 'date' in sheet_df.columns:
+        date_index.rebuild_from_dates(sheet_df['date'])
+    return sheet_df
+
+
+def read_date_column(sheet):
+    """date 열 값(2행부터)을 읽습니다. date 헤더가 없으면 None"""
+    header = sheets_call(None, "row_values", sheet.row_values, 1)
+    if "date" not in header:
+        return None
+    return sheets_call(None, "col_values", sheet.col_values, header.index("date") + 1)[1:]
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='날짜 → 행 구간 인덱스 점검/재생성')
+    parser.add_argument('command', choices=['verify-index', 'rebuild-index'],
+                        help='verify-index: 인덱스와 실제 시트 비교, rebuild-index: 실제 시트 기준으로 다시 작성')
+    parser.add_argument('--sheets', type=str, nargs='+', help='대상 시트 이름 (기본값: date 열이 있는 모든 시트)')
+    return parser.parse_args()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_arguments()
+
+    session = get_sheets_session(os.getenv("GOOGLE_CRED_FILE", "google_sheet_credentials.json"),
+                                 os.getenv("GOOGLE_SHEET_NAME", "Cigro Sales"))
+    sheets = [ws for ws in session.worksheets() if ws.title != DATE_INDEX_SHEET_NAME]
+    if args.sheets:
+        sheets = [ws for ws in sheets if ws.title in args.sheets]
+
+    mismatches = 0
+    for sheet in sheets:
+        dates = read_date_column(sheet)
+        if dates is None:
+            if args.sheets:
+                logger.warning(f"⚠️ {sheet.title} 시트에 date 열이 없어 건너뜁니다.")
+            continue
+
+        index = DateRowIndex(session, sheet.title).load()
+        actual = runs_from_dates(dates)
+        if actual == index.runs:
+            logger.info(f"✅ {sheet.title}: 인덱스 일치 ({len(index.spans())}개 날짜, {len(dates)}행)")
+            continue
+
+        mismatches += 1
+        if args.command == 'verify-index':
+            logger.error(f"❌ {sheet.title}: 인덱스 불일치 (저장 {len(index.spans())}개 날짜 / 실제 {len(dates)}행)")
+        else:
+            index.rebuild_from_dates(dates)
+            index.save()
+            logger.info(f"🔧 {sheet.title}: 인덱스 재작성 완료 ({len(index.spans())}개 날짜)")
+
+    if args.command == 'verify-index' and mismatches:
+        logger.error(f"❌ 인덱스 불일치 시트 {mismatches}개 - rebuild-index로 다시 작성하세요.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Cigro 로컬 데이터 저장소
+- 스크래핑한 (리포트, 브랜드, 날짜) 데이터를 리포트/브랜드/월 단위 SQLite 파일로 보관
+- 업로드 정책(교체/유지)은 로컬 데이터 기준으로 판단하고, 바뀐 날짜만 Google Sheets에 반영
+- 날짜별 Sheets 반영 여부(synced)를 기록해, 반영하지 못한 날짜는 다음 업로드 때 다시 반영
+- 날짜별 마지막 스크래핑 시각(scraped_at)을 기록해, 정산이 끝난 날짜는 다시 스크래핑하지 않음 (cigro_planner)
+- 날짜별 변경 감지 지문(fingerprint)을 기록해, 지문이 같으면 전체 페이지 이동을 생략 (cigro_fingerprint)
+
+파일 구조:
+    .cigro_store/<리포트>/<브랜드>/<YYYY-MM>.sqlite
+
+사용 예:
+    python cigro_store.py status
+    python cigro_store.py status --report product/option --brand 바르너
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 저장소 루트 디렉토리
+STORE_DIR = os.getenv("CIGRO_STORE_DIR", ".cigro_store")
+
+KST = timezone(timedelta(hours=9))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dates (
+    date TEXT PRIMARY KEY,
+    columns TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    synced INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL,
+    scraped_at TEXT,
+    fingerprint TEXT
+);
+CREATE TABLE IF NOT EXISTS rows (
+    date TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (date, position)
+);
+"""
+
+
+def _json_value(value):
+    """numpy 스칼라/NaN을 JSON으로 저장할 수 있는 파이썬 값으로 바꿉니다."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if hasattr(value, "item"):
+        return _json_value(value.item())
+    return value
+
+
+class LocalStore:
+    """리포트/브랜드/월 단위 SQLite 파티션에 날짜별 데이터를 보관합니다."""
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def partition_path(self, report, brand, month):
+        return os.path.join(self.root, report.replace("/", "_"), brand, f"{month}.sqlite")
+
+    def _connect(self, report, brand, month, create=False):
+        path = self.partition_path(report, brand, month)
+        if not os.path.exists(path):
+            if not create:
+                return None
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path)
+        conn.executescript(SCHEMA)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(dates)")]
+        for column in ("scraped_at", "fingerprint"):
+            if column not in columns:
+                # 이전 버전에서 만든 파티션
+                conn.execute(f"ALTER TABLE dates ADD COLUMN {column} TEXT")
+        return conn
+
+    @staticmethod
+    def _by_month(dates):
+        months = {}
+        for date in dates:
+            date = str(date).strip()
+            months.setdefault(date[:7], []).append(date)
+        return months
+
+    def load(self, report, brand, dates):
+        """
+        날짜들의 저장된 데이터를 읽습니다.
+
+        Returns:
+            (DataFrame, {날짜: Sheets 반영 여부}) - 저장소에 없는 날짜는 dict에 없음
+        """
+        frames = []
+        synced = {}
+        for month, month_dates in self._by_month(dates).items():
+            conn = self._connect(report, brand, month)
+            if conn is None:
+                continue
+            with closing(conn):
+                placeholders = ",".join("?" * len(month_dates))
+                for date, columns, is_synced in conn.execute(
+                        f"SELECT date, columns, synced FROM dates WHERE date IN ({placeholders})", month_dates):
+                    rows = [json.loads(data) for (data,) in conn.execute(
+                        "SELECT data FROM rows WHERE date = ? ORDER BY position", (date,))]
+                    frames.append(pd.DataFrame(rows, columns=json.loads(columns)))
+                    synced[date] = bool(is_synced)
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        return df, synced
+
+    def put(self, report, brand, df, synced=False, date_column="date"):
+        """df의 날짜별 데이터를 저장합니다. 같은 날짜의 기존 데이터는 교체합니다."""
+        if df.empty:
+            return
+        columns = [str(column) for column in df.columns]
+        updated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        dates = df[date_column].astype(str).str.strip()
+        with self._lock:
+            for month, month_dates in self._by_month(dates.unique()).items():
+                with closing(self._connect(report, brand, month, create=True)) as conn, conn:
+                    for date in month_dates:
+                        rows = df[dates == date]
+                        conn.execute("DELETE FROM rows WHERE date = ?", (date,))
+                        conn.executemany(
+                            "INSERT INTO rows (date, position, data) VALUES (?, ?, ?)",
+                            [(date, position, json.dumps([_json_value(value) for value in row], ensure_ascii=False))
+                             for position, row in enumerate(rows.itertuples(index=False, name=None))])
+                        conn.execute(
+                            "INSERT OR REPLACE INTO dates (date, columns, row_count, synced, updated_at) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            (date, json.dumps(columns, ensure_ascii=False), len(rows), int(synced), updated_at))
+
+    def mark_synced(self, report, brand, dates):
+        with self._lock:
+            for month, month_dates in self._by_month(dates).items():
+                conn = self._connect(report, brand, month)
+                if conn is None:
+                    continue
+                with closing(conn), conn:
+                    conn.executemany("UPDATE dates SET synced = 1 WHERE date = ?", [(date,) for date in month_dates])
+
+    def mark_scraped(self, report, brand, dates, fingerprints=None, scraped_at=None):
+        """
+        저장된 날짜들의 마지막 스크래핑 시각(KST)을 기록합니다.
+        fingerprints({날짜: 지문})가 있으면 그 날짜의 변경 감지 지문도 기록합니다. (없는 날짜는 기존 지문 유지)
+        """
+        scraped_at = (scraped_at or datetime.now(KST)).strftime('%Y-%m-%d %H:%M:%S')
+        fingerprints = fingerprints or {}
+        with self._lock:
+            for month, month_dates in self._by_month(dates).items():
+                conn = self._connect(report, brand, month)
+                if conn is None:
+                    continue
+                with closing(conn), conn:
+                    conn.executemany("UPDATE dates SET scraped_at = ?, fingerprint = COALESCE(?, fingerprint) "
+                                     "WHERE date = ?",
+                                     [(scraped_at, fingerprints.get(date), date) for date in month_dates])
+
+    def scraped_at(self, report, brand, dates):
+        """{날짜: 마지막 스크래핑 시각 문자열} - 저장소에 없거나 기록이 없는 날짜는 제외"""
+        results = {}
+        for month, month_dates in self._by_month(dates).items():
+            conn = self._connect(report, brand, month)
+            if conn is None:
+                continue
+            with closing(conn):
+                placeholders = ",".join("?" * len(month_dates))
+                results.update(conn.execute(
+                    f"SELECT date, scraped_at FROM dates WHERE date IN ({placeholders}) AND scraped_at IS NOT NULL",
+                    month_dates).fetchall())
+        return results
+
+    def fingerprints(self, report, brand, dates):
+        """{날짜: 변경 감지 지문} - Sheets에 반영된 날짜만 (저장소 데이터가 바뀌면 지문은 지워짐)"""
+        results = {}
+        for month, month_dates in self._by_month(dates).items():
+            conn = self._connect(report, brand, month)
+            if conn is None:
+                continue
+            with closing(conn):
+                placeholders = ",".join("?" * len(month_dates))
+                results.update(conn.execute(
+                    f"SELECT date, fingerprint FROM dates WHERE date IN ({placeholders}) "
+                    f"AND fingerprint IS NOT NULL AND synced = 1", month_dates).fetchall())
+        return results
+
+    def latest_columns(self, report, brand):
+        """가장 최근 날짜에 저장된 열 목록 (저장된 데이터가 없으면 None)"""
+        brand_path = os.path.join(self.root, report.replace("/", "_"), brand)
+        if not os.path.isdir(brand_path):
+            return None
+        for file_name in sorted(os.listdir(brand_path), reverse=True):
+            if not file_name.endswith(".sqlite"):
+                continue
+            with closing(sqlite3.connect(os.path.join(brand_path, file_name))) as conn:
+                row = conn.execute("SELECT columns FROM dates ORDER BY date DESC LIMIT 1").fetchone()
+            if row:
+                return json.loads(row[0])
+        return None
+
+    def brand_months(self):
+        """{브랜드(시트) 이름: 저장된 월(YYYY-MM) set} - 모든 리포트 합산"""
+        results = {}
+        if not os.path.isdir(self.root):
+            return results
+        for report_dir in sorted(os.listdir(self.root)):
+            report_path = os.path.join(self.root, report_dir)
+            for brand_dir in sorted(os.listdir(report_path)):
+                months = {file_name[:-len(".sqlite")] for file_name in os.listdir(os.path.join(report_path, brand_dir))
+                          if file_name.endswith(".sqlite")}
+                results.setdefault(brand_dir, set()).update(months)
+        return results
+
+    def move_months(self, brand, targets):
+        """
+        모든 리포트에서 brand의 월 파티션을 다른 브랜드(시트) 이름 아래로 옮깁니다.
+        targets: {월(YYYY-MM): 옮길 브랜드 이름}. 대상에 이미 파티션이 있으면 옮기지 않습니다.
+        """
+        moved = 0
+        if not os.path.isdir(self.root):
+            return moved
+        with self._lock:
+            for report_dir in sorted(os.listdir(self.root)):
+                for month, target in targets.items():
+                    source = os.path.join(self.root, report_dir, brand, f"{month}.sqlite")
+                    destination = os.path.join(self.root, report_dir, target, f"{month}.sqlite")
+                    if not os.path.exists(source):
+                        continue
+                    if os.path.exists(destination):
+                        logger.warning(f"⚠️ 로컬 저장소에 이미 {destination} 파티션이 있어 {source}는 옮기지 않습니다.")
+                        continue
+                    os.makedirs(os.path.dirname(destination), exist_ok=True)
+                    os.replace(source, destination)
+                    moved += 1
+        return moved
+
+    def status(self, report=None, brand=None):
+        """[(리포트, 브랜드, 월, 날짜 수, 행 수, Sheets 미반영 날짜 목록)]"""
+        results = []
+        if not os.path.isdir(self.root):
+            return results
+        for report_dir in sorted(os.listdir(self.root)):
+            if report and report_dir != report.replace("/", "_"):
+                continue
+            for brand_dir in sorted(os.listdir(os.path.join(self.root, report_dir))):
+                if brand and brand_dir != brand:
+                    continue
+                brand_path = os.path.join(self.root, report_dir, brand_dir)
+                for file_name in sorted(os.listdir(brand_path)):
+                    if not file_name.endswith(".sqlite"):
+                        continue
+                    with closing(sqlite3.connect(os.path.join(brand_path, file_name))) as conn:
+                        rows = conn.execute("SELECT date, row_count, synced FROM dates ORDER BY date").fetchall()
+                    results.append((report_dir, brand_dir, file_name[:-len(".sqlite")], len(rows),
+                                    sum(count for _, count, _ in rows),
+                                    [date for date, _, is_synced in rows if not is_synced]))
+        return results
+
+
+_LOCAL_STORE = None
+_LOCAL_STORE_LOCK = threading.Lock()
+
+
+def get_local_store():
+    """프로세스 전체에서 공유하는 LocalStore를 반환합니다."""
+    global _LOCAL_STORE
+    with _LOCAL_STORE_LOCK:
+        if _LOCAL_STORE is None:
+            _LOCAL_STORE = LocalStore()
+        return _LOCAL_STORE
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Cigro 로컬 데이터 저장소')
+    parser.add_argument('command', choices=['status'], help='status: 파티션별 날짜/행 수와 Sheets 미반영 날짜 출력')
+    parser.add_argument('--report', type=str, help='리포트 (예: product/option, ad/campaign, ad/ad)')
+    parser.add_argument('--brand', type=str, help='브랜드 이름')
+    return parser.parse_args()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    args = parse_arguments()
+
+    partitions = get_local_store().status(args.report, args.brand)
+    if not partitions:
+        logger.info(f"ℹ️ 저장된 데이터가 없습니다. ({STORE_DIR})")
+        return
+    for report, brand, month, date_count, row_count, unsynced in partitions:
+        line = f"{report} / {brand} / {month}: {date_count}개 날짜, {row_count}행"
+        if unsynced:
+            line += f" - ⚠️ Sheets 미반영 {len(unsynced)}개 ({', '.join(unsynced)})"
+        logger.info(line)
+
+
+if __name__ == "__main__":
+    main()
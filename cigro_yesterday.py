@@ -10,14 +10,23 @@
 
 import os
 import sys
+import time
 import pandas as pd
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 from playwright.sync_api import sync_playwright
+from cigro_archive import get_archive_session, route_archived_dates
+from cigro_browser import (click_and_wait_for_page_change, discard_warm_page, get_warm_page, is_app_loaded,
+                           navigate_in_app, wait_for_table_ready)
+from cigro_fingerprint import (CHANGE_CHECK, ChangeCheck, combine_frames, page_fingerprint, read_texts,
+                               scraped_fingerprints, split_verified, verified_dates, with_fingerprint)
+from cigro_outbox import flush_outbox, get_upload_outbox
+from cigro_planner import INCLUDE_FROZEN, plan_tasks
+from cigro_runtime import LOGIN_FORM_SELECTOR, PROFILE_DIR, ensure_logged_in, log_blocker_summary, open_session, run_tasks
+from cigro_sheets import (SHEETS_QUOTA, ApiCallLog, DateRowIndex, apply_upsert, diff_by_date, get_sheets_session,
+                          merge_row_ranges, plan_upsert, read_sheet_rows, replace_dates_chunked, run_uploads)
+from cigro_store import get_local_store
 from datetime import datetime, timedelta, timezone
 import logging
 import argparse
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 import urllib.request
 import urllib.error
@@ -39,11 +48,20 @@ EMAIL = os.getenv("EMAIL")
 PASSWORD = os.getenv("PASSWORD")
 SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")  # Slack Incoming Webhook URL
 
-# 필수 환경 변수 검증
-if not EMAIL or not PASSWORD:
-    logger.error("❌ EMAIL과 PASSWORD 환경변수가 설정되지 않았습니다.")
-    logger.error("   GitHub Secrets 또는 환경 변수를 확인하세요.")
-    sys.exit(1)
+# 앱 내 이동 모드: 워커당 페이지 하나를 유지하고 브랜드/날짜 변경 시 전체 로드 생략
+SPA_NAVIGATION = os.getenv("CIGRO_SPA_NAVIGATION", "0") == "1"
+
+# 테이블 추출 방식: evaluate (페이지당 page.evaluate 1회) 또는 dom (셀 단위 조회)
+EXTRACTION_MODE = os.getenv("CIGRO_EXTRACTION_MODE", "evaluate")
+
+# 화면에 표시되는 합계 요소 선택자 (쉼표로 구분, 변경 감지 지문에 포함)
+TOTALS_SELECTORS = [sel.strip() for sel in os.getenv("CIGRO_TOTALS_SELECTORS", "").split(",") if sel.strip()]
+
+# 로컬 저장소의 리포트 이름 (cigro_runner의 리포트 키와 같음)
+STORE_REPORT = "product/option"
+
+# 시트 반영 방식: replace (날짜 단위 삭제 후 추가) 또는 upsert (키 기준 바뀐 셀만 수정)
+UPLOAD_MODE = os.getenv("CIGRO_UPLOAD_MODE", "replace")
 
 BRANDS = ["바르너", "릴리이브", "색동서울", "먼슬리픽", "보호리"]
 
@@ -144,195 +162,309 @@ def send_slack_notification(success: bool, message: str, details: dict = None):
     except Exception as e:
         logger.warning(f"⚠️ 슬랙 알림 전송 중 오류: {e}")
 
-def upload_to_google_sheets(df, sheet_name):
+def upload_to_google_sheets(df, sheet_name, upload_mode=None, session=None, scraped_at=None):
     """
     구글 시트에 데이터를 업로드합니다.
     기존 데이터와 비교하여 더 많은 데이터가 있을 때만 교체합니다.
 
     버그 수정: 여러 날짜를 처리할 때 인덱스 불일치로 인한 데이터 손실 방지
     - 모든 교체 대상 날짜를 먼저 파악
-    - 해당 날짜들의 기존 데이터를 한 번에 삭제 (뒤에서부터)
-    - 새 데이터를 한 번에 추가
+    - 해당 날짜들의 기존 행을 연속 구간으로 묶어 삭제 (뒤에서부터)하고 새 데이터를 추가하는 작업을
+      spreadsheets.batchUpdate 한 번으로 전송 (쓰기 할당량 절약)
+    - 교체/유지 판단은 로컬 저장소(cigro_store) 데이터 기준. 저장소에 없는 날짜만 시트에서 읽어 채우고,
+      날짜 → 행 구간 인덱스(_date_index)가 있으면 해당 날짜의 행 구간만 읽음
+    - Sheets 반영에 실패한 날짜는 저장소에 미반영으로 남아 다음 업로드 때 다시 반영
+    - upload_mode='upsert'이면 날짜 전체를 지우고 다시 쓰는 대신 (판매처, 제품명, 옵션명, date) 키 기준으로
+      바뀐 셀만 수정하고, 새 키는 해당 날짜 구간 끝에 삽입, 사라진 키만 삭제 (행 순서/수식 참조 유지)
+    - 아카이브된 월(cigro_archive)의 날짜는 연도별 아카이브 시트({시트}_{YYYY})로 업로드
+    - 변경 없음이 확인된 날짜(cigro_fingerprint)는 업로드하지 않고, 반영한 날짜는 스크래핑 지문을 저장소에 기록
+    - scraped_at(KST datetime)이 있으면 저장소의 스크래핑 시각을 지금 대신 그 시각으로 기록 (outbox 재업로드)
+
+    Returns:
+        True - 업로드에 실패하면 원인 예외를 그대로 발생시킴 (outbox에 실패 원인으로 기록)
     """
+    upload_mode = upload_mode or UPLOAD_MODE
     try:
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds = ServiceAccountCredentials.from_json_keyfile_name(GOOGLE_CRED_FILE, scope)
-        client = gspread.authorize(creds)
-
-        # 시트 존재 여부 확인
-        try:
-            sheet = client.open(GOOGLE_SHEET_NAME).worksheet(sheet_name)
+        # 변경 없음이 확인된 날짜는 저장소와 Sheets에 이미 같은 데이터가 있음
+        df, unchanged_dates = split_verified(df)
+        if unchanged_dates:
+            logger.info(f"🟰 {sheet_name} 시트의 {len(unchanged_dates)}개 날짜는 변경 없음이 확인되어 업로드하지 않습니다.")
+            if df.empty:
+                return True
+
+        call_log = ApiCallLog()
+        session = session or get_sheets_session(GOOGLE_CRED_FILE, GOOGLE_SHEET_NAME)
+
+        # 시트 존재 여부 확인 (없으면 생성)
+        sheet, created = session.get_or_add_worksheet(sheet_name, call_log=call_log)
+        if created:
+            logger.info(f"❌ {sheet_name} 시트가 없으므로 새로 생성했습니다.")
+        else:
             logger.info(f"✅ {sheet_name} 시트 찾기 완료")
-        except gspread.exceptions.WorksheetNotFound:
-            logger.info(f"❌ {sheet_name} 시트가 없으므로 새로 생성합니다.")
-            sheet = client.open(GOOGLE_SHEET_NAME).add_worksheet(title=sheet_name, rows="100", cols="20")
 
-        # 기존 데이터 가져오기 (헤더 자동 감지)
-        try:
-            existing_data = sheet.get_all_records()
-            existing_df = pd.DataFrame(existing_data)
-        except Exception as e:
-            logger.warning(f"⚠️ 기존 데이터 읽기 실패: {e}, 빈 DataFrame으로 시작")
-            existing_df = pd.DataFrame()
+        if 'date' not in df.columns:
+            df['date'] = ''
+        new_dates = list(df['date'].unique())
+
+        # 기존 데이터: 로컬 저장소 기준으로 비교하고, 저장소에 없는 날짜만 시트에서 읽어 저장소를 채움
+        store = get_local_store()
+        date_index = DateRowIndex(session, sheet_name, call_log).load()
+
+        # 아카이브된 월의 날짜(백필)는 연도별 아카이브 시트로 업로드
+        routes = route_archived_dates(date_index, new_dates)
+        for archive_name, archive_dates in routes.items():
+            logger.info(f"🗄️ {sheet_name} 시트의 {len(archive_dates)}개 날짜는 아카이브 시트 {archive_name}에 업로드합니다.")
+            upload_to_google_sheets(df[df['date'].isin(archive_dates)], archive_name, upload_mode,
+                                    get_archive_session(session), scraped_at)
+        if routes:
+            df = df[~df['date'].apply(date_index.is_archived)]
+            new_dates = [date for date in new_dates if not date_index.is_archived(date)]
+            if df.empty:
+                return True
+
+        existing_df, synced = store.load(STORE_REPORT, sheet_name, new_dates)
+        unknown_dates = [date for date in new_dates if str(date).strip() not in synced]
+        sheet_df = None  # 시트 전체를 읽은 경우 그 결과 (인덱스 = 행 번호 - 2)
+        if unknown_dates:
+            full_read = not date_index.is_indexed
+            try:
+                read_df = read_sheet_rows(sheet, date_index, unknown_dates, call_log)
+            except Exception as e:
+                logger.warning(f"⚠️ 기존 데이터 읽기 실패: {e}, 빈 DataFrame으로 시작")
+                read_df = pd.DataFrame()
+            if full_read:
+                sheet_df = read_df
+            if 'date' in read_df.columns:
+                unknown_keys = [str(date).strip() for date in unknown_dates]
+                seeded = read_df[read_df['date'].astype(str).str.strip().isin(unknown_keys)]
+                if not seeded.empty:
+                    store.put(STORE_REPORT, sheet_name, seeded, synced=True)
+                    existing_df = pd.concat([existing_df, seeded], ignore_index=True)
+                    logger.info(f"💾 {sheet_name} 시트의 {seeded['date'].nunique()}개 날짜를 로컬 저장소에 채움")
+        logger.info(f"💾 {sheet_name} 로컬 저장소 기준 비교 (저장소 {len(synced)}개 날짜, 시트 조회 {len(unknown_dates)}개 날짜)")
 
         # 날짜 컬럼 확인 및 추가
         if 'date' not in existing_df.columns:
             existing_df['date'] = ''
-        if 'date' not in df.columns:
-            df['date'] = ''
-
-        # 새 데이터의 날짜들
-        new_dates = df['date'].unique()
 
-        # 1단계: 각 날짜별로 교체 여부 결정
+        # 1단계: 키 조인 기반 날짜별 비교로 교체 여부 결정
         dates_to_replace = []  # 교체할 날짜 목록
         dates_to_add = []  # 새로 추가할 날짜 목록
 
-        for date in new_dates:
-            existing_date_data = existing_df[existing_df['date'] == date]
-            new_date_data = df[df['date'] == date]
+        started = time.perf_counter()
+        try:
+            diffs = diff_by_date(existing_df, df)
+        except Exception as e:
+            logger.warning(f"⚠️ 데이터 비교 중 오류: {e}")
+            diffs = {}
+        logger.info(f"⏱️ {sheet_name} 시트 데이터 비교 완료 ({(time.perf_counter() - started) * 1000:.1f}ms)")
 
-            if existing_date_data.empty:
+        for date, diff in diffs.items():
+            if diff.is_new:
                 # 해당 날짜의 데이터가 없으면 새로 추가 목록에 추가
                 dates_to_add.append(date)
                 logger.info(f"📝 {sheet_name} 시트에 {date} 날짜 데이터 추가 예정")
-            else:
-                # 데이터 비교
-                existing_count = len(existing_date_data)
-                new_count = len(new_date_data)
+                continue
 
-                logger.info(f"📊 {sheet_name} 시트 {date} 날짜 데이터 비교: 기존 {existing_count}개 vs 새 {new_count}개")
-
-                should_replace = False
-                replace_reason = ""
-
-                # 1. 새 데이터가 더 많으면 교체
-                if new_count > existing_count:
-                    should_replace = True
-                    replace_reason = f"새 데이터가 더 많음 ({new_count} > {existing_count})"
-                else:
-                    # 2. 원가, 판매량, 결제금액 비교 (같은 행 수일 때)
-                    try:
-                        for _, new_row in new_date_data.iterrows():
-                            # 기존 데이터에서 같은 항목 찾기
-                            mask = (existing_date_data['판매처'] == new_row['판매처']) & \
-                                   (existing_date_data['제품명'] == new_row['제품명']) & \
-                                   (existing_date_data['옵션명'] == new_row['옵션명'])
-                            matching_rows = existing_date_data[mask]
-
-                            if not matching_rows.empty:
-                                existing_row = matching_rows.iloc[0]
-
-                                # 숫자 변환 함수
-                                def to_number(val):
-                                    if pd.isna(val) or val == '' or val == '-':
-                                        return 0
-                                    try:
-                                        return float(str(val).replace(',', '').replace('원', '').replace('%', '').strip())
-                                    except:
-                                        return 0
-
-                                # 원가 비교 (기존 0원에서 실제 값으로 변경된 경우)
-                                new_cost = to_number(new_row.get('원가', 0))
-                                existing_cost = to_number(existing_row.get('원가', 0))
-                                if existing_cost == 0 and new_cost > 0:
-                                    should_replace = True
-                                    replace_reason = f"원가 업데이트 (0 → {new_cost})"
-                                    break
-
-                                # 판매량 비교 (새 값이 더 크면 업데이트)
-                                new_sales = to_number(new_row.get('판매량', 0))
-                                existing_sales = to_number(existing_row.get('판매량', 0))
-                                if new_sales > existing_sales:
-                                    should_replace = True
-                                    replace_reason = f"판매량 증가 ({existing_sales} → {new_sales})"
-                                    break
-
-                                # 결제금액 비교 (새 값이 더 크면 업데이트)
-                                new_amount = to_number(new_row.get('결제금액', 0))
-                                existing_amount = to_number(existing_row.get('결제금액', 0))
-                                if new_amount > existing_amount:
-                                    should_replace = True
-                                    replace_reason = f"결제금액 증가 ({existing_amount} → {new_amount})"
-                                    break
-                    except Exception as e:
-                        logger.warning(f"⚠️ 데이터 비교 중 오류: {e}")
-
-                if should_replace:
-                    dates_to_replace.append((date, replace_reason))
-                    logger.info(f"🔄 {sheet_name} 시트의 {date} 날짜 데이터 교체 예정: {replace_reason}")
-                else:
-                    logger.info(f"ℹ️ {sheet_name} 시트의 {date} 날짜 데이터 변경 없음. 기존 데이터 유지.")
-
-        # 2단계: 교체할 날짜들의 기존 데이터를 한 번에 삭제 (인덱스 불일치 방지)
-        if dates_to_replace:
-            # 삭제할 모든 행 번호 수집
-            all_rows_to_delete = []
-            for date, _ in dates_to_replace:
-                existing_indices = existing_df[existing_df['date'] == date].index.tolist()
-                sheet_row_numbers = [idx + 2 for idx in existing_indices]  # +2는 헤더와 0-based 인덱스 때문
-                all_rows_to_delete.extend(sheet_row_numbers)
-
-            # 뒤에서부터 삭제하여 인덱스 변화 방지
-            if all_rows_to_delete:
-                logger.info(f"🗑️ {sheet_name} 시트에서 {len(all_rows_to_delete)}개 행 삭제 중...")
-                for row_num in sorted(all_rows_to_delete, reverse=True):
-                    sheet.delete_rows(row_num)
-                logger.info(f"✅ {sheet_name} 시트에서 기존 데이터 삭제 완료")
-
-        # 3단계: 새 데이터 추가 (교체 대상 + 신규 추가 대상)
-        dates_to_write = [date for date, _ in dates_to_replace] + dates_to_add
-
-        if dates_to_write:
-            # 추가할 데이터 수집
-            rows_to_add = []
-            for date in dates_to_write:
-                new_date_data = df[df['date'] == date]
-                rows_to_add.extend(new_date_data.values.tolist())
-
-            if rows_to_add:
-                logger.info(f"📤 {sheet_name} 시트에 {len(rows_to_add)}개 행 추가 중...")
-                sheet.append_rows(rows_to_add, value_input_option='RAW')
-                logger.info(f"✅ {sheet_name} 시트에 데이터 추가 완료")
+            logger.info(f"📊 {sheet_name} 시트 {date} 날짜 데이터 비교: 기존 {diff.existing_count}개 vs 새 {diff.new_count}개 "
+                        f"(추가 {len(diff.added)} / 삭제 {len(diff.removed)} / 변경 {len(diff.changed)})")
+            if diff.should_replace:
+                dates_to_replace.append((date, diff.replace_reason))
+                logger.info(f"🔄 {sheet_name} 시트의 {date} 날짜 데이터 교체 예정: {diff.replace_reason}")
+            else:
+                logger.info(f"ℹ️ {sheet_name} 시트의 {date} 날짜 데이터 변경 없음. 기존 데이터 유지.")
+
+        # 채택한 새 데이터는 Sheets 반영 전에 저장소에 먼저 기록 (반영 실패 시 다음 업로드에서 다시 반영)
+        decided_dates = [date for date, _ in dates_to_replace] + dates_to_add
+        accepted_df = df[df['date'].isin(decided_dates)]
+        store.put(STORE_REPORT, sheet_name, accepted_df, synced=False)
+
+        # 이전에 Sheets 반영에 실패한 날짜는 저장소 데이터로 다시 반영
+        resync_dates = [date for date in new_dates
+                        if synced.get(str(date).strip()) is False and date not in decided_dates]
+        for date in resync_dates:
+            logger.info(f"🔁 {sheet_name} 시트의 {date} 날짜는 Sheets 미반영 상태라 저장소 데이터로 다시 반영 예정")
+        push_dates = decided_dates + resync_dates
+        push_df = pd.concat([accepted_df, existing_df[existing_df['date'].isin(resync_dates)]], ignore_index=True)
+
+        # 인덱스 구간의 행을 지우기 전에 구간 경계가 시트와 맞는지 점검
+        # (맞지 않으면 인덱스가 비워져 아래에서 시트 전체를 읽고 인덱스를 다시 만듦)
+        if push_dates and sheet_df is None and date_index.is_indexed:
+            date_index.verify_spans(sheet, push_dates)
+
+        # 반영할 날짜의 시트 행 번호: 시트를 읽었으면 그 결과, 아니면 날짜 인덱스 구간
+        sheet_rows_df = sheet_df
+        if push_dates and sheet_rows_df is None and (upload_mode == 'upsert' or not date_index.is_indexed):
+            sheet_rows_df = read_sheet_rows(sheet, date_index, push_dates, call_log)
+        sheet_rows = {}
+        for date in push_dates:
+            if sheet_rows_df is not None and 'date' in sheet_rows_df.columns:
+                mask = sheet_rows_df['date'].astype(str).str.strip() == str(date).strip()
+                sheet_rows[date] = [idx + 2 for idx in sheet_rows_df.index[mask]]  # +2는 헤더와 0-based 인덱스 때문
+            else:
+                span = date_index.span(date)
+                sheet_rows[date] = list(range(span[0], span[1] + 1)) if span else []
+        replace_on_sheet = [date for date in push_dates if sheet_rows[date]]
+        add_on_sheet = [date for date in push_dates if not sheet_rows[date]]
+
+        # upsert 모드: 시트에 있는 날짜는 키 기준으로 바뀐 셀만 수정/새 키 삽입/사라진 키 삭제, 없는 날짜는 끝에 추가
+        plan = None
+        if upload_mode == 'upsert' and push_dates and sheet_rows_df is not None and 'date' in sheet_rows_df.columns:
+            plan = plan_upsert(sheet_rows_df[sheet_rows_df['date'].isin(replace_on_sheet)],
+                               push_df[push_df['date'].isin(replace_on_sheet)], push_df[push_df['date'].isin(add_on_sheet)])
+            if plan is None:
+                logger.warning(f"⚠️ {sheet_name} 시트 헤더와 새 데이터 열이 달라 교체 방식으로 업로드합니다.")
+
+        if plan is not None:
+            apply_upsert(sheet, plan, call_log, date_index)
+            logger.info(f"✏️ {sheet_name} 시트 upsert 완료: {plan.summary()}")
+        else:
+            # 2단계: 교체할 날짜들의 기존 행 번호 수집
+            all_rows_to_delete = [row for date in replace_on_sheet for row in sheet_rows[date]]
+
+            # 3단계: 추가할 데이터 (교체 대상 + 신규 추가 대상, 날짜별로 청크를 만들 때 꺼내 씀)
+            push_dates_in_order = replace_on_sheet + add_on_sheet
+            push_groups = dict(tuple(push_df.groupby('date', sort=False))) if push_dates_in_order else {}
+            rows_by_date = ((date, push_groups[date].values.tolist()) for date in push_dates_in_order)
+
+            # 4단계: 날짜 경계로 나눈 청크마다 기존 행 삭제 + 새 데이터 추가 + 날짜 인덱스 갱신을 batchUpdate 한 번으로 전송
+            #        반영된 청크의 날짜는 바로 로컬 저장소에 반영 완료로 기록 (실패 시 남은 날짜만 다음에 다시 반영)
+            if push_dates_in_order:
+                total_rows = sum(len(push_groups[date]) for date in push_dates_in_order)
+                logger.info(f"🗑️ {sheet_name} 시트: {len(all_rows_to_delete)}개 행 삭제 ({len(merge_row_ranges(all_rows_to_delete))}개 구간), {total_rows}개 행 추가 중...")
+                chunks = replace_dates_chunked(
+                    sheet, rows_by_date, {date: sheet_rows[date] for date in replace_on_sheet}, date_index, call_log,
+                    on_chunk=lambda dates: store.mark_synced(STORE_REPORT, sheet_name, dates), total_rows=total_rows)
+                cells = (len(all_rows_to_delete) + total_rows) * len(push_df.columns)
+                logger.info(f"✅ {sheet_name} 시트 데이터 교체/추가 완료 (셀 {cells}개, 청크 {chunks}개)")
+            elif date_index.dirty:
+                date_index.save()
+        store.mark_synced(STORE_REPORT, sheet_name, push_dates)
+        store.mark_scraped(STORE_REPORT, sheet_name, new_dates, scraped_fingerprints(df), scraped_at)
 
         # 결과 요약
-        if dates_to_replace or dates_to_add:
-            logger.info(f"📋 {sheet_name} 시트 업데이트 완료 - 교체: {len(dates_to_replace)}개 날짜, 신규: {len(dates_to_add)}개 날짜")
+        if push_dates:
+            logger.info(f"📋 {sheet_name} 시트 업데이트 완료 - 교체: {len(dates_to_replace)}개 날짜, 신규: {len(dates_to_add)}개 날짜, "
+                        f"재반영: {len(resync_dates)}개 날짜")
         else:
             logger.info(f"ℹ️ {sheet_name} 시트 변경 사항 없음")
+        logger.info(f"📡 {sheet_name} 시트 Sheets API 호출: {call_log.summary()}")
+        return True
 
     except Exception as e:
         logger.error(f"❌ Google Sheets 업로드 중 오류 발생: {e}")
+        raise
+
+# 현재 페이지의 헤더와 열 우선(column-major) 셀 행렬을 한 번에 읽는 스크립트
+EXTRACT_PAGE_JS = """
+() => {
+    const text = (el) => (el.innerText || '').trim();
+    const columns = Array.from(document.querySelectorAll('div.sc-dkrFOg.cGhOUg'))
+        .map((col) => Array.from(col.querySelectorAll('div.sc-hLBbgP.jbaWzw')).map(text));
+    const headers = Array.from(document.querySelectorAll('div.sc-gswNZR.gSJTZd > label')).map(text);
+    return {headers, columns};
+}
+"""
+
+
+# 페이지 이동 감지용 지문 설정 (컬럼별로 셀이 세로로 나열된 구조)
+PAGE_FINGERPRINT_SPEC = {
+    "layout": "columns",
+    "columnSelector": 'div.sc-dkrFOg.cGhOUg',
+    "cellSelector": 'div.sc-hLBbgP.jbaWzw',
+    "labelSelectors": ['label.text-cigro-page-number'],
+    "firstPagePattern": '^1 /',
+}
+
 
-def extract_all_pages_data(page, selected_date, brand_name, retry_for_columns=3):
-    """모든 페이지의 데이터를 추출합니다."""
+def read_page_rows_dom(page, selected_date, with_headers=True):
+    """
+    셀마다 Playwright 요소 조회/inner_text를 호출해 현재 페이지를 읽습니다. (기존 방식)
+
+    Returns:
+        (header_labels, rows) - 컬럼을 찾지 못하면 (None, [])
+    """
+    columns = page.query_selector_all('div.sc-dkrFOg.cGhOUg')
+    if not columns:
+        return None, []
+
+    rows = []
+    num_rows = len(columns[0].query_selector_all('div.sc-hLBbgP.jbaWzw'))
+    for row_idx in range(num_rows):
+        row_data = [selected_date]  # 날짜 컬럼 추가
+        for col in columns:
+            cells = col.query_selector_all('div.sc-hLBbgP.jbaWzw')
+            value = cells[row_idx].inner_text().strip() if row_idx < len(cells) else ''
+            row_data.append(value)
+        rows.append(row_data)
+
+    header_labels = []
+    if with_headers:
+        header_labels = [label.inner_text().strip() for label in page.query_selector_all('div.sc-gswNZR.gSJTZd > label')]
+    return header_labels, rows
+
+
+def read_page_rows_evaluate(page, selected_date, with_headers=True):
+    """
+    page.evaluate() 한 번으로 헤더와 셀 행렬 전체를 가져와 현재 페이지를 읽습니다.
+
+    Returns:
+        (header_labels, rows) - 컬럼을 찾지 못하면 (None, [])
+    """
+    data = page.evaluate(EXTRACT_PAGE_JS) or {}
+    columns = data.get('columns') or []
+    if not columns:
+        return None, []
+
+    num_rows = len(columns[0])
+    rows = [
+        [selected_date] + [col[row_idx] if row_idx < len(col) else '' for col in columns]
+        for row_idx in range(num_rows)
+    ]
+    header_labels = (data.get('headers') or []) if with_headers else []
+    return header_labels, rows
+
+
+def read_page_rows(page, selected_date, brand_name, extraction_mode=EXTRACTION_MODE, with_headers=True):
+    """추출 방식에 따라 현재 페이지를 읽고, evaluate 방식이 실패하면 기존 방식으로 대체합니다."""
+    if extraction_mode == "evaluate":
+        try:
+            header_labels, rows = read_page_rows_evaluate(page, selected_date, with_headers)
+            if header_labels is not None:
+                return header_labels, rows
+            logger.warning(f"⚠️ {brand_name} - evaluate 추출 결과가 비어 있어 DOM 방식으로 재시도합니다.")
+        except Exception as e:
+            logger.warning(f"⚠️ {brand_name} - evaluate 추출 실패, DOM 방식으로 재시도합니다: {e}")
+    return read_page_rows_dom(page, selected_date, with_headers)
+
+
+def extract_all_pages_data(page, selected_date, brand_name, retry_for_columns=3, extraction_mode=EXTRACTION_MODE,
+                           change_check=None):
+    """
+    모든 페이지의 데이터를 추출합니다.
+
+    첫 페이지에서 페이지 수 라벨, 첫 페이지 행, 합계로 변경 감지 지문을 만들고, change_check(ChangeCheck)의
+    지난 지문과 같으면 나머지 페이지를 넘기지 않고 로컬 저장소 데이터("변경 없음 확인")를 반환합니다.
+    """
     all_data = []
     headers = None
+    fingerprint = None
     current_page = 1
     expected_columns = 9  # 예상 열 개수: date, 판매처, 제품명, 옵션명, 판매량, 결제금액, 원가, 수수료, 배송비
 
     while True:
         logger.info(f"📄 {brand_name} - {current_page}페이지 데이터 추출 중...")
 
-        # 컬럼 요소 찾기
-        columns = page.query_selector_all('div.sc-dkrFOg.cGhOUg')
-        if not columns:
+        # 행 데이터 추출 (헤더는 첫 번째 페이지에서만)
+        header_labels, rows = read_page_rows(page, selected_date, brand_name, extraction_mode, with_headers=headers is None)
+        if header_labels is None:
             logger.warning(f"❌ {brand_name} - 컬럼을 찾을 수 없습니다.")
             break
-
-        # 행 데이터 추출
-        num_rows = len(columns[0].query_selector_all('div.sc-hLBbgP.jbaWzw'))
-        for row_idx in range(num_rows):
-            row_data = [selected_date]  # 날짜 컬럼 추가
-            for col in columns:
-                cells = col.query_selector_all('div.sc-hLBbgP.jbaWzw')
-                value = cells[row_idx].inner_text().strip() if row_idx < len(cells) else ''
-                row_data.append(value)
-            all_data.append(row_data)
+        all_data.extend(rows)
 
         # 헤더 추출 (첫 번째 페이지만)
         if headers is None:
-            headers = ["date"] + [label.inner_text().strip() for label in page.query_selector_all('div.sc-gswNZR.gSJTZd > label')]
+            headers = ["date"] + header_labels
 
             # 헤더가 비어 있는 경우 기본 헤더 추가
             if not headers or len(headers) == 1:  # 단지 "date"만 있다면
@@ -349,6 +481,16 @@ def extract_all_pages_data(page, selected_date, brand_name, retry_for_columns=3)
             break
 
         total_pages = int(page_text.split("/")[1].strip())
+
+        # 첫 페이지의 싼 신호로 지난 실행 이후 변경 여부 확인
+        if current_page == 1:
+            fingerprint = page_fingerprint(page_text, rows, read_texts(page, TOTALS_SELECTORS))
+            verified = change_check.verify(fingerprint) if change_check else None
+            if verified is not None:
+                logger.info(f"🟰 {brand_name} - {selected_date} 변경 없음 확인 (지문 일치, {total_pages}페이지 이동 생략, "
+                            f"저장소 {len(verified)}개 행 사용)")
+                return verified
+
         if current_page >= total_pages:
             break
 
@@ -356,21 +498,10 @@ def extract_all_pages_data(page, selected_date, brand_name, retry_for_columns=3)
         pagination_div = page.query_selector('div.w-20.flex.justify-between.items-center')
         svgs = pagination_div.query_selector_all('svg') if pagination_div else []
         if len(svgs) >= 3:
-            # 로딩 오버레이(greyout)가 사라질 때까지 대기
-            try:
-                page.wait_for_selector('div.greyout', state='hidden', timeout=10000)
-            except Exception:
-                pass  # 오버레이가 없으면 무시
-
-            svgs[2].click()
-
-            # 클릭 후 로딩 오버레이가 사라질 때까지 대기
-            try:
-                page.wait_for_selector('div.greyout', state='hidden', timeout=15000)
-            except Exception:
-                pass
-
-            page.wait_for_timeout(1000)  # 추가 렌더링 대기
+            # 첫/마지막 행과 페이지 라벨이 바뀔 때까지 대기 (클릭이 반영되지 않으면 재클릭)
+            if not click_and_wait_for_page_change(page, svgs[2].click, PAGE_FINGERPRINT_SPEC):
+                logger.error(f"❌ {brand_name} - {current_page + 1}페이지로 이동하지 못했습니다. 일부 데이터만 수집되어 실패 처리합니다.")
+                return None
         else:
             break
 
@@ -389,70 +520,65 @@ def extract_all_pages_data(page, selected_date, brand_name, retry_for_columns=3)
         return None
 
     logger.info(f"✅ {brand_name} 브랜드 총 {len(df)}개 행의 데이터 추출 완료 (열 개수: {len(df.columns)}개)")
-    return df
+    return with_fingerprint(df, selected_date, fingerprint) if fingerprint else df
+
 
+def scrape_brand(browser_context, brand, selected_date, max_retries=3, extraction_mode=EXTRACTION_MODE,
+                 spa_navigation=SPA_NAVIGATION, change_check=CHANGE_CHECK):
+    """
+    단일 브랜드를 스크래핑합니다.
 
-def scrape_brand(browser_context, brand, selected_date, max_retries=3):
-    """단일 브랜드를 스크래핑합니다."""
+    spa_navigation이면 컨텍스트당 페이지 하나를 유지하고 앱 내 이동으로 브랜드/날짜를 바꿉니다.
+    실패한 시도의 페이지는 버리므로 재시도는 새 페이지에서 전체 로드합니다.
+    change_check이면 첫 페이지 지문이 지난 실행과 같을 때 전체 페이지 이동을 생략합니다. (cigro_fingerprint)
+    """
     expected_columns = 9  # date 포함 9개 컬럼 필요
+    check = ChangeCheck(STORE_REPORT, brand, selected_date) if change_check else None
 
     for attempt in range(max_retries):
         page = None
+        succeeded = False
         try:
             target_url = f"https://app.cigro.io/?menu=analysis&tab=product&group_by=option&brand_name={brand}&start_date={selected_date}&end_date={selected_date}"
 
-            page = browser_context.new_page()
+            page = get_warm_page(browser_context) if spa_navigation else browser_context.new_page()
 
+            # 앱이 이미 로드된 재사용 페이지면 앱 내 이동, 아니면 전체 로드
             # domcontentloaded로 변경 (networkidle보다 빠름)
             # 타임아웃 60초로 증가
-            page.goto(target_url, wait_until='domcontentloaded', timeout=60000)
-
-            # 테이블 로딩 대기 - 실제 데이터가 로드될 때까지 대기
-            try:
-                page.wait_for_selector('div.sc-dkrFOg.cGhOUg', timeout=30000)
-            except:
-                # 테이블이 없으면 로딩 완료 대기 후 재시도
-                logger.warning(f"⚠️ {brand} - 테이블 로딩 대기, 추가 대기 중...")
-                page.wait_for_timeout(3000)
+            if spa_navigation and is_app_loaded(page) and navigate_in_app(page, target_url, PAGE_FINGERPRINT_SPEC):
+                logger.info(f"🔀 {brand} - 앱 내 이동 완료")
+            else:
+                page.goto(target_url, wait_until='domcontentloaded', timeout=60000)
 
-            # 9개 컬럼이 로드될 때까지 대기 (최대 3번 새로고침)
+            # 테이블 준비 대기: 컬럼/데이터 셀이 나타나고 DOM 변경이 멈추면 바로 진행 (최대 3번 새로고침)
             for col_retry in range(3):
+                if wait_for_table_ready(page, 'div.sc-dkrFOg.cGhOUg', 'div.sc-hLBbgP.jbaWzw',
+                                        min_columns=expected_columns - 1, timeout=30000,
+                                        abort_selector=LOGIN_FORM_SELECTOR):
+                    logger.info(f"✅ {brand} - 테이블 로드 완료")
+                    break
+
+                # 세션 만료로 로그인 화면이 뜬 경우: 워커 공용 재로그인 후 다시 이동
+                if ensure_logged_in(page):
+                    page.goto(target_url, wait_until='domcontentloaded', timeout=60000)
+                    continue
+
                 columns = page.query_selector_all('div.sc-dkrFOg.cGhOUg')
                 current_col_count = len(columns) + 1  # +1 for date column
-
                 if current_col_count >= expected_columns:
-                    logger.info(f"✅ {brand} - 컬럼 {current_col_count}개 로드 완료")
+                    # 컬럼은 모두 있으나 데이터 셀이 없음 → 새로고침 없이 추출 단계에서 판단
+                    logger.warning(f"⚠️ {brand} - 컬럼 {current_col_count}개 로드됨, 데이터 셀 없음")
                     break
-                else:
-                    logger.warning(f"⚠️ {brand} - 컬럼 {current_col_count}개만 로드됨 (필요: {expected_columns}개), 추가 대기 중... ({col_retry + 1}/3)")
-
-                    if col_retry < 2:
-                        # 추가 대기 후 새로고침
-                        page.wait_for_timeout(3000)
-                        page.reload(wait_until='domcontentloaded', timeout=60000)
-                        page.wait_for_timeout(2000)
-
-                        # 테이블 다시 대기
-                        try:
-                            page.wait_for_selector('div.sc-dkrFOg.cGhOUg', timeout=30000)
-                        except:
-                            page.wait_for_timeout(3000)
-
-            # 데이터 셀이 완전히 로드될 때까지 추가 대기 (최대 10초)
-            for wait_attempt in range(5):
-                page.wait_for_timeout(2000)
-                # 실제 데이터 셀 개수 확인
-                data_cells = page.query_selector_all('div.sc-hLBbgP.jbaWzw')
-                columns = page.query_selector_all('div.sc-dkrFOg.cGhOUg')
-                if len(columns) >= 8 and len(data_cells) > 0:
-                    logger.info(f"✅ {brand} - 데이터 셀 로드 완료 (컬럼: {len(columns)}개, 셀: {len(data_cells)}개)")
-                    break
-                else:
-                    logger.warning(f"⚠️ {brand} - 데이터 셀 대기 중... (컬럼: {len(columns)}개, 셀: {len(data_cells)}개) ({wait_attempt + 1}/5)")
 
-            df = extract_all_pages_data(page, selected_date, brand)
+                logger.warning(f"⚠️ {brand} - 컬럼 {current_col_count}개만 로드됨 (필요: {expected_columns}개) ({col_retry + 1}/3)")
+                if col_retry < 2:
+                    page.reload(wait_until='domcontentloaded', timeout=60000)
+
+            df = extract_all_pages_data(page, selected_date, brand, extraction_mode=extraction_mode, change_check=check)
 
             if df is not None and not df.empty:
+                succeeded = True
                 return brand, df, None
             else:
                 logger.warning(f"⚠️ {brand} 시도 {attempt + 1}/{max_retries}: 데이터 없음 또는 컬럼 부족")
@@ -464,10 +590,13 @@ def scrape_brand(browser_context, brand, selected_date, max_retries=3):
             logger.error(f"❌ {brand} 시도 {attempt + 1}/{max_retries} 오류: {e}")
             # 재시도 전 잠시 대기
             if attempt < max_retries - 1:
-                import time
                 time.sleep(3)
         finally:
-            if page:
+            if spa_navigation:
+                # 성공한 페이지는 다음 작업에서 재사용, 실패한 페이지는 버림
+                if not succeeded:
+                    discard_warm_page(browser_context)
+            elif page:
                 try:
                     page.close()
                 except:
@@ -475,6 +604,30 @@ def scrape_brand(browser_context, brand, selected_date, max_retries=3):
 
     return brand, None, f"최대 재시도 횟수 초과"
 
+def run_scrape_tasks(context, tasks, concurrency=1, headless=True, profile_dir=None, **scrape_options):
+    """
+    (브랜드, 날짜) 작업 목록을 실행하고 작업 순서대로 결과를 반환합니다.
+
+    Args:
+        context: 로그인된 BrowserContext (순차 실행 시 사용)
+        tasks: [(brand, date), ...]
+        concurrency: 동시에 실행할 워커 수 (1이면 순차 실행)
+        headless: 워커 브라우저 헤드리스 여부
+        profile_dir: 워커 영구 프로필 상위 디렉토리
+        **scrape_options: scrape_brand()에 그대로 전달할 옵션
+
+    Returns:
+        [(brand, date, df, error), ...] - tasks와 같은 순서
+    """
+    def run_task(task_context, task):
+        brand, selected_date = task
+        _, df, error = scrape_brand(task_context, brand, selected_date, **scrape_options)
+        return df, error
+
+    results = run_tasks(context, tasks, run_task, concurrency, headless, profile_dir)
+    return [(brand, selected_date, df, error) for (brand, selected_date), (df, error) in zip(tasks, results)]
+
+
 def parse_arguments():
     """명령줄 인수를 파싱합니다."""
     parser = argparse.ArgumentParser(description='Cigro 데이터 스크래핑 스크립트')
@@ -482,6 +635,23 @@ def parse_arguments():
     parser.add_argument('--end-date', type=str, help='종료 날짜 (YYYY-MM-DD 형식)')
     parser.add_argument('--brands', type=str, nargs='+', help='스크래핑할 브랜드 목록 (공백으로 구분)')
     parser.add_argument('--headless', action='store_true', default=True, help='헤드리스 모드로 실행')
+    parser.add_argument('--concurrency', type=int, default=1, help='동시에 스크래핑할 (브랜드, 날짜) 작업 수 (기본값: 1, 순차 실행)')
+    parser.add_argument('--profile-dir', type=str, default=PROFILE_DIR,
+                        help='영구 브라우저 프로필 디렉토리 (실행 간 정적 리소스 캐시 유지)')
+    parser.add_argument('--spa-navigation', action='store_true', default=SPA_NAVIGATION,
+                        help='워커당 페이지 하나를 유지하고 앱 내 이동으로 브랜드/날짜 변경 (실패 시에만 전체 로드)')
+    parser.add_argument('--extraction-mode', choices=['evaluate', 'dom'], default=EXTRACTION_MODE,
+                        help='테이블 추출 방식 (evaluate: 페이지당 1회 호출, dom: 셀 단위 조회)')
+    parser.add_argument('--upload-concurrency', type=int, default=4,
+                        help='동시에 업로드할 시트 수 (기본값: 4, 전체 속도는 Sheets 할당량 토큰 버킷으로 제한)')
+    parser.add_argument('--upload-mode', choices=['replace', 'upsert'], default=UPLOAD_MODE,
+                        help='시트 반영 방식 (replace: 날짜 단위 삭제 후 추가, upsert: 키 기준 바뀐 셀만 수정)')
+    parser.add_argument('--include-frozen', action='store_true', default=INCLUDE_FROZEN,
+                        help='정산 기간이 지나 확정된(동결) 날짜도 다시 스크래핑')
+    parser.add_argument('--change-check', dest='change_check', action='store_true', default=CHANGE_CHECK,
+                        help='첫 페이지 지문(페이지 수, 첫 페이지 행, 합계)이 지난 실행과 같으면 나머지 페이지 이동 생략')
+    parser.add_argument('--no-change-check', dest='change_check', action='store_false',
+                        help='CIGRO_CHANGE_CHECK=1이어도 모든 페이지를 스크래핑')
     return parser.parse_args()
 
 
@@ -519,6 +689,12 @@ def get_date_range(start_date_str, end_date_str):
 def main():
     args = parse_arguments()
 
+    # 필수 환경 변수 검증
+    if not EMAIL or not PASSWORD:
+        logger.error("❌ EMAIL과 PASSWORD 환경변수가 설정되지 않았습니다.")
+        logger.error("   GitHub Secrets 또는 환경 변수를 확인하세요.")
+        sys.exit(1)
+
     logger.info("🚀 Cigro 데이터 스크래핑 시작")
 
     # 날짜 범위 설정
@@ -540,88 +716,78 @@ def main():
         selected_brands = BRANDS
         logger.info(f"📋 모든 브랜드 스크래핑: {', '.join(selected_brands)}")
 
-    with sync_playwright() as p:
-        # 브라우저 실행 설정 - 최적화된 옵션
-        browser_args = [
-            '--no-sandbox',
-            '--disable-dev-shm-usage',
-            '--disable-gpu',
-            '--disable-web-security',
-            '--disable-features=VizDisplayCompositor',
-            '--disable-extensions',
-            '--disable-plugins',
-            '--disable-images',  # 이미지 로딩 비활성화로 속도 향상
-        ]
+    # 지난 실행에서 업로드하지 못하고 outbox에 남은 데이터를 먼저 업로드
+    flush_outbox([STORE_REPORT], args.upload_concurrency)
 
-        browser = p.chromium.launch(
-            headless=args.headless,
-            args=browser_args
-        )
+    with sync_playwright() as p:
+        session = None
 
         try:
-            if os.path.exists("auth.json"):
-                logger.info("🔐 기존 로그인 세션 불러오는 중...")
-                context = browser.new_context(storage_state="auth.json")
-            else:
-                logger.info("🧭 세션 없음 ➜ 수동 로그인 시작")
-                context = browser.new_context()
-                page = context.new_page()
-                page.goto("https://app.cigro.io", wait_until='domcontentloaded')
-                logger.info("📝 로그인 자동화 중...")
-
-                # 이메일, 비밀번호 자동 입력
-                page.fill('input.bubble-element.Input.cnaNaCaE0.a1746627658297x1166[type="email"]', EMAIL)
-                page.fill('input[type="password"]', PASSWORD)
-
-                # 로그인 버튼 클릭
-                page.click('div.clickable-element.bubble-element.Group.cnaNaCaF0.bubble-r-container')
-                page.wait_for_load_state('networkidle', timeout=15000)
-
-                logger.info("🔐 로그인 완료 후 세션 저장 중...")
-                context.storage_state(path="auth.json")
-                page.close()
+            session = open_session(p, EMAIL, PASSWORD, args.headless, args.profile_dir)
+            context = session.context
 
             # 날짜별, 브랜드별 스크래핑 실행
             total_success = 0
             total_fail = 0
+            total_unchanged = 0
             all_results = {}  # {brand: [df1, df2, ...]}
 
-            logger.info(f"🚀 {len(date_range)}일 x {len(selected_brands)}개 브랜드 스크래핑 시작...")
-
-            for date_idx, selected_date in enumerate(date_range):
-                logger.info(f"📅 [{date_idx + 1}/{len(date_range)}] {selected_date} 날짜 스크래핑 중...")
-
-                for brand in selected_brands:
-                    logger.info(f"🔍 {brand} - {selected_date} 데이터 추출 중...")
-                    brand_name, df, error = scrape_brand(context, brand, selected_date)
-
-                    if df is not None:
-                        if brand_name not in all_results:
-                            all_results[brand_name] = []
-                        all_results[brand_name].append(df)
-                        total_success += 1
-                        logger.info(f"✅ {brand_name} - {selected_date} 스크래핑 완료")
+            # 날짜 → 브랜드 순서로 작업 목록 생성 (순차 실행과 동일한 순서, 정산 기간이 지나 확정된 날짜는 제외)
+            tasks, frozen = plan_tasks(STORE_REPORT, selected_brands, date_range, include_frozen=args.include_frozen)
+            logger.info(f"🚀 {len(date_range)}일 x {len(selected_brands)}개 브랜드 스크래핑 시작... "
+                        f"(작업 {len(tasks)}건, 동결 {len(frozen)}건 제외)")
+            results = run_scrape_tasks(context, tasks, args.concurrency, args.headless, args.profile_dir,
+                                       extraction_mode=args.extraction_mode,
+                                       spa_navigation=args.spa_navigation,
+                                       change_check=args.change_check)
+
+            # 결과는 작업 순서대로 반환되므로 브랜드별 날짜 순서가 순차 실행과 같음
+            for brand_name, selected_date, df, error in results:
+                if df is not None:
+                    if brand_name not in all_results:
+                        all_results[brand_name] = []
+                    all_results[brand_name].append(df)
+                    total_success += 1
+                    if verified_dates(df):
+                        total_unchanged += 1
+                        logger.info(f"🟰 {brand_name} - {selected_date} 변경 없음 확인")
                     else:
-                        total_fail += 1
-                        logger.error(f"❌ {brand_name} - {selected_date} 스크래핑 실패: {error}")
+                        logger.info(f"✅ {brand_name} - {selected_date} 스크래핑 완료")
+                else:
+                    total_fail += 1
+                    logger.error(f"❌ {brand_name} - {selected_date} 스크래핑 실패: {error}")
 
-            # Google Sheets 업로드 (브랜드별로 모든 날짜 데이터 병합 후 업로드)
+            # Google Sheets 업로드 (브랜드별로 모든 날짜 데이터 병합 후, 시트별 병렬 업로드)
             if all_results:
-                logger.info(f"📤 Google Sheets 업로드 시작 ({len(all_results)}개 브랜드)...")
+                logger.info(f"📤 Google Sheets 업로드 시작 ({len(all_results)}개 브랜드, 동시 {args.upload_concurrency}개)...")
+                jobs = []
+                combined = {}
                 for brand_name, dfs in all_results.items():
                     # 여러 날짜의 데이터를 하나로 병합
-                    combined_df = pd.concat(dfs, ignore_index=True)
-                    upload_to_google_sheets(combined_df, brand_name)
-                    logger.info(f"✅ {brand_name} 업로드 완료 ({len(dfs)}일치 데이터)")
+                    combined[brand_name] = combine_frames(dfs)
+                    jobs.append((brand_name, lambda df=combined[brand_name], name=brand_name:
+                                 upload_to_google_sheets(df, name, args.upload_mode)))
+                for (brand_name, _), (uploaded, error) in zip(jobs, run_uploads(jobs, args.upload_concurrency)):
+                    if uploaded:
+                        logger.info(f"✅ {brand_name} 업로드 완료 ({len(all_results[brand_name])}일치 데이터)")
+                    else:
+                        # 스크래핑한 데이터는 outbox에 보관해 다음 실행 때 다시 업로드
+                        get_upload_outbox().add(STORE_REPORT, brand_name, combined[brand_name],
+                                                {"upload_mode": args.upload_mode}, error)
+                logger.info(f"📡 Sheets 할당량 사용: {SHEETS_QUOTA.summary()}")
 
             # 최종 결과 요약
-            total_tasks = len(date_range) * len(selected_brands)
+            total_tasks = len(tasks)
             logger.info("=" * 50)
             logger.info("📊 스크래핑 결과 요약")
+            log_blocker_summary(session.blocker)
+            session.log_cache_summary()
             logger.info(f"📅 스크래핑 기간: {date_range[0]} ~ {date_range[-1]} ({len(date_range)}일)")
             logger.info(f"📋 스크래핑 브랜드: {', '.join(selected_brands)}")
-            logger.info(f"✅ 성공: {total_success}건 / ❌ 실패: {total_fail}건")
-            logger.info(f"📈 성공률: {total_success}/{total_tasks} ({total_success/total_tasks*100:.1f}%)")
+            logger.info(f"✅ 성공: {total_success}건 (🟰 변경 없음 확인 {total_unchanged}건) / ❌ 실패: {total_fail}건 / "
+                        f"🧊 동결: {len(frozen)}건")
+            if total_tasks > 0:
+                logger.info(f"📈 성공률: {total_success}/{total_tasks} ({total_success/total_tasks*100:.1f}%)")
             logger.info("=" * 50)
 
             # 슬랙 알림 전송
@@ -638,7 +804,9 @@ def main():
                 "📅 기간": date_info,
                 "📋 브랜드": ", ".join(selected_brands),
                 "✅ 성공": f"{total_success}건",
+                "🟰 변경 없음": f"{total_unchanged}건",
                 "❌ 실패": f"{total_fail}건",
+                "🧊 동결": f"{len(frozen)}건",
                 "📈 성공률": f"{success_rate:.1f}%"
             }
 
@@ -671,7 +839,8 @@ def main():
                 details={"🔴 오류": str(e)}
             )
         finally:
-            browser.close()
+            if session:
+                session.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,109 @@
+import pytest
+
+import cigro_sheets
+
+
+def cell_value(cell):
+    value = cell.get("userEnteredValue", {})
+    return str(next(iter(value.values()))) if value else ""
+
+
+class FakeWorksheet:
+    """행 값 목록(1행 = 헤더)을 가진 메모리 워크시트"""
+
+    def __init__(self, spreadsheet, sheet_id, title, rows):
+        self.spreadsheet = spreadsheet
+        self.id = sheet_id
+        self.title = title
+        self.rows = [list(row) for row in rows]
+
+    @property
+    def col_count(self):
+        return max((len(row) for row in self.rows), default=0)
+
+    def get_all_values(self):
+        return [list(row) for row in self.rows]
+
+    def get_all_records(self):
+        header = self.rows[0]
+        return [dict(zip(header, row)) for row in self.rows[1:]]
+
+    def batch_get(self, ranges):
+        results = []
+        for text in ranges:
+            first, last = (int(part) for part in text.split(":"))
+            results.append([list(row) for row in self.rows[first - 1:last]])
+        return results
+
+    def dates(self):
+        column = self.rows[0].index("date")
+        return [row[column] for row in self.rows[1:]]
+
+
+class FakeSpreadsheet:
+    """batchUpdate의 deleteDimension/appendCells/updateCells를 요청 전체가 성공할 때만 반영합니다."""
+
+    def __init__(self):
+        self.worksheets = {}
+        self.batch_updates = 0
+        self.fail_on = set()  # 실패시킬 batchUpdate 순번 (1부터)
+
+    def add(self, title, rows):
+        worksheet = FakeWorksheet(self, len(self.worksheets), title, rows)
+        self.worksheets[worksheet.id] = worksheet
+        return worksheet
+
+    def batch_update(self, body):
+        self.batch_updates += 1
+        if self.batch_updates in self.fail_on:
+            raise RuntimeError("HTTP 500")
+        staged = {sheet_id: [list(row) for row in ws.rows] for sheet_id, ws in self.worksheets.items()}
+        for request in body["requests"]:
+            (kind, spec), = request.items()
+            if kind == "deleteDimension":
+                rows = staged[spec["range"]["sheetId"]]
+                del rows[spec["range"]["startIndex"]:spec["range"]["endIndex"]]
+            elif kind == "appendCells":
+                staged[spec["sheetId"]].extend([cell_value(cell) for cell in row["values"]] for row in spec["rows"])
+            elif kind == "updateCells":
+                rows = staged[spec["start"]["sheetId"]]
+                for offset, row in enumerate(spec["rows"]):
+                    row_index = spec["start"]["rowIndex"] + offset
+                    while len(rows) <= row_index:
+                        rows.append([])
+                    column = spec["start"].get("columnIndex", 0)
+                    values = [cell_value(cell) for cell in row["values"]]
+                    current = rows[row_index] + [""] * max(0, column - len(rows[row_index]))
+                    rows[row_index] = current[:column] + values + current[column + len(values):]
+        for sheet_id, rows in staged.items():
+            self.worksheets[sheet_id].rows = rows
+
+
+class FakeSession:
+    def __init__(self, spreadsheet):
+        self._spreadsheet = spreadsheet
+
+    def spreadsheet(self, call_log=None):
+        return self._spreadsheet
+
+    def get_or_add_worksheet(self, title, rows=None, cols=None, call_log=None):
+        for worksheet in self._spreadsheet.worksheets.values():
+            if worksheet.title == title:
+                return worksheet, False
+        return self._spreadsheet.add(title, []), True
+
+
+@pytest.fixture(autouse=True)
+def unlimited_sheets_quota(monkeypatch):
+    """테스트에서는 할당량 토큰 대기 없이 호출"""
+    monkeypatch.setattr(cigro_sheets, "SHEETS_QUOTA", cigro_sheets.SheetsQuota(10 ** 6, 10 ** 6))
+
+
+@pytest.fixture
+def spreadsheet():
+    return FakeSpreadsheet()
+
+
+@pytest.fixture
+def session(spreadsheet):
+    return FakeSession(spreadsheet)
@@ -0,0 +1,131 @@
+import pytest
+
+from cigro_sheets import DATE_INDEX_HEADERS, DATE_INDEX_SHEET_NAME, DateRowIndex, runs_from_dates
+
+
+def apply_to_model(dates, op, arg):
+    """시트의 date 열(2행부터)에 같은 작업을 직접 적용한 결과"""
+    if op == "delete":
+        removed = {row - 2 for row in arg}
+        return [date for position, date in enumerate(dates) if position not in removed]
+    if op == "resize":
+        result = []
+        for position, date in enumerate(dates):
+            last_of_run = position + 1 == len(dates) or dates[position + 1] != date
+            result.append(date)
+            if last_of_run:
+                delta = arg.get(date, 0)
+                if delta > 0:
+                    result.extend([date] * delta)
+                elif delta < 0:
+                    del result[len(result) + delta:]
+        return result
+    return dates + [date for date, count in arg for _ in range(count)]
+
+
+def new_index(session, dates):
+    index = DateRowIndex(session, "바르너").load()
+    index.runs = runs_from_dates(dates)
+    return index
+
+
+A, B, C, D = "2025-01-01", "2025-01-02", "2025-01-03", "2025-01-04"
+START = [A] * 3 + [B] * 2 + [C] * 4  # A: 2~4행, B: 5~6행, C: 7~10행
+
+
+@pytest.mark.parametrize("ops", [
+    # 구간 일부/전체 삭제
+    [("delete", [3])],
+    [("delete", [5, 6])],
+    [("delete", [4, 5, 6, 7])],
+    # 앞 구간 전체 삭제 → 뒤 구간이 당겨짐
+    [("delete", [2, 3, 4]), ("append", [(D, 2)])],
+    # 재업로드: 날짜 삭제 후 끝에 다시 추가
+    [("delete", [5, 6]), ("append", [(B, 3)])],
+    [("delete", [2, 3, 4]), ("append", [(A, 1), (D, 2)]), ("delete", [2, 3]), ("append", [(B, 1)])],
+    # 마지막 날짜에 이어 붙이면 같은 구간이 늘어남
+    [("append", [(C, 2)]), ("delete", [10, 11])],
+    # 구간 안 행 수 변경과 섞기
+    [("resize", {A: 2, C: -1}), ("delete", [7, 8]), ("append", [(D, 1)])],
+    [("resize", {B: -2}), ("append", [(B, 2)])],
+    [("append", [(D, 3)]), ("resize", {D: -1, A: -1}), ("delete", [2, 3]), ("append", [(A, 2)])],
+    # 빈 날짜 행
+    [("append", [("", 2), (D, 1)]), ("delete", [11]), ("resize", {D: 2})],
+])
+def test_record_operations_match_the_sheet(session, ops):
+    dates = list(START)
+    index = new_index(session, dates)
+    for op, arg in ops:
+        getattr(index, f"record_{op}")(arg)
+        dates = apply_to_model(dates, op, arg)
+        # 인덱스 구간 = 시트를 다시 읽어 만든 구간
+        assert index.runs == runs_from_dates(dates), (op, arg)
+    assert index.data_end == 1 + len(dates)
+    assert index.dirty
+
+
+def test_record_append_of_separated_date_drops_the_index(session):
+    index = new_index(session, START)
+    # A가 2~4행에 있는데 C 뒤에 또 추가 → 한 날짜가 떨어진 두 구간에 있게 되므로 인덱스를 비움
+    index.record_append([(A, 1)])
+    assert index.runs is None
+    assert not index.is_indexed
+
+
+def sheet_with_dates(spreadsheet, dates):
+    return spreadsheet.add("바르너", [["판매처", "date", "결제금액"]] + [["스토어", date, "1,000"] for date in dates])
+
+
+def test_verify_spans_accepts_matching_sheet(session, spreadsheet):
+    sheet = sheet_with_dates(spreadsheet, START)
+    index = new_index(session, START)
+    assert index.verify_spans(sheet, [A, B, C, D])
+    assert index.runs == runs_from_dates(START)
+
+
+def insert_row_above_b(rows):
+    # 시트에서 B 구간 위에 행을 직접 넣음 → B 구간이 한 칸 밀림
+    rows.insert(4, ["스토어", A, "1,000"])
+
+
+def sort_descending(rows):
+    # 시트를 date 내림차순 정렬
+    rows[1:] = sorted(rows[1:], key=lambda row: row[1], reverse=True)
+
+
+def insert_row_below_b(rows):
+    # B 구간 아래에 같은 날짜 행이 더 있음 (인덱스 구간보다 김)
+    rows.insert(6, ["스토어", B, "1,000"])
+
+
+def rename_date_column(rows):
+    rows[0][1] = "일자"
+
+
+@pytest.mark.parametrize("edit", [insert_row_above_b, sort_descending, insert_row_below_b, rename_date_column])
+def test_verify_spans_drops_index_when_sheet_was_edited(session, spreadsheet, edit):
+    sheet = sheet_with_dates(spreadsheet, START)
+    edit(sheet.rows)
+    index = new_index(session, START)
+    assert not index.verify_spans(sheet, [B])
+    assert index.runs is None
+    assert index.dirty
+
+
+def test_saved_index_is_reloaded(session, spreadsheet):
+    index = new_index(session, START)
+    index.save()
+    index_sheet = next(ws for ws in spreadsheet.worksheets.values() if ws.title == DATE_INDEX_SHEET_NAME)
+    assert index_sheet.rows[0] == DATE_INDEX_HEADERS
+
+    index.locate()
+    index.record_delete([5, 6])
+    index.record_append([(B, 1)])
+    index.save()
+
+    # 행 하나를 갱신 (새 행 추가 아님)
+    assert len(index_sheet.rows) == 2
+    reloaded = DateRowIndex(session, "바르너").load()
+    assert reloaded.row == 2
+    assert reloaded.runs == [(A, 3), (C, 4), (B, 1)]
+    assert reloaded.spans() == {A: (2, 4), C: (5, 8), B: (9, 9)}
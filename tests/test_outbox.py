@@ -0,0 +1,64 @@
+import sys
+import types
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+import cigro_outbox
+from cigro_outbox import UploadOutbox, flush_outbox
+from cigro_planner import plan_tasks
+from cigro_store import KST, LocalStore
+
+
+def test_replayed_pre_settlement_scrape_does_not_freeze(tmp_path, monkeypatch):
+    store = LocalStore(str(tmp_path / "store"))
+
+    def upload_to_google_sheets(df, sheet_name, selected_date, scraped_at=None):
+        store.put("ad/campaign", sheet_name, df, synced=True)
+        store.mark_scraped("ad/campaign", sheet_name, [selected_date], scraped_at=scraped_at)
+
+    monkeypatch.setitem(sys.modules, "fake_uploader",
+                        types.SimpleNamespace(upload_to_google_sheets=upload_to_google_sheets))
+    monkeypatch.setitem(cigro_outbox.UPLOAD_MODULES, "ad/campaign", ("fake_uploader", {}))
+
+    # 2025-01-01 데이터를 정산 기간(7일) 안인 01-03에 스크래핑했지만 업로드에 실패해 outbox에 보관
+    outbox = UploadOutbox(str(tmp_path / "outbox"))
+    df = pd.DataFrame({"date": ["2025-01-01"], "광고비": ["1,000"]})
+    path = outbox.add("ad/campaign", "바르너_광고", df, {"selected_date": "2025-01-01"}, "HTTP 503")
+    outbox.record_failure(path, {**outbox.entries()[0][1], "created_at": "2025-01-03 09:00:00"}, "HTTP 503")
+
+    # 정산 기간이 지난 01-10에 재업로드되어도 스크래핑 시각은 01-03으로 기록
+    assert flush_outbox(outbox=outbox) == (1, 0)
+    assert store.scraped_at("ad/campaign", "바르너_광고", ["2025-01-01"]) == {"2025-01-01": "2025-01-03 09:00:00"}
+
+    tasks, frozen = plan_tasks("ad/campaign", ["바르너"], ["2025-01-01"], "_광고", include_frozen=False,
+                               settlement_days=7, today=date(2025, 1, 10), store=store)
+    assert tasks == [("바르너", "2025-01-01")]
+    assert frozen == []
+
+    # 정산 기간이 지난 뒤 실제로 다시 스크래핑하면 동결
+    store.mark_scraped("ad/campaign", "바르너_광고", ["2025-01-01"], scraped_at=datetime(2025, 1, 10, 9, tzinfo=KST))
+    _, frozen = plan_tasks("ad/campaign", ["바르너"], ["2025-01-01"], "_광고", include_frozen=False,
+                           settlement_days=7, today=date(2025, 1, 10), store=store)
+    assert frozen == [("바르너", "2025-01-01")]
+
+
+def test_failed_upload_keeps_the_cause(tmp_path, monkeypatch):
+    pytest.importorskip("playwright")
+    import cigro_yesterday
+
+    def get_sheets_session(cred_file, sheet_name):
+        raise RuntimeError("APIError: [503] The service is currently unavailable.")
+
+    monkeypatch.setattr(cigro_yesterday, "get_sheets_session", get_sheets_session)
+    monkeypatch.setattr(cigro_yesterday, "get_local_store", lambda: LocalStore(str(tmp_path / "store")))
+    outbox = UploadOutbox(str(tmp_path / "outbox"))
+    df = pd.DataFrame({"판매처": ["스토어"], "date": ["2025-01-01"]})
+    outbox.add("product/option", "바르너", df)
+
+    # 매출 업로더는 실패 원인을 예외로 올려, outbox에 원인이 기록됨
+    assert flush_outbox(outbox=outbox) == (0, 1)
+    (_, entry), = outbox.entries()
+    assert entry["attempts"] == 1
+    assert entry["last_error"] == "APIError: [503] The service is currently unavailable."
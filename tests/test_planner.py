@@ -0,0 +1,85 @@
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from cigro_planner import is_frozen, parse_settlement_days, plan_tasks
+from cigro_store import KST, LocalStore
+
+
+@pytest.mark.parametrize("today, scraped_at, frozen", [
+    # 정산 기간(7일)이 아직 지나지 않음: 01-01 + 7일 = 01-08
+    (date(2025, 1, 7), "2025-01-07 09:00:00", False),
+    # 정산 기간이 지났지만 마지막 스크래핑이 정산일 전
+    (date(2025, 1, 8), "2025-01-07 23:59:59", False),
+    # 정산일 당일 스크래핑은 확정
+    (date(2025, 1, 8), "2025-01-08 00:00:00", True),
+    (date(2025, 2, 1), "2025-01-20 12:00:00", True),
+    # 스크래핑 기록 없음
+    (date(2025, 2, 1), None, False),
+    (date(2025, 2, 1), "", False),
+])
+def test_is_frozen_window_boundary(today, scraped_at, frozen):
+    assert is_frozen(date(2025, 1, 1), scraped_at, 7, today) is frozen
+
+
+def test_parse_settlement_days_overrides_defaults():
+    days = parse_settlement_days("product/option=21, ad/ad=3")
+    assert days["product/option"] == 21
+    assert days["ad/ad"] == 3
+    assert days["ad/campaign"] == 7
+
+
+def put_scraped(store, sheet_name, dates, scraped_at):
+    store.put("ad/campaign", sheet_name, pd.DataFrame({"date": dates, "광고비": ["1,000"] * len(dates)}), synced=True)
+    store.mark_scraped("ad/campaign", sheet_name, dates, scraped_at=scraped_at)
+
+
+def plan(store, brands, dates):
+    return plan_tasks("ad/campaign", brands, dates, "_광고", include_frozen=False, settlement_days=7,
+                      today=date(2025, 2, 1), store=store)
+
+
+def test_plan_tasks_skips_only_dates_scraped_after_settlement(tmp_path):
+    store = LocalStore(str(tmp_path))
+    put_scraped(store, "바르너_광고", ["2025-01-01"], datetime(2025, 1, 20, tzinfo=KST))
+    put_scraped(store, "바르너_광고", ["2025-01-02"], datetime(2025, 1, 5, tzinfo=KST))
+    put_scraped(store, "본투비맨_광고", ["2025-01-01"], datetime(2025, 1, 20, tzinfo=KST))
+
+    dates = ["2025-01-01", "2025-01-02", "2025-01-30"]
+    tasks, frozen = plan(store, ["바르너", "본투비맨"], dates)
+
+    # 날짜 → 브랜드 순서 유지
+    assert tasks == [("바르너", "2025-01-02"), ("본투비맨", "2025-01-02"),
+                     ("바르너", "2025-01-30"), ("본투비맨", "2025-01-30")]
+    assert frozen == [("바르너", "2025-01-01"), ("본투비맨", "2025-01-01")]
+
+    # 동결된 날짜도 다시 스크래핑
+    tasks, frozen = plan_tasks("ad/campaign", ["바르너"], dates[:1], "_광고", include_frozen=True, store=store)
+    assert tasks == [("바르너", "2025-01-01")]
+    assert frozen == []
+
+
+def test_plan_tasks_rescrapes_date_whose_data_was_replaced_without_scrape_time(tmp_path):
+    store = LocalStore(str(tmp_path))
+    put_scraped(store, "바르너_광고", ["2025-01-01"], datetime(2025, 1, 20, tzinfo=KST))
+    assert plan(store, ["바르너"], ["2025-01-01"])[1] == [("바르너", "2025-01-01")]
+
+    # put()의 INSERT OR REPLACE는 scraped_at을 지움 → 스크래핑 시각이 없는 데이터는 동결하지 않음
+    store.put("ad/campaign", "바르너_광고", pd.DataFrame({"date": ["2025-01-01"], "광고비": ["2,000"]}))
+    assert store.scraped_at("ad/campaign", "바르너_광고", ["2025-01-01"]) == {}
+    tasks, frozen = plan(store, ["바르너"], ["2025-01-01"])
+    assert tasks == [("바르너", "2025-01-01")]
+    assert frozen == []
+
+
+def test_plan_tasks_reads_archived_dates_under_archive_sheet_name(tmp_path):
+    store = LocalStore(str(tmp_path))
+    # 아카이브된 월의 파티션은 {시트}_{YYYY} 이름 아래로 옮겨짐 (cigro_archive)
+    put_scraped(store, "바르너_광고", ["2024-12-01"], datetime(2024, 12, 20, tzinfo=KST))
+    store.move_months("바르너_광고", {"2024-12": "바르너_광고_2024"})
+    put_scraped(store, "바르너_광고", ["2025-01-01"], datetime(2025, 1, 20, tzinfo=KST))
+
+    tasks, frozen = plan(store, ["바르너"], ["2024-12-01", "2024-12-02", "2025-01-01"])
+    assert frozen == [("바르너", "2024-12-01"), ("바르너", "2025-01-01")]
+    assert tasks == [("바르너", "2024-12-02")]
@@ -0,0 +1,145 @@
+import time
+
+import gspread
+import pytest
+
+import cigro_sheets
+from cigro_sheets import SHEETS_MAX_RETRIES, ApiCallLog, SheetsQuota, TokenBucket, sheets_call
+
+
+class FakeClock:
+    """time.monotonic/time.sleep 대신 쓰는 가짜 시계 (sleep은 시간만 앞으로 보냄)"""
+
+    def __init__(self):
+        self.now = time.monotonic()  # 이미 만든 토큰 버킷과 이어지도록 실제 시각에서 시작
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cigro_sheets, "time", clock)
+    return clock
+
+
+class FakeResponse:
+    def __init__(self, status_code, retry_after=None):
+        self.status_code = status_code
+        self.headers = {"Retry-After": retry_after} if retry_after else {}
+        self.text = ""
+
+    def json(self):
+        return {"error": {"code": self.status_code, "message": "error", "status": "ERROR"}}
+
+
+def api_error(status_code, retry_after=None):
+    return gspread.exceptions.APIError(FakeResponse(status_code, retry_after))
+
+
+def failing(*errors):
+    """앞에서부터 errors를 하나씩 발생시키고, 다 쓰면 "ok"를 반환하는 호출"""
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+
+    fn.calls = calls
+    return fn
+
+
+def test_token_bucket_refills_at_rate(clock):
+    bucket = TokenBucket(60)  # 초당 1개, 최대 60개
+
+    assert bucket.acquire(60) == 0
+    # 비었으면 토큰 1개가 찰 때까지 1초 대기
+    assert bucket.acquire() == pytest.approx(1.0)
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+    # 30초 지나면 30개가 채워짐
+    clock.now += 30
+    assert bucket.acquire(30) == 0
+    assert bucket.acquire(5) == pytest.approx(5.0)
+
+    # 오래 쉬어도 capacity 이상은 쌓이지 않음
+    clock.now += 1000
+    assert bucket.acquire(60) == 0
+    assert bucket.acquire() == pytest.approx(1.0)
+
+
+def test_token_bucket_drain_makes_next_caller_wait(clock):
+    bucket = TokenBucket(120)
+    bucket.drain()
+    assert bucket.acquire(2) == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_write_is_retried_on_429_and_503(clock, monkeypatch, status):
+    quota = SheetsQuota(60, 60)
+    monkeypatch.setattr(cigro_sheets, "SHEETS_QUOTA", quota)
+    call_log = ApiCallLog()
+    fn = failing(api_error(status, retry_after="7"), api_error(status, retry_after="3"))
+
+    assert sheets_call(call_log, "batchUpdate", fn) == "ok"
+
+    assert len(fn.calls) == 3
+    # Retry-After 헤더만큼 대기 (429는 쓰기 버킷도 비워 토큰 대기가 더해짐)
+    assert clock.sleeps[-1] == pytest.approx(3.0)
+    assert 7.0 in clock.sleeps
+    assert quota.retries == {status: 2}
+    assert quota.used == {"read": 0, "write": 3}
+    # 성공한 호출만 한 번 기록
+    assert call_log.total == 1
+
+
+@pytest.mark.parametrize("status", [500, 502, 504, 400, 403])
+def test_write_is_not_retried_on_other_statuses(clock, status):
+    fn = failing(api_error(status))
+    with pytest.raises(gspread.exceptions.APIError):
+        sheets_call(None, "batchUpdate", fn)
+    assert len(fn.calls) == 1
+    assert clock.sleeps == []
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+def test_read_is_retried_on_429_and_5xx(clock, status):
+    fn = failing(api_error(status))
+    assert sheets_call(None, "batch_get", fn) == "ok"
+    assert len(fn.calls) == 2
+    # Retry-After가 없으면 지수 백오프 + 지터 (첫 재시도 1~2초)
+    assert 1.0 <= clock.sleeps[-1] < 2.0
+
+
+def test_errors_other_than_api_error_are_not_retried(clock):
+    fn = failing(ConnectionError("reset"))
+    with pytest.raises(ConnectionError):
+        sheets_call(None, "batch_get", fn)
+    assert len(fn.calls) == 1
+
+
+def test_gives_up_after_max_retries(clock):
+    fn = failing(*[api_error(429, retry_after="1")] * (SHEETS_MAX_RETRIES + 1))
+    with pytest.raises(gspread.exceptions.APIError):
+        sheets_call(None, "values.batchUpdate", fn)
+    assert len(fn.calls) == SHEETS_MAX_RETRIES + 1
+
+
+def test_429_drains_only_its_bucket(clock, monkeypatch):
+    quota = SheetsQuota(60, 60)
+    monkeypatch.setattr(cigro_sheets, "SHEETS_QUOTA", quota)
+    quota.record_retry("batchUpdate", 429)
+
+    # 읽기 버킷은 그대로, 쓰기는 토큰이 찰 때까지 대기
+    quota.acquire("get_all_values")
+    assert quota.waited == 0
+    quota.acquire("batchUpdate")
+    assert quota.waited == pytest.approx(1.0)
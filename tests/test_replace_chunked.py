@@ -0,0 +1,99 @@
+import pytest
+
+from cigro_sheets import DateRowIndex, replace_dates_chunked, runs_from_dates
+
+A, B, C, D, E = "2025-01-01", "2025-01-02", "2025-01-03", "2025-01-04", "2025-01-05"
+HEADER = ["판매처", "date", "결제금액"]
+EXISTING = {A: 3, B: 2, C: 4, D: 1}  # A: 2~4행, B: 5~6행, C: 7~10행, D: 11행
+NEW = {A: 2, B: 3, C: 1, D: 2, E: 2}
+
+
+def rows_for(date, count, tag):
+    return [[f"스토어{n}", date, f"{tag}-{n}"] for n in range(count)]
+
+
+def setup_sheet(session, spreadsheet):
+    sheet = spreadsheet.add("바르너", [HEADER] + [row for date, count in EXISTING.items()
+                                                   for row in rows_for(date, count, "old")])
+    index = DateRowIndex(session, "바르너").load()
+    index.rebuild_from_dates(sheet.dates())
+    index.save()
+    index.locate()
+    return sheet, index
+
+
+def upload(sheet, index, push_dates, synced, chunk_cells=1):
+    """cigro_yesterday처럼 인덱스 구간을 삭제 대상으로 날짜별 교체"""
+    spans = index.spans()
+    date_rows = {date: list(range(spans[date][0], spans[date][1] + 1)) for date in push_dates if date in spans}
+    rows_by_date = [(date, rows_for(date, NEW[date], "new")) for date in push_dates]
+    # 기본 chunk_cells=1: 날짜 하나가 청크 하나
+    return replace_dates_chunked(sheet, rows_by_date, date_rows, index, chunk_cells=chunk_cells, on_chunk=synced.extend)
+
+
+def expected_rows(push_dates):
+    kept = [row for date, count in EXISTING.items() if date not in push_dates for row in rows_for(date, count, "old")]
+    return [HEADER] + kept + [row for date in push_dates for row in rows_for(date, NEW[date], "new")]
+
+
+@pytest.mark.parametrize("push_dates", [
+    # 앞 청크의 삭제로 뒤 날짜의 행 번호가 당겨짐
+    [A, C],
+    [A, B, C, D],
+    # 뒤 날짜를 먼저 지우면 앞 날짜 행 번호는 그대로
+    [D, B, A],
+    [C, A, D, B],
+    # 새 날짜가 중간에 끼어도 삭제 행 번호에는 영향 없음 (추가는 시트 끝)
+    [B, E, D],
+])
+def test_chunks_delete_rows_shifted_by_earlier_chunks(session, spreadsheet, push_dates):
+    sheet, index = setup_sheet(session, spreadsheet)
+    synced = []
+
+    assert upload(sheet, index, push_dates, synced) == len(push_dates)
+
+    assert sheet.rows == expected_rows(push_dates)
+    assert synced == push_dates
+    # 청크마다 저장한 인덱스 = 시트를 다시 읽어 만든 인덱스
+    assert index.runs == runs_from_dates(sheet.dates())
+    assert DateRowIndex(session, "바르너").load().runs == index.runs
+
+
+def test_chunk_holds_several_dates_up_to_chunk_cells(session, spreadsheet):
+    sheet, index = setup_sheet(session, spreadsheet)
+    synced = []
+    # A(2행) + B(3행) = 15셀, C(1행) + D(2행) = 9셀
+    assert upload(sheet, index, [A, B, C, D], synced, chunk_cells=15) == 2
+    assert sheet.rows == expected_rows([A, B, C, D])
+    assert index.runs == runs_from_dates(sheet.dates())
+
+
+@pytest.mark.parametrize("push_dates, failed_chunk", [
+    ([A, B, C, D], 2),
+    ([A, B, C, D], 4),
+    ([C, A, E, B], 3),
+    ([B, E, D], 1),
+])
+def test_resume_after_failed_chunk(session, spreadsheet, push_dates, failed_chunk):
+    sheet, index = setup_sheet(session, spreadsheet)
+    synced = []
+    spreadsheet.fail_on = {spreadsheet.batch_updates + failed_chunk}
+
+    with pytest.raises(RuntimeError):
+        upload(sheet, index, push_dates, synced)
+
+    # 실패한 청크 전까지만 반영되고, 반영된 날짜만 on_chunk로 기록됨
+    assert synced == push_dates[:failed_chunk - 1]
+    assert sheet.rows == expected_rows(synced)
+
+    # 다음 실행: 저장된 인덱스를 다시 읽어 반영되지 않은 날짜만 다시 올림
+    spreadsheet.fail_on = set()
+    index = DateRowIndex(session, "바르너").load()
+    assert index.runs == runs_from_dates(sheet.dates())
+    remaining = [date for date in push_dates if date not in synced]
+    upload(sheet, index, remaining, synced)
+
+    # 중복/누락 없이 한 번에 올린 결과와 같음
+    assert synced == push_dates
+    assert sheet.rows == expected_rows(push_dates)
+    assert DateRowIndex(session, "바르너").load().runs == runs_from_dates(sheet.dates())
@@ -0,0 +1,114 @@
+import pandas as pd
+import pytest
+
+from cigro_rollup import compare_rollup, plan_rollup, rollup_campaigns
+
+AD_COLUMNS = ['date', '채널', '캠페인 ID', '캠페인', '광고 세트', '광고', '광고비', '노출수', '클릭수', 'CTR', 'CPC',
+              '전환수', '전환매출', '전환율', 'ROAS']
+CAMPAIGN_COLUMNS = ['date', '채널', '캠페인 ID', '캠페인', '광고비', '노출수', '클릭수', 'CTR', 'CPC',
+                    '전환수', '전환매출', '전환율', 'ROAS']
+
+
+def ad_rows():
+    """광고 소재 화면 표시값 그대로 (캠페인이 섞여 나오는 순서 포함)"""
+    return pd.DataFrame([
+        ['2025-01-01', '메타', '1001', '봄 세일', '리타겟팅', '영상A', '₩10,000', '5,000', '100', '2.00%', '₩100',
+         '5', '₩50,000', '5.00%', '500%'],
+        ['2025-01-01', '메타', '1001', '봄 세일', '리타겟팅', '영상B', '₩20,000', '10,000', '150', '1.50%', '₩133',
+         '10', '₩70,000', '6.67%', '350%'],
+        ['2025-01-01', '메타', '1002', '신상품', '관심사', '이미지A', '₩8,000', '4,000', '0', '0.00%', '₩0',
+         '0', '₩0', '0.00%', '0%'],
+        ['2025-01-01', '메타', '1001', '봄 세일', '유사타겟', '이미지B', '₩5,000', '2,000', '50', '2.50%', '₩100',
+         '0', '₩0', '0.00%', '0%'],
+        ['2025-01-01', '메타', '1002', '신상품', '관심사', '이미지C', '₩12,000', '6,000', '60', '1.00%', '₩200',
+         '3', '₩36,000', '5.00%', '300%'],
+        ['2025-01-01', '네이버', '2001', '브랜드검색', '브랜드', '파워링크', '₩3,000', '1,000', '30', '3.00%', '₩100',
+         '1', '₩9,900', '3.33%', '330%'],
+    ], columns=AD_COLUMNS)
+
+
+def test_plan_rollup_groups_columns():
+    plan = plan_rollup(ad_rows(), CAMPAIGN_COLUMNS)
+
+    # 숫자여도 'ID' 열은 식별 열, 광고 세트/광고 열은 캠페인 시트에 없으므로 제외
+    assert plan.key_columns == ['채널', '캠페인 ID', '캠페인']
+    assert plan.additive_columns == ['광고비', '노출수', '클릭수', '전환수', '전환매출']
+    assert plan.ratio_columns == {
+        'CTR': ('클릭수', '노출수', 100),
+        'CPC': ('광고비', '클릭수', 1),
+        '전환율': ('전환수', '클릭수', 100),
+        'ROAS': ('전환매출', '광고비', 100),
+    }
+
+
+def test_plan_rollup_adds_ratio_components_missing_from_campaign_sheet():
+    columns = ['date', '캠페인', '광고비', 'ROAS']
+    plan = plan_rollup(ad_rows(), columns)
+    assert plan.additive_columns == ['광고비', '전환매출']
+    assert list(rollup_campaigns(ad_rows(), columns, plan).columns) == columns
+
+
+@pytest.mark.parametrize("columns, message", [
+    (['date', '캠페인', '도달'], "광고 소재 테이블에 없는 캠페인 열"),
+    # 구성 요소가 없는 평균 지표
+    (['date', '캠페인', '평균 재생 시간'], "합계도 재계산도 할 수 없습니다"),
+    (['date', '광고비'], "캠페인 식별 열"),
+])
+def test_plan_rollup_rejects_columns_it_cannot_build(columns, message):
+    ad_df = ad_rows().assign(**{'평균 재생 시간': '12.5'})
+    with pytest.raises(ValueError, match=message):
+        plan_rollup(ad_df, columns)
+
+
+def test_rollup_campaigns_sums_and_recomputes_ratios():
+    derived = rollup_campaigns(ad_rows(), CAMPAIGN_COLUMNS)
+
+    # 캠페인이 광고 소재 테이블에 처음 나온 순서, 표시 형식은 광고 소재 표시값을 따름
+    assert derived.values.tolist() == [
+        ['2025-01-01', '메타', '1001', '봄 세일', '₩35,000', '17,000', '300', '1.76%', '₩117',
+         '15', '₩120,000', '5.00%', '343%'],
+        ['2025-01-01', '메타', '1002', '신상품', '₩20,000', '10,000', '60', '0.60%', '₩333',
+         '3', '₩36,000', '5.00%', '180%'],
+        ['2025-01-01', '네이버', '2001', '브랜드검색', '₩3,000', '1,000', '30', '3.00%', '₩100',
+         '1', '₩9,900', '3.33%', '330%'],
+    ]
+
+
+def test_rollup_campaigns_keeps_ratio_scale_shown_on_ad_rows():
+    ad_df = ad_rows()
+    # ROAS를 배수(5.00)로 표시하는 채널
+    ad_df['ROAS'] = ['5.00', '3.50', '0.00', '0.00', '3.00', '3.30']
+    derived = rollup_campaigns(ad_df, CAMPAIGN_COLUMNS)
+    assert derived['ROAS'].tolist() == ['3.43', '1.80', '3.30']
+
+
+def test_rollup_campaigns_leaves_ratio_blank_when_denominator_is_zero():
+    ad_df = ad_rows()
+    ad_df.loc[4, ['클릭수', '전환수', '전환매출']] = ['0', '0', '₩0']
+    derived = rollup_campaigns(ad_df, CAMPAIGN_COLUMNS).set_index('캠페인')
+    assert derived.loc['신상품', ['클릭수', 'CTR', 'CPC', '전환율']].tolist() == ['0', '0.00%', '', '']
+
+
+def test_compare_rollup_allows_display_rounding():
+    plan = plan_rollup(ad_rows(), CAMPAIGN_COLUMNS)
+    derived = rollup_campaigns(ad_rows(), CAMPAIGN_COLUMNS, plan)
+    live = derived.copy()
+    # 실제 캠페인 화면은 반올림/버림이 달라 마지막 자리가 다를 수 있음
+    live.loc[0, ['CPC', 'ROAS']] = ['₩116', '342%']
+    live['캠페인'] = live['캠페인'] + ' '
+    assert compare_rollup(derived, live, plan) == []
+
+
+def test_compare_rollup_reports_metric_and_campaign_mismatches():
+    plan = plan_rollup(ad_rows(), CAMPAIGN_COLUMNS)
+    derived = rollup_campaigns(ad_rows(), CAMPAIGN_COLUMNS, plan)
+
+    live = derived.copy()
+    live.loc[0, '광고비'] = '₩30,000'
+    assert compare_rollup(derived, live, plan) == [
+        "광고비: 1개 캠페인 불일치 (예: 메타 / 1001 / 봄 세일 파생 ₩35,000 / 실제 ₩30,000)"]
+
+    # 실제 화면에는 다른 캠페인이 있음 (예: 광고 소재 화면에 없는 꺼진 캠페인)
+    live = derived.copy()
+    live.loc[2, ['캠페인 ID', '캠페인']] = ['2002', '일반검색']
+    assert compare_rollup(derived, live, plan) == ["캠페인 구성 다름 (파생에만 1개, 실제 화면에만 1개)"]
@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("playwright")
+import cigro_runner  # noqa: E402
+
+
+def test_ads_reports_share_one_task_per_brand_and_date():
+    reports = ["product/option", "ad/campaign", "ad/ad"]
+    brands = {report: ["바르너", "보호리"] for report in reports}
+    dates = ["2025-01-01", "2025-01-02"]
+    planned = {(report, brand, date) for report in reports for brand in brands[report] for date in dates}
+    # 보호리: 01-01 캠페인, 01-02 캠페인/광고 소재는 정산 기간이 지나 동결
+    planned.discard(("ad/campaign", "보호리", "2025-01-01"))
+    planned.discard(("ad/ad", "보호리", "2025-01-02"))
+    planned.discard(("ad/campaign", "보호리", "2025-01-02"))
+
+    tasks = cigro_runner.build_tasks(reports, brands, dates, planned)
+
+    assert tasks == [
+        ("product/option", "바르너", "2025-01-01"), ("product/option", "보호리", "2025-01-01"),
+        (cigro_runner.ADS_TASK, "바르너", "2025-01-01", ("campaign", "ad")),
+        (cigro_runner.ADS_TASK, "보호리", "2025-01-01", ("ad",)),
+        ("product/option", "바르너", "2025-01-02"), ("product/option", "보호리", "2025-01-02"),
+        (cigro_runner.ADS_TASK, "바르너", "2025-01-02", ("campaign", "ad")),
+    ]
+
+
+def test_ads_results_are_split_per_level_report():
+    campaign_df = pd.DataFrame({"date": ["2025-01-01"]})
+    tasks = [
+        ("product/option", "바르너", "2025-01-01"),
+        (cigro_runner.ADS_TASK, "바르너", "2025-01-01", ("campaign", "ad")),
+        (cigro_runner.ADS_TASK, "보호리", "2025-01-01", ("campaign",)),
+    ]
+    results = [
+        (None, "타임아웃"),
+        ({"campaign": (campaign_df, None), "ad": (None, "페이지 이동 실패")}, None),
+        # 워커가 작업 전체를 실패 처리
+        (None, "브라우저 종료"),
+    ]
+
+    by_report = cigro_runner.split_results(tasks, results)
+
+    assert by_report["product/option"] == ([tasks[0]], [(None, "타임아웃")])
+    assert by_report["ad/campaign"] == ([("ad/campaign", "바르너", "2025-01-01"), ("ad/campaign", "보호리", "2025-01-01")],
+                                        [(campaign_df, None), (None, "브라우저 종료")])
+    assert by_report["ad/ad"] == ([("ad/ad", "바르너", "2025-01-01")], [(None, "페이지 이동 실패")])
+
+
+def test_notify_reports_unchanged_and_frozen_counts(monkeypatch):
+    sent = []
+    monkeypatch.setattr(cigro_runner.cigro_ads, "send_slack_notification", lambda *args: sent.append(args))
+    monkeypatch.setattr(cigro_runner.cigro_yesterday, "send_slack_notification", lambda *args: sent.append(args))
+
+    df = pd.DataFrame({"date": ["2025-01-01"]})
+    unchanged = df.copy()
+    unchanged.attrs["verified_dates"] = ["2025-01-01"]  # 지문 일치로 변경 없음 확인 (cigro_fingerprint)
+    assert cigro_runner.count_unchanged([(unchanged, None), (df, None), (None, "오류")]) == 1
+
+    cigro_runner.notify("ad/ad", ["2025-01-01"], ["바르너"], 2, 1, unchanged=1, frozen=3)
+    cigro_runner.notify("product/option", ["2025-01-01"], ["바르너"], 3, 1, unchanged=2, frozen=4)
+
+    (success, _, ads_details, label), (_, _, product_details) = sent
+    assert not success and label == "광고 소재"
+    assert ads_details == {"📅 기간": "2025-01-01", "📋 브랜드": "바르너", "🧭 분석 단위": "광고 소재",
+                           "✅ 성공": "2건", "🟰 변경 없음": "1건", "❌ 실패": "1건", "🧊 동결": "3건"}
+    assert product_details["🟰 변경 없음"] == "2건"
+    assert product_details["🧊 동결"] == "4건"
+    assert product_details["📈 성공률"] == "75.0%"
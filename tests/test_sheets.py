@@ -0,0 +1,49 @@
+import pandas as pd
+
+from cigro_sheets import diff_by_date, plan_upsert
+
+
+def product_rows(rows):
+    return pd.DataFrame(rows, columns=['판매처', '제품명', '옵션명', 'date', '원가', '판매량', '결제금액'])
+
+
+def test_plan_upsert_accepts_filtered_frame_with_non_zero_based_index():
+    existing = product_rows([
+        ['스토어', '셔츠', 'S', '2025-01-01', '100', '1', '1000'],
+        ['스토어', '셔츠', 'M', '2025-01-01', '100', '2', '2000'],
+        ['스토어', '셔츠', 'S', '2025-01-02', '100', '3', '3000'],
+    ])
+    pushed = product_rows([
+        ['스토어', '바지', 'S', '2024-12-31', '200', '1', '2000'],
+        ['스토어', '셔츠', 'S', '2025-01-01', '100', '1', '1000'],
+        ['스토어', '셔츠', 'M', '2025-01-01', '100', '5', '5000'],
+        ['스토어', '셔츠', 'L', '2025-01-01', '100', '1', '1000'],
+        ['스토어', '셔츠', 'S', '2025-01-02', '100', '3', '3000'],
+    ])
+    pushed.index = range(4, 9)
+    new = pushed[pushed['date'].isin(['2025-01-01', '2025-01-02'])]
+    assert list(new.index) == [5, 6, 7, 8]
+
+    plan = plan_upsert(existing, new)
+
+    # 추가된 키(L)는 2025-01-01 구간의 마지막 행(3행) 뒤에 삽입
+    assert plan.inserts == {3: [['스토어', '셔츠', 'L', '2025-01-01', '100', '1', '1000']]}
+    assert plan.row_deltas == {'2025-01-01': 1}
+    assert sorted(plan.cell_updates) == [(3, 6, '5'), (3, 7, '5000')]
+    assert plan.rows_to_delete == []
+
+
+def test_diff_by_date_replace_rules_follow_metric_columns():
+    key_columns = ['판매처', '제품명', '옵션명', 'date']
+    existing = product_rows([['스토어', '셔츠', 'S', '2025-01-01', '100', '3', '3000']])
+    new = product_rows([['스토어', '셔츠', 'S', '2025-01-01', '200', '3', '1000']])
+    new['반품수'] = '2'
+    existing['반품수'] = '1'
+
+    diffs = diff_by_date(existing, new, key_columns, ['원가', '결제금액', '반품수'])
+    assert diffs['2025-01-01'].replace_reason == "반품수 증가 (1.0 → 2.0)"
+
+    # 원가는 0에서 채워질 때만, 비교하지 않는 지표(반품수)는 교체 사유가 아님
+    diffs = diff_by_date(existing, new, key_columns, ['원가', '판매량'])
+    assert diffs['2025-01-01'].replace_reason is None
+    assert diffs['2025-01-01'].changed == {('스토어', '셔츠', 'S', '2025-01-01')}
@@ -0,0 +1,150 @@
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from cigro_sheets import diff_by_date
+from cigro_store import KST, LocalStore
+
+COLUMNS = ['판매처', '제품명', '옵션명', 'date', '원가', '판매량', '결제금액']
+
+
+def product_rows(rows):
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def test_put_and_load_round_trip_across_months(tmp_path):
+    store = LocalStore(str(tmp_path))
+    df = product_rows([
+        ['스토어', '셔츠', 'S', '2025-01-31', 100, np.int64(1), 1000.5],
+        ['스토어', '셔츠', 'M', '2025-01-31', None, np.int64(2), float('nan')],
+        ['쿠팡', '바지', 'L', ' 2025-02-01 ', 200, np.int64(3), 3000.0],
+    ])
+    store.put('product/option', '바르너', df)
+
+    # 월별 파티션 파일
+    assert sorted(os.listdir(tmp_path / 'product_option' / '바르너')) == ['2025-01.sqlite', '2025-02.sqlite']
+
+    loaded, synced = store.load('product/option', '바르너', ['2025-01-31', '2025-02-01', '2025-03-01'])
+    # 저장소에 없는 날짜는 synced에 없음, 저장 순서/열 순서 유지, 빈 값(None/NaN)은 빈 값
+    assert synced == {'2025-01-31': False, '2025-02-01': False}
+    assert list(loaded.columns) == COLUMNS
+    assert loaded.astype(object).where(loaded.notna(), None).values.tolist() == [
+        ['스토어', '셔츠', 'S', '2025-01-31', 100.0, 1, 1000.5],
+        ['스토어', '셔츠', 'M', '2025-01-31', None, 2, None],
+        ['쿠팡', '바지', 'L', ' 2025-02-01 ', 200.0, 3, 3000.0],
+    ]
+
+
+def test_put_replaces_only_the_dates_in_the_new_frame(tmp_path):
+    store = LocalStore(str(tmp_path))
+    store.put('product/option', '바르너', product_rows([
+        ['스토어', '셔츠', 'S', '2025-01-01', '100', '1', '1000'],
+        ['스토어', '셔츠', 'M', '2025-01-01', '100', '2', '2000'],
+        ['스토어', '셔츠', 'S', '2025-01-02', '100', '3', '3000'],
+    ]), synced=True)
+
+    # 01-01만 행 수가 줄어든 데이터로 교체 → 이전 행이 남지 않음, 반영 여부는 새로 기록
+    store.put('product/option', '바르너', product_rows([['스토어', '셔츠', 'L', '2025-01-01', '100', '1', '1000']]))
+
+    loaded, synced = store.load('product/option', '바르너', ['2025-01-01', '2025-01-02'])
+    assert synced == {'2025-01-01': False, '2025-01-02': True}
+    assert loaded['옵션명'].tolist() == ['L', 'S']
+    assert store.status() == [('product_option', '바르너', '2025-01', 2, 2, ['2025-01-01'])]
+
+    store.mark_synced('product/option', '바르너', ['2025-01-01'])
+    assert store.load('product/option', '바르너', ['2025-01-01'])[1] == {'2025-01-01': True}
+
+
+def test_replace_policy_runs_against_stored_data(tmp_path):
+    store = LocalStore(str(tmp_path))
+    stored = product_rows([
+        ['스토어', '셔츠', 'S', '2025-01-01', '100', '1', '1,000'],
+        ['스토어', '셔츠', 'M', '2025-01-01', '100', '2', '2,000'],
+    ])
+    store.put('product/option', '바르너', stored, synced=True)
+    existing, _ = store.load('product/option', '바르너', ['2025-01-01', '2025-01-02'])
+
+    # 같은 데이터를 다시 스크래핑 → 유지
+    diffs = diff_by_date(existing, stored)
+    assert not diffs['2025-01-01'].should_replace
+    assert not diffs['2025-01-01'].changed
+
+    # 결제금액 증가 → 교체, 저장소에 없는 날짜 → 신규
+    new = product_rows([
+        ['스토어', '셔츠', 'S', '2025-01-01', '100', '1', '1,500'],
+        ['스토어', '셔츠', 'M', '2025-01-01', '100', '2', '2,000'],
+        ['스토어', '셔츠', 'S', '2025-01-02', '100', '1', '1,000'],
+    ])
+    diffs = diff_by_date(existing, new)
+    assert diffs['2025-01-01'].replace_reason == "결제금액 증가 (1000.0 → 1500.0)"
+    assert diffs['2025-01-02'].is_new
+
+
+def test_fingerprints_are_kept_until_the_data_changes(tmp_path):
+    store = LocalStore(str(tmp_path))
+    df = product_rows([['스토어', '셔츠', 'S', '2025-01-01', '100', '1', '1000']])
+    store.put('product/option', '바르너', df)
+    store.mark_scraped('product/option', '바르너', ['2025-01-01'], {'2025-01-01': 'abc'},
+                       datetime(2025, 1, 2, 9, tzinfo=KST))
+
+    # Sheets 미반영 날짜의 지문은 쓰지 않음
+    assert store.fingerprints('product/option', '바르너', ['2025-01-01']) == {}
+    store.mark_synced('product/option', '바르너', ['2025-01-01'])
+    assert store.fingerprints('product/option', '바르너', ['2025-01-01']) == {'2025-01-01': 'abc'}
+
+    # 지문 없이 다시 기록하면 기존 지문 유지, 스크래핑 시각만 갱신
+    store.mark_scraped('product/option', '바르너', ['2025-01-01'], scraped_at=datetime(2025, 1, 3, 9, tzinfo=KST))
+    assert store.fingerprints('product/option', '바르너', ['2025-01-01']) == {'2025-01-01': 'abc'}
+    assert store.scraped_at('product/option', '바르너', ['2025-01-01']) == {'2025-01-01': '2025-01-03 09:00:00'}
+
+    # 데이터가 바뀌면 지문과 스크래핑 시각이 지워짐
+    store.put('product/option', '바르너', df, synced=True)
+    assert store.fingerprints('product/option', '바르너', ['2025-01-01']) == {}
+    assert store.scraped_at('product/option', '바르너', ['2025-01-01']) == {}
+
+
+def test_move_months_moves_every_report_and_keeps_existing_targets(tmp_path):
+    store = LocalStore(str(tmp_path))
+    ads = pd.DataFrame({'date': ['2024-11-30', '2024-12-01', '2025-01-01'], '광고비': ['1', '2', '3']})
+    store.put('ad/campaign', '바르너_광고', ads)
+    store.put('ad/ad', '바르너_광고', ads)
+    # 아카이브 시트에 이미 11월 파티션이 있음 (다른 데이터)
+    store.put('ad/campaign', '바르너_광고_2024', ads.iloc[:1].assign(광고비='9'))
+
+    moved = store.move_months('바르너_광고', {'2024-11': '바르너_광고_2024', '2024-12': '바르너_광고_2024',
+                                             '2023-01': '바르너_광고_2023'})
+
+    # ad/campaign 12월 + ad/ad 11월/12월 (ad/campaign 11월은 대상이 있어 그대로)
+    assert moved == 3
+    assert store.brand_months() == {'바르너_광고': {'2024-11', '2025-01'}, '바르너_광고_2024': {'2024-11', '2024-12'}}
+    assert store.load('ad/campaign', '바르너_광고_2024', ['2024-11-30'])[0]['광고비'].tolist() == ['9']
+    assert store.load('ad/campaign', '바르너_광고', ['2024-11-30'])[0]['광고비'].tolist() == ['1']
+    assert store.load('ad/ad', '바르너_광고_2024', ['2024-11-30', '2024-12-01'])[0]['광고비'].tolist() == ['1', '2']
+    assert store.load('ad/ad', '바르너_광고', ['2024-11-30', '2024-12-01'])[1] == {}
+
+
+def test_partition_from_previous_version_gets_new_columns(tmp_path):
+    store = LocalStore(str(tmp_path))
+    path = store.partition_path('product/option', '바르너', '2025-01')
+    os.makedirs(os.path.dirname(path))
+    with closing(sqlite3.connect(path)) as conn, conn:
+        conn.executescript("""
+            CREATE TABLE dates (date TEXT PRIMARY KEY, columns TEXT NOT NULL, row_count INTEGER NOT NULL,
+                                synced INTEGER NOT NULL DEFAULT 0, updated_at TEXT NOT NULL);
+            CREATE TABLE rows (date TEXT NOT NULL, position INTEGER NOT NULL, data TEXT NOT NULL,
+                               PRIMARY KEY (date, position));
+            INSERT INTO dates VALUES ('2025-01-01', '["date", "판매량"]', 1, 1, '2025-01-02 00:00:00');
+            INSERT INTO rows VALUES ('2025-01-01', 0, '["2025-01-01", "3"]');
+        """)
+
+    assert store.scraped_at('product/option', '바르너', ['2025-01-01']) == {}
+    store.mark_scraped('product/option', '바르너', ['2025-01-01'], {'2025-01-01': 'abc'},
+                       datetime(2025, 1, 2, 9, tzinfo=KST))
+    assert store.fingerprints('product/option', '바르너', ['2025-01-01']) == {'2025-01-01': 'abc'}
+    loaded, synced = store.load('product/option', '바르너', ['2025-01-01'])
+    assert loaded.values.tolist() == [['2025-01-01', '3']]
+    assert synced == {'2025-01-01': True}